@@ -19,6 +19,13 @@ log_file_paths = [
 log_file_paths = ['../output/' + filename + '_log.txt' for filename in log_file_paths]
 
 
+# Columnar store of the final (last best local) fitnesses of every log above (one column per config)
+fitness_store_path = '../output/last_best_local_fits.npz'
+
+# Machine-readable output of the all-pairs statistical comparison (gen_stats_matrix.py)
+stats_matrix_path = '../output/stats_matrix.json'
+
+
 # Compare general improvements between penalty function EA, repair function EA,
 # and plain-vanilla EA
 test_cases = \
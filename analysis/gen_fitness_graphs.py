@@ -1,82 +1,126 @@
 #!/usr/bin/env python3
 
 import analysis_config as config
+import matplotlib
+
+# Render without a display (and safely from worker processes)
+matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+import multiprocessing
 import numpy as np
+import os
+import scipy.stats as stats
+import sys
 
+# Make the repository's packages importable when run from the analysis directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
-for q in range(len(config.log_file_paths)):
-    with open(config.log_file_paths[q], 'r') as log_file:
-        # Create a list of lines from the log file, disregarding all config parmeters and empty lines
-        log_file = log_file.read().split('\n')
-        log_file = [line for line in log_file[log_file.index('Run 1'):] if not line == '']
+import util.compressed_file as compressed_file
 
 
-        # key: evaluation number, value: [average fitness, local best fitness]
-        eval_dict = {}
+def read_log(log_file_path):
+    """Reads the run data of the log file at log_file_path (or its compressed version).
 
-        curr_run = 1
+    Returns a list with one (evals, avg_fits, best_fits) tuple of NumPy arrays per run.
+    """
+    runs = []
 
-        # Scrape data from the log file
-        max_num_evals = 0
+    # Read the log file as a stream of lines
+    with compressed_file.open_file(compressed_file.find_file(log_file_path), 'r') as log_file:
         for line in log_file:
-            if not line[0] == 'R':
+            if line.startswith('Run'):
+                # Start a new run
+                runs.append([])
+
+            elif runs and line[0].isdigit():
                 # This line has eval and fitness data
-                eval_num, avg_fit, best_fit = line.split('\t')
-
-                eval_num = int(eval_num)
-                avg_fit = float(avg_fit)
-                best_fit = float(best_fit)
-
-                if eval_num in eval_dict:
-                    eval_dict[eval_num][0] += avg_fit
-                    eval_dict[eval_num][1] += best_fit
-                    eval_dict[eval_num][2] += 1
-                else:
-                    eval_dict[eval_num] = [avg_fit, best_fit, 1]
-                
-                max_num_evals = max(eval_dict[eval_num][2], max_num_evals)
-
-        # Adjust the counts up to the largest count
-        for eval_num in eval_dict:
-            eval_dict[eval_num][2] = max_num_evals
-
-
-        evals = []
-        avg_fits = []
-        best_fits = []
-        for eval_num in sorted(eval_dict.keys()):
-            evals.append(eval_num)
-            avg_fits.append(eval_dict[eval_num][0] / eval_dict[eval_num][2])
-            best_fits.append(eval_dict[eval_num][1] / eval_dict[eval_num][2])
-
-        # Plot the results
-        fig, ax = plt.subplots()
-
-        ax.step(evals, avg_fits, '-r')
-        ax.step(evals, best_fits, '-b')
-
-        if 'bonus' in config.log_file_paths[q] or 'small' in config.log_file_paths[q]:
-            # These plots only include fitness values between 0 and 1
-            plt.ylim(0, 1)
-        elif 'large' in config.log_file_paths[q]:
-            # These plots include both negative and positive fitness values
-            plt.ylim(-2.5, 1)
-        else:
-            # These plots include both (smaLl) negative and positive fitness values
-            plt.ylim(-1, 1)
-
-        red_patch = mpatches.Patch(color='red', label='Average Local Fitness')
-        blue_patch = mpatches.Patch(color='blue', label='Local Best Fitness')
-        plt.legend(handles=[blue_patch, red_patch])
-
-        # Include necessary labels
-        plt.xlabel('Evaluations')
-        plt.ylabel('Fitness (ratio of lit white cells to total number of white cells)')
-
-
-        # Save and close the plot
-        plt.savefig(config.log_file_paths[q][:config.log_file_paths[q].find('log')] + 'graph.png')
-        plt.close()
-            
\ No newline at end of file
+                runs[-1].append(line.split('\t')[:3])
+
+    return [tuple(np.array(run, dtype=float).T) for run in runs if run]
+
+
+def aggregate_runs(runs):
+    """Aligns the given runs (see read_log) on the union of their evaluation numbers.
+
+    Returns (evals, avg_fits, best_fits) where evals is a vector and avg_fits and best_fits are
+    runs x evals matrices. Runs terminate at different evaluation counts, so each run's last
+    values are carried forward to the later evaluations; evaluations before a run's first
+    logged evaluation are NaN.
+    """
+    evals = np.unique(np.concatenate([run[0] for run in runs]))
+
+    avg_fits = np.full((len(runs), len(evals)), np.nan)
+    best_fits = np.full((len(runs), len(evals)), np.nan)
+
+    for i, (run_evals, run_avg_fits, run_best_fits) in enumerate(runs):
+        # Index of the last logged evaluation at or before each evaluation number
+        indices = np.searchsorted(run_evals, evals, side='right') - 1
+        logged = indices >= 0
+
+        avg_fits[i, logged] = run_avg_fits[indices[logged]]
+        best_fits[i, logged] = run_best_fits[indices[logged]]
+
+    return evals, avg_fits, best_fits
+
+
+def get_confidence_band(fits, confidence=0.95):
+    """Returns the (lower, upper) bounds of the confidence interval of the mean of each column of fits."""
+    num_runs = np.sum(~np.isnan(fits), axis=0)
+    std_err = np.nanstd(fits, axis=0, ddof=1) / np.sqrt(num_runs)
+    t_crit = stats.t.ppf((1 + confidence) / 2, np.maximum(num_runs - 1, 1))
+
+    mean_fits = np.nanmean(fits, axis=0)
+
+    return mean_fits - t_crit * std_err, mean_fits + t_crit * std_err
+
+
+def render_graph(log_file_path, show_confidence_bands=False):
+    """Plots the average local fitness and local best fitness, averaged over all runs, of the
+    log file at log_file_path and saves the plot next to it.
+    """
+    evals, avg_fits, best_fits = aggregate_runs(read_log(log_file_path))
+
+    # Plot the results
+    fig, ax = plt.subplots()
+
+    ax.step(evals, np.nanmean(avg_fits, axis=0), '-r')
+    ax.step(evals, np.nanmean(best_fits, axis=0), '-b')
+
+    if show_confidence_bands and len(avg_fits) > 1:
+        for fits, color in ((avg_fits, 'red'), (best_fits, 'blue')):
+            lower, upper = get_confidence_band(fits)
+            ax.fill_between(evals, lower, upper, step='pre', color=color, alpha=0.2, linewidth=0)
+
+    if 'bonus' in log_file_path or 'small' in log_file_path:
+        # These plots only include fitness values between 0 and 1
+        plt.ylim(0, 1)
+    elif 'large' in log_file_path:
+        # These plots include both negative and positive fitness values
+        plt.ylim(-2.5, 1)
+    else:
+        # These plots include both (smaLl) negative and positive fitness values
+        plt.ylim(-1, 1)
+
+    red_patch = mpatches.Patch(color='red', label='Average Local Fitness')
+    blue_patch = mpatches.Patch(color='blue', label='Local Best Fitness')
+    plt.legend(handles=[blue_patch, red_patch])
+
+    # Include necessary labels
+    plt.xlabel('Evaluations')
+    plt.ylabel('Fitness (ratio of lit white cells to total number of white cells)')
+
+
+    # Save and close the plot
+    plt.savefig(log_file_path[:log_file_path.find('log')] + 'graph.png')
+    plt.close(fig)
+
+
+if __name__ == '__main__':
+    # Optionally shade the 95% confidence interval of each mean
+    show_confidence_bands = '--confidence-bands' in sys.argv[1:]
+
+    # Render the graphs of all log files in parallel
+    with multiprocessing.Pool() as pool:
+        pool.starmap(render_graph, [(log_file_path, show_confidence_bands) for log_file_path in config.log_file_paths])
@@ -1,26 +1,45 @@
 #!/usr/bin/env python3
 
 import analysis_config as config
+import numpy as np
+import os
+import sys
+
+# Make the repository's packages importable when run from the analysis directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import util.compressed_file as compressed_file
+
+
+# Final fitnesses of every log, keyed by config name
+all_last_best_fits = {}
 
 for i in range(len(config.log_file_paths)):
-    with open(config.log_file_paths[i], 'r') as log_file:
-        # Create a list of lines from the log file, disregarding all config parmeters and empty lines
-        log_text = log_file.read().split('\n')
-        log_text = [line for line in log_text[log_text.index('Run 1'):] if not line == '']
+    # Read the log file (or its compressed version) as a stream of lines
+    with compressed_file.open_file(compressed_file.find_file(config.log_file_paths[i]), 'r') as log_file:
+        # Skip all config parameters
+        for line in log_file:
+            if line.rstrip('\n') == 'Run 1':
+                break
 
         last_best_fits = []
         all_best_fits = []
         prev_run_count = 1
 
         # Scrape average fitness data from the log file
-        for line in log_text:
+        for line in log_file:
+            line = line.rstrip('\n')
+
+            if not line:
+                continue
+
             if line[0] == 'R':
                 curr_run_count = int(line.split()[1])
                 if not prev_run_count == curr_run_count:
                     last_best_fits.append(all_best_fits[-1])
                     prev_run_count = curr_run_count
 
-            else:
+            elif line[0].isdigit():
                 # This line has eval and fitness data
                 line = line.split('\t')
 
@@ -33,3 +52,16 @@ for i in range(len(config.log_file_paths)):
     with open(config.log_file_paths[i][:config.log_file_paths[i].find('log')] + 'last_best_local_fits.txt', 'w') as out:
         for fit in last_best_fits:
             out.write(fit + '\n')
+
+    config_name = os.path.basename(config.log_file_paths[i])
+    all_last_best_fits[config_name[:config_name.find('_log')]] = [float(fit) for fit in last_best_fits]
+
+
+# Write all final fitnesses to a single columnar store: a runs x configs matrix (padded with NaN)
+names = sorted(all_last_best_fits)
+fitnesses = np.full((max([len(fits) for fits in all_last_best_fits.values()]), len(names)), np.nan)
+
+for j, name in enumerate(names):
+    fitnesses[:len(all_last_best_fits[name]), j] = all_last_best_fits[name]
+
+np.savez(config.fitness_store_path, names=np.array(names), fitnesses=fitnesses)
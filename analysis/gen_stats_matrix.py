@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+import analysis_config as config
+import json
+import numpy as np
+import os
+import scipy.stats as stats
+import sys
+
+# Make the repository's packages importable when run from the analysis directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import util.result_store as result_store_class
+
+
+def load_fitness_store(store_path):
+    """Loads the final fitnesses of every config from store_path.
+
+    store_path is either a columnar .npz store (written by gen_stat_input_files.py) or a sweep
+    results store (.sqlite3, see util.result_store). Returns (names, fitnesses) where fitnesses
+    is a runs x configs matrix padded with NaN.
+    """
+    if store_path.endswith('.npz'):
+        store = np.load(store_path)
+
+        return [str(name) for name in store['names']], store['fitnesses']
+
+    results = result_store_class.ResultStore(store_path).get_results()
+    names = [result['config_hash'] for result in results]
+    fitnesses = np.full((max([len(r['best_fitnesses']) for r in results]), len(results)), np.nan)
+
+    for j, result in enumerate(results):
+        fitnesses[:len(result['best_fitnesses']), j] = result['best_fitnesses']
+
+    return names, fitnesses
+
+
+def adjust_p_values(p_values, method):
+    """Returns the given vector of p-values adjusted for multiple comparisons by the Holm-Bonferroni
+    (holm) or Benjamini-Hochberg (fdr_bh) method.
+    """
+    num_tests = len(p_values)
+    order = np.argsort(p_values)
+    sorted_p_values = p_values[order]
+
+    if method == 'holm':
+        adjusted = np.maximum.accumulate(sorted_p_values * (num_tests - np.arange(num_tests)))
+
+    elif method == 'fdr_bh':
+        adjusted = np.minimum.accumulate((sorted_p_values * num_tests / np.arange(1, num_tests + 1))[::-1])[::-1]
+
+    else:
+        raise ValueError('Unknown multiple comparison correction: ' + method)
+
+    adjusted_p_values = np.empty(num_tests)
+    adjusted_p_values[order] = np.minimum(adjusted, 1)
+
+    return adjusted_p_values
+
+
+def compare_all(fitnesses, alpha=0.05, correction='holm'):
+    """Compares every pair of configs (columns of fitnesses) at once.
+
+    As in gen_stats.py, an f-test decides whether each pair is compared with the pooled
+    (equal variances) or Welch (unequal variances) t-test, but unlike util.stat_tests (used by
+    gen_stats.py) the tests are exact: the f-test is two-tailed at alpha on unbiased variances and
+    the Welch t-test uses the Welch-Satterthwaite degrees of freedom, so results can differ from
+    gen_stats.py's. p-values are adjusted for the number of pairs and critical values are computed
+    exactly.
+
+    Returns a dict of configs x configs matrices: t, df, p, adjusted_p, t_critical and result
+    (1 if the row config is significantly better than the column config, -1 if significantly
+    worse, 0 otherwise), plus the mean, variance and number of observations of each config.
+    """
+    n = np.sum(~np.isnan(fitnesses), axis=0)
+    mean = np.nanmean(fitnesses, axis=0)
+    var = np.nanvar(fitnesses, axis=0, ddof=1)
+
+    # Pairwise (row, column) broadcasts
+    n_a, n_b = n[:, None], n[None, :]
+    var_a, var_b = var[:, None], var[None, :]
+    mean_diff = mean[:, None] - mean[None, :]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Two-tailed f-test for equal variances
+        f_p = 2 * np.minimum(stats.f.cdf(var_a / var_b, n_a - 1, n_b - 1), stats.f.sf(var_a / var_b, n_a - 1, n_b - 1))
+        equal_var = f_p >= alpha
+
+        # Pooled t-test
+        pooled_var = ((n_a - 1) * var_a + (n_b - 1) * var_b) / (n_a + n_b - 2)
+        pooled_t = mean_diff / np.sqrt(pooled_var * (1 / n_a + 1 / n_b))
+        pooled_df = (n_a + n_b - 2) * np.ones_like(mean_diff)
+
+        # Welch t-test
+        welch_se2_a, welch_se2_b = var_a / n_a, var_b / n_b
+        welch_t = mean_diff / np.sqrt(welch_se2_a + welch_se2_b)
+        welch_df = (welch_se2_a + welch_se2_b) ** 2 / (welch_se2_a ** 2 / (n_a - 1) + welch_se2_b ** 2 / (n_b - 1))
+
+        t = np.where(equal_var, pooled_t, welch_t)
+        df = np.where(equal_var, pooled_df, welch_df)
+
+    # Identical configs (zero variance, equal means) cannot be told apart
+    t = np.where(np.isnan(t), 0, t)
+    df = np.where(np.isnan(df), n_a + n_b - 2, df)
+
+    p = 2 * stats.t.sf(np.abs(t), df)
+
+    # Correct the p-values of the unique pairs (upper triangle) and mirror them
+    rows, cols = np.triu_indices(len(mean), k=1)
+    adjusted_p = np.ones_like(p)
+
+    if len(rows):
+        adjusted_p[rows, cols] = adjust_p_values(p[rows, cols], correction)
+        adjusted_p[cols, rows] = adjusted_p[rows, cols]
+
+    result = np.where(adjusted_p < alpha, np.sign(mean_diff), 0).astype(int)
+    np.fill_diagonal(result, 0)
+
+    return {
+        'mean': mean,
+        'variance': var,
+        'observations': n,
+        't': t,
+        'df': df,
+        'p': p,
+        'adjusted_p': adjusted_p,
+        't_critical': stats.t.ppf(1 - alpha / 2, df),
+        'result': result
+    }
+
+
+if __name__ == '__main__':
+    # Optional arguments: store path, output path, alpha and correction method (holm or fdr_bh)
+    args = sys.argv[1:] + [config.fitness_store_path, config.stats_matrix_path, '0.05', 'holm'][len(sys.argv[1:]):]
+    store_path, output_path, alpha, correction = args[0], args[1], float(args[2]), args[3]
+
+    names, fitnesses = load_fitness_store(store_path)
+    comparison = compare_all(fitnesses, alpha, correction)
+
+    # Write the comparison matrices (rows and columns ordered as names)
+    with open(output_path, 'w') as output_file:
+        json.dump(dict([('names', names), ('alpha', alpha), ('correction', correction)] +
+                       [(key, np.asarray(value).tolist()) for key, value in comparison.items()]), output_file)
+
+    # Print a summary of each config's wins and losses
+    for i, name in enumerate(names):
+        print(name + ', mean ' + str(comparison['mean'][i]) + ', better than ' + str(np.sum(comparison['result'][i] == 1)) +
+              ', worse than ' + str(np.sum(comparison['result'][i] == -1)))
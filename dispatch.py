@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import ea.dispatcher as dispatcher_class
+import multiprocessing
+import sys
+
+
+usage = '''Usage:
+    dispatch.py submit <spool directory> <config file> [<config file> ...]
+    dispatch.py work <spool directory> [<number of worker processes>]
+    dispatch.py status <spool directory>'''
+
+
+def work(spool_directory):
+    """Runs a worker process on the spool directory until no jobs are left."""
+    dispatcher_class.Dispatcher(spool_directory).work()
+
+
+if __name__ == '__main__':
+
+    # Process command line arguments
+    if len(sys.argv) < 3 or not sys.argv[1] in ('submit', 'work', 'status') or (sys.argv[1] == 'submit' and len(sys.argv) < 4):
+        print(usage)
+        sys.exit(2)
+
+    command, spool_directory = sys.argv[1:3]
+    dispatcher = dispatcher_class.Dispatcher(spool_directory)
+
+
+    if command == 'submit':
+        # Queue a job per run of each experiment
+        for config_file_path in sys.argv[3:]:
+            print(config_file_path + ': ' + str(dispatcher.submit(config_file_path)) + ' jobs queued')
+
+    elif command == 'work':
+        # Run workers on this host, each claiming jobs until the queue is drained
+        num_workers = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+        processes = [multiprocessing.Process(target=work, args=(spool_directory,)) for _ in range(num_workers)]
+
+        for process in processes:
+            process.start()
+
+        for process in processes:
+            process.join()
+
+    else:
+        # Summarize the queue and the completed runs of each experiment
+        num_queued_jobs, num_leased_jobs, num_completed_jobs = dispatcher.get_status()
+        print('queued: ' + str(num_queued_jobs) + ', leased: ' + str(num_leased_jobs) + ', completed: ' + str(num_completed_jobs))
+
+        experiment_results = {}
+
+        for result in dispatcher.get_results():
+            experiment_results.setdefault((result['config_hash'], result['config_file_path']), []).append(result['best_fitness'])
+
+        for (config_hash, config_file_path), best_fitnesses in sorted(experiment_results.items()):
+            print(config_hash + '\t' + config_file_path + '\truns: ' + str(len(best_fitnesses)) + '\tmean best fitness: ' + str(sum(best_fitnesses) / len(best_fitnesses)) +
+                  '\tmax best fitness: ' + str(max(best_fitnesses)))
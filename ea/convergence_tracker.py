@@ -0,0 +1,143 @@
+import collections
+import math
+
+
+class ConvergenceTracker:
+    def __init__(self, config):
+        """Initializes the ConvergenceTracker class.
+
+        Where config is a Config object. Population statistics are updated in O(1) (amortized) per
+        evaluation:
+            mean, variance: over every fitness of the run (cumulative), the last convergence_window_size
+                fitnesses (window) or exponentially weighted with convergence_ewma_alpha (ewma), as
+                set by convergence_statistics
+            best: best fitness of the last convergence_window_size evaluations (of the run if cumulative)
+            diversity: ratio of distinct genotypes among the last convergence_window_size evaluations
+
+        Each convergence rule (termination and mutation) watches one statistic and counts the
+        evaluations for which it stayed within a relative tolerance of its last changed value.
+        """
+        self.mode = config.settings['convergence_statistics']
+        self.window_size = int(config.settings['convergence_window_size'])
+        self.ewma_alpha = float(config.settings['convergence_ewma_alpha'])
+
+        if not self.mode in ('cumulative', 'window', 'ewma'):
+            raise ValueError('Unknown convergence statistics: ' + self.mode)
+
+        # Statistic and relative tolerance of each rule
+        self.rules = {
+            'termination': (config.settings['termination_convergence_statistic'], float(config.settings['termination_convergence_criterion_magnitude'])),
+            'mutation': (config.settings['mutation_factor_convergence_statistic'], float(config.settings['mutation_factor_criterion_magnitude']))
+        }
+
+        for statistic, _ in self.rules.values():
+            if not statistic in ('mean', 'best', 'variance', 'diversity'):
+                raise ValueError('Unknown convergence statistic: ' + statistic)
+
+        watched_statistics = set([statistic for statistic, _ in self.rules.values()])
+        self.track_window_best = 'best' in watched_statistics and not self.mode == 'cumulative'
+        self.track_diversity = 'diversity' in watched_statistics
+
+        self.num_fitnesses = 0
+        self.fitness_sum = 0
+        self.mean = 0.0
+        self.variance = 0.0
+        self.best = -math.inf
+
+        # Fitnesses of the window (window mode) and its sum of squares
+        self.window_fitnesses = collections.deque()
+        self.window_fitness_square_sum = 0.0
+
+        # Window indices and fitnesses in decreasing order of fitness (the first is the window's best)
+        self.window_best_candidates = collections.deque()
+
+        # Genotypes of the window and the number of times each occurs in it
+        self.window_genotypes = collections.deque()
+        self.window_genotype_counts = collections.Counter()
+
+        self.stale_counts = dict([(rule, 0) for rule in self.rules])
+        self.prev_values = dict([(rule, 0.0) for rule in self.rules])
+
+
+    def add(self, fitness, genotype):
+        """Updates the statistics with the given evaluated genotype and its fitness, then the
+        stale count of each rule.
+        """
+        self.num_fitnesses += 1
+
+        if self.mode == 'cumulative':
+            # Welford's update of the mean and variance
+            self.fitness_sum += fitness
+            prev_mean = self.mean
+            self.mean = self.fitness_sum / self.num_fitnesses
+            self.variance += ((fitness - prev_mean) * (fitness - self.mean) - self.variance) / self.num_fitnesses
+            self.best = max(self.best, fitness)
+
+        elif self.mode == 'window':
+            self.window_fitnesses.append(fitness)
+            self.fitness_sum += fitness
+            self.window_fitness_square_sum += fitness * fitness
+
+            if len(self.window_fitnesses) > self.window_size:
+                old_fitness = self.window_fitnesses.popleft()
+                self.fitness_sum -= old_fitness
+                self.window_fitness_square_sum -= old_fitness * old_fitness
+
+            self.mean = self.fitness_sum / len(self.window_fitnesses)
+            self.variance = max(0.0, self.window_fitness_square_sum / len(self.window_fitnesses) - self.mean * self.mean)
+
+        else:
+            if self.num_fitnesses == 1:
+                self.mean = fitness
+
+            else:
+                # Exponentially weighted mean and variance
+                diff = fitness - self.mean
+                self.mean += self.ewma_alpha * diff
+                self.variance = (1 - self.ewma_alpha) * (self.variance + self.ewma_alpha * diff * diff)
+
+        if self.track_window_best:
+            while self.window_best_candidates and self.window_best_candidates[-1][1] <= fitness:
+                self.window_best_candidates.pop()
+
+            self.window_best_candidates.append((self.num_fitnesses, fitness))
+
+            if self.window_best_candidates[0][0] <= self.num_fitnesses - self.window_size:
+                self.window_best_candidates.popleft()
+
+            self.best = self.window_best_candidates[0][1]
+
+        if self.track_diversity:
+            key = frozenset(genotype.bulbs)
+            self.window_genotypes.append(key)
+            self.window_genotype_counts[key] += 1
+
+            if len(self.window_genotypes) > self.window_size:
+                old_key = self.window_genotypes.popleft()
+                self.window_genotype_counts[old_key] -= 1
+
+                if not self.window_genotype_counts[old_key]:
+                    del self.window_genotype_counts[old_key]
+
+        for rule, (statistic, magnitude) in self.rules.items():
+            value = self.get_statistic(statistic)
+
+            if math.isclose(value, self.prev_values[rule], rel_tol=magnitude):
+                self.stale_counts[rule] += 1
+            else:
+                self.stale_counts[rule] = 0
+                self.prev_values[rule] = value
+
+
+    def get_statistic(self, statistic):
+        """Returns the current value of the given statistic (mean, best, variance or diversity)."""
+        if statistic == 'mean':
+            return self.mean
+
+        if statistic == 'best':
+            return self.best
+
+        if statistic == 'variance':
+            return self.variance
+
+        return len(self.window_genotype_counts) / max(1, len(self.window_genotypes))
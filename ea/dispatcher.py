@@ -0,0 +1,288 @@
+import configparser
+import contextlib
+import ea.ea_driver as ea_driver_class
+import ea.sweep as sweep_class
+import json
+import os
+import random
+import socket
+import threading
+import time
+import util.config as config_class
+
+
+# Seconds a lease stays valid without a heartbeat before its job is re-queued
+default_lease_duration = 600
+
+
+def write_json_atomically(file_path, data):
+    """Writes data as JSON to a temporary file next to file_path, then renames it over file_path,
+    so readers on any host never see a partial file.
+    """
+    tmp_file_path = file_path + '.' + socket.gethostname() + '-' + str(os.getpid()) + '.tmp'
+
+    with open(tmp_file_path, 'w') as tmp_file:
+        json.dump(data, tmp_file, sort_keys=True)
+        tmp_file.flush()
+        os.fsync(tmp_file.fileno())
+
+    os.replace(tmp_file_path, file_path)
+
+
+class Dispatcher:
+    def __init__(self, spool_directory, lease_duration=default_lease_duration, poll_interval=5):
+        """Initializes the Dispatcher class.
+
+        Where spool_directory is a directory shared by every host (e.g. over NFS) holding the work queue:
+            queue:   a JSON file per job waiting to be claimed (see submit)
+            leases:  jobs claimed by a worker, renamed to <job id>.<worker id>.json
+            results: a JSON file per completed job (see run_job)
+            output:  each job's config, log, solution and checkpoint files
+
+        Jobs are claimed by renaming them from queue to leases, which is atomic on a single file system,
+        so each job is claimed by exactly one worker. A worker refreshes its lease's modification time every
+        lease_duration / 3 seconds; a lease not refreshed for lease_duration seconds (e.g. its host died) is
+        re-queued by the next worker looking for a job. Workers poll the queue every poll_interval seconds.
+        """
+        self.spool_directory = spool_directory
+        self.lease_duration = lease_duration
+        self.poll_interval = poll_interval
+
+        self.queue_directory = os.path.join(spool_directory, 'queue')
+        self.lease_directory = os.path.join(spool_directory, 'leases')
+        self.result_directory = os.path.join(spool_directory, 'results')
+        self.output_directory = os.path.join(spool_directory, 'output')
+
+        for directory in (self.queue_directory, self.lease_directory, self.result_directory, self.output_directory):
+            os.makedirs(directory, exist_ok=True)
+
+
+    def get_job_ids(self, directory):
+        """Returns a sorted list of the job ids of the JSON files in the given spool directory."""
+        return sorted([file_name.split('.')[0] for file_name in os.listdir(directory) if file_name.endswith('.json')])
+
+
+    def submit(self, config_file_path, num_runs=None):
+        """Queues a job per run of the experiment configured by config_file_path (num_runs runs, or
+        num_experiment_runs if None).
+
+        Each job holds the config settings themselves, so workers need not see config_file_path, and its
+        run index. Jobs already queued, leased or completed are skipped. Returns the number of jobs queued.
+        """
+        config = config_class.Config(config_file_path)
+        settings = dict(config.settings)
+        config_hash = sweep_class.get_config_hash(settings)
+
+        known_job_ids = set(self.get_job_ids(self.queue_directory) + self.get_job_ids(self.lease_directory) + self.get_job_ids(self.result_directory))
+        num_queued_jobs = 0
+
+        for run_index in range(int(settings['num_experiment_runs']) if num_runs is None else num_runs):
+            job_id = config_hash + '_' + str(run_index)
+
+            if job_id in known_job_ids:
+                continue
+
+            write_json_atomically(os.path.join(self.queue_directory, job_id + '.json'), {
+                'job_id': job_id,
+                'config_hash': config_hash,
+                'config_file_path': config_file_path,
+                'run_index': run_index,
+                'settings': settings
+            })
+            num_queued_jobs += 1
+
+        return num_queued_jobs
+
+
+    def requeue_expired_leases(self):
+        """Moves every lease not refreshed for lease_duration seconds back to the queue (or removes it
+        if its job has completed).
+
+        Note: lease ages compare the file server's modification times to this host's clock, so hosts'
+        clocks should agree to well within lease_duration.
+        """
+        completed_job_ids = set(self.get_job_ids(self.result_directory))
+
+        for file_name in os.listdir(self.lease_directory):
+            lease_file_path = os.path.join(self.lease_directory, file_name)
+            job_id = file_name.split('.')[0]
+
+            # Leases may be renamed by other workers at any point, so each step tolerates a missing file
+            with contextlib.suppress(FileNotFoundError):
+                if time.time() - os.path.getmtime(lease_file_path) < self.lease_duration:
+                    continue
+
+                if job_id in completed_job_ids:
+                    os.remove(lease_file_path)
+                else:
+                    os.rename(lease_file_path, os.path.join(self.queue_directory, job_id + '.json'))
+
+
+    def claim(self, worker_id):
+        """Claims a queued job for the worker with the given id (which must not contain '.').
+
+        Queued jobs that already have a result (e.g. a lease re-queued while its worker was still finishing
+        the run) are removed rather than run again. Returns (job, lease file path), None if the queue is empty.
+        """
+        self.requeue_expired_leases()
+
+        completed_job_ids = set(self.get_job_ids(self.result_directory))
+
+        for job_id in self.get_job_ids(self.queue_directory):
+            queue_file_path = os.path.join(self.queue_directory, job_id + '.json')
+            lease_file_path = os.path.join(self.lease_directory, job_id + '.' + worker_id + '.json')
+
+            if job_id in completed_job_ids:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(queue_file_path)
+
+                continue
+
+            try:
+                # Start the lease's lifetime at the claim: the rename keeps the modification time, so a stale
+                # one would let other workers re-queue the lease as expired right away
+                os.utime(queue_file_path)
+                os.rename(queue_file_path, lease_file_path)
+
+                # The job's result may have been written since the results were listed
+                if os.path.exists(os.path.join(self.result_directory, job_id + '.json')):
+                    os.remove(lease_file_path)
+                    continue
+
+                with open(lease_file_path, 'r') as lease_file:
+                    return json.load(lease_file), lease_file_path
+
+            except FileNotFoundError:
+                # Another worker claimed the job first (or re-queued the lease)
+                continue
+
+        return None
+
+
+    def write_job_config(self, job):
+        """Writes the config of the given job to the output directory: its settings with a single run,
+        output files in the output directory and (with an external seed) a seed offset by the run index.
+
+        Returns the config file path.
+        """
+        settings = dict(job['settings'])
+        job_output_path = os.path.join(self.output_directory, job['job_id'])
+
+        settings['num_experiment_runs'] = '1'
+        settings['log_file_path'] = job_output_path + '_log.txt'
+        settings['soln_file_path'] = job_output_path + '_soln.txt'
+        settings['checkpoint_file_path'] = job_output_path + '_checkpoint.pkl'
+
+        if int(settings['use_external_seed']):
+            settings['seed'] = str(float(settings['seed']) + job['run_index'])
+
+        job_config = configparser.ConfigParser()
+        job_config['DEFAULT'] = settings
+
+        with open(job_output_path + '.cfg', 'w') as config_file:
+            job_config.write(config_file)
+
+        return job_output_path + '.cfg'
+
+
+    def run_job(self, job, lease_file_path, worker_id):
+        """Runs the given claimed job with an EADriver, refreshing its lease until the run completes,
+        and writes the job's result to the results directory.
+
+        A job re-run after its lease expired resumes from its last checkpoint (if checkpointing is configured).
+        Returns the result: a dict of the job's id, config hash, config file path and run index, the run's
+        best fitness, evaluation and generation counts, elapsed time and termination reason, and worker_id.
+        """
+        heartbeat_stopped = threading.Event()
+
+        def refresh_lease():
+            """Refreshes the lease's modification time until the job completes or the lease is lost."""
+            while not heartbeat_stopped.wait(self.lease_duration / 3):
+                try:
+                    os.utime(lease_file_path)
+                except FileNotFoundError:
+                    break
+
+        heartbeat = threading.Thread(target=refresh_lease, daemon=True)
+        heartbeat.start()
+
+        try:
+            config = config_class.Config(self.write_job_config(job))
+
+            # Forked workers share the parent's random state, so reseed each job
+            random.seed(float(config.settings['seed']) if int(config.settings['use_external_seed']) else None)
+
+            # Keep the per-generation output of jobs off the screen
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                ea_driver = ea_driver_class.EADriver(config, resume=True)
+                run_result = ea_driver.run_experiment()[-1]
+                ea_driver.close()
+
+        finally:
+            heartbeat_stopped.set()
+            heartbeat.join()
+
+        result = {
+            'job_id': job['job_id'],
+            'config_hash': job['config_hash'],
+            'config_file_path': job['config_file_path'],
+            'run_index': job['run_index'],
+            'best_fitness': run_result.best_fitness,
+            'eval_count': run_result.eval_count,
+            'generation_count': run_result.generation_count,
+            'elapsed_time': run_result.elapsed_time,
+            'termination_reason': run_result.termination_reason,
+            'worker_id': worker_id
+        }
+
+        write_json_atomically(os.path.join(self.result_directory, job['job_id'] + '.json'), result)
+
+        # The lease is gone if it expired and was re-queued meanwhile
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(lease_file_path)
+
+        return result
+
+
+    def work(self, worker_id=None, exit_when_idle=True):
+        """Claims and runs jobs until the queue is empty and no other worker holds a lease (if
+        exit_when_idle, forever otherwise).
+
+        Where worker_id defaults to the host name and process id. Returns the number of jobs run.
+        """
+        if worker_id is None:
+            worker_id = socket.gethostname().replace('.', '-') + '-' + str(os.getpid())
+
+        num_jobs_run = 0
+
+        while True:
+            claimed_job = self.claim(worker_id)
+
+            if claimed_job:
+                result = self.run_job(claimed_job[0], claimed_job[1], worker_id)
+                num_jobs_run += 1
+
+                print(worker_id + '\t' + result['job_id'] + '\tbest fitness: ' + str(result['best_fitness']) + '\tevaluations: ' + str(result['eval_count']))
+
+            elif exit_when_idle and not os.listdir(self.lease_directory):
+                return num_jobs_run
+
+            else:
+                # Wait for new jobs or for other workers' leases to complete or expire
+                time.sleep(self.poll_interval)
+
+
+    def get_status(self):
+        """Returns (number of queued jobs, number of leased jobs, number of completed jobs)."""
+        return len(self.get_job_ids(self.queue_directory)), len(self.get_job_ids(self.lease_directory)), len(self.get_job_ids(self.result_directory))
+
+
+    def get_results(self):
+        """Returns a list of the results (see run_job) of all completed jobs, in order of job id."""
+        results = []
+
+        for job_id in self.get_job_ids(self.result_directory):
+            with open(os.path.join(self.result_directory, job_id + '.json'), 'r') as result_file:
+                results.append(json.load(result_file))
+
+        return results
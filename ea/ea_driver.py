@@ -1,35 +1,104 @@
-import copy
+import ea.convergence_tracker as convergence_tracker_class
+import ea.generation_event as generation_event_class
 import ea.genotype as genotype_class
+import ea.local_search as local_search_class
 import ea.log as log_class
-import math
+import ea.operator_bandit as operator_bandit_class
+import ea.parallel_evaluator as parallel_evaluator_class
+import ea.run_result as run_result_class
 import puzzle.light_up_puzzle as puzzle_class
+import puzzle.lighting_state as lighting_state_class
+import puzzle.solution_validator as solution_validator_class
+import heapq
+import itertools
 import random
+import time
+import util.checkpoint as checkpoint_file
 import util.seed as seed_class
+import util.solution_store as solution_store_class
 
 
 class EADriver:
-    def __init__(self, config):
+    def __init__(self, config, phenotype=None, write_output=True, resume=False):
         """Initializes the EADriver class.
         
-        Where config is a Config object. 
+        Where config is a Config object. If phenotype (a LightUpPuzzle object) is given, it is
+        used for every run instead of creating a new puzzle per run. If write_output is False,
+        no log or solution files are written. If resume is True and a checkpoint exists at
+        checkpoint_file_path, the experiment continues from it (see run_experiment).
         """
 
         self.config = config
+        self.fixed_phenotype = phenotype
+        self.write_output = write_output
 
         # Initialize the seed class
         self.seed = seed_class.Seed(self.config)
 
         self.population_size = int(self.config.settings['mu'])
         self.offspring_pool_size = int(self.config.settings['lambda'])
+        self.local_search_num_offspring = int(self.config.settings['local_search_num_offspring'])
+
+        # Steady-state mode (see step)
+        self.use_steady_state = int(self.config.settings['use_steady_state'])
+        self.steady_state_batch_size = int(self.config.settings['steady_state_batch_size'])
+        self.steady_state_log_interval = int(self.config.settings['steady_state_log_interval'])
+
+        # Operators adaptive operator selection chooses from (see recombine and mutate)
+        self.crossover_operator_names = [name.strip() for name in self.config.settings['crossover_operators'].split(',') if name.strip()]
+        self.mutation_operator_names = [name.strip() for name in self.config.settings['mutation_operators'].split(',') if name.strip()]
+
+        for name in self.crossover_operator_names:
+            if not name in ('n_point', 'block'):
+                raise ValueError('Unknown crossover operator: ' + name)
+
+        for name in self.mutation_operator_names:
+            if not name in ('shuffle', 'move', 'flip', 'segment_swap'):
+                raise ValueError('Unknown mutation operator: ' + name)
         
         self.run_count = 1
+        self.results = []
+
+        # Checkpointing (see run_experiment)
+        self.checkpoint_interval = int(self.config.settings['checkpoint_interval'])
+        self.checkpoint_file_path = self.config.settings['checkpoint_file_path']
+        self.resuming = False
+
+        # Optional anytime limits (see set_budgets)
+        self.time_budget = None
+        self.eval_budget = None
+        self.target_fitness = None
+        self.stop_requested = False
+
         self.best_fit_global_genotype = genotype_class.Genotype()
         self.best_fit_global_genotype.fitness =  -1 * int(self.config.settings['arbitrary_large_number'])
 
+        # Store of solved boards (if configured)
+        if self.config.settings['solution_store_path']:
+            self.solution_store = solution_store_class.SolutionStore(self.config.settings['solution_store_path'])
+        else:
+            self.solution_store = None
+
+        # Prior solutions seeding the population of each run (see init_run_variables)
+        self.warm_start_solutions = [solution_validator_class.read_solution_file(path.strip())
+                                     for path in self.config.settings['warm_start_soln_file_paths'].split(',') if path.strip()]
+
+        # Evaluate genotypes on worker processes (if configured)
+        if int(self.config.settings['num_evaluation_workers']):
+            self.parallel_evaluator = parallel_evaluator_class.ParallelEvaluator(self.config, int(self.config.settings['num_evaluation_workers']))
+        else:
+            self.parallel_evaluator = None
+
         self.init_run_variables()
 
+        checkpoint = checkpoint_file.read_checkpoint(self.checkpoint_file_path) if resume else None
+
+        if checkpoint:
+            self.restore_checkpoint(checkpoint)
+
         # Initialize the log file class
-        self.log = log_class.Log(self.config, self.seed, self.phenotype, overwrite=True)
+        if self.write_output:
+            self.log = log_class.Log(self.config, self.seed, self.phenotype, overwrite=True, resume_offset=checkpoint['log_offset'] if checkpoint else None)
 
 
     def init_run_variables(self):
@@ -45,19 +114,21 @@ class EADriver:
             bulbs = set([])
 
             # Determine where to place bulbs
-            for black_square in self.phenotype.black_squares:
-                # Get the adjacent coordinates to black_square that are not black
-                adj_coords = [s for s in self.phenotype.get_adj_coords(black_square) if not s in self.phenotype.black_squares]
+            for black_cell in self.phenotype.black_square_cells:
+                # Get the adjacent cells to black_cell that are not black
+                adj_cells = [c for c in self.phenotype.get_adj_cells(black_cell) if self.phenotype.cell_grid[c] == self.phenotype.white_cell_value]
 
-                if self.phenotype.black_squares[black_square] == len(adj_coords):
+                if self.phenotype.cell_grid[black_cell] == len(adj_cells):
                     # There is only one way to place bulbs around this square
                     # Place those bulbs
-                    for coord in adj_coords:
-                        self.phenotype.place_bulb(coord, bulbs)
+                    for cell in adj_cells:
+                        self.phenotype.place_bulb(cell, bulbs)
             
-            # Save bulb placements to each genotype
+            # Save bulb placements to each genotype (all genotypes share the same bulb set until mutated)
+            bulbs = frozenset(bulbs)
+
             for genotype in self.population:
-                genotype.bulbs = copy.deepcopy(bulbs)
+                genotype.set_bulbs(bulbs)
 
 
         def init_puzzles_with_bulbs():
@@ -69,25 +140,100 @@ class EADriver:
                 # Place bulbs until num_bulb_placement_failures failures are reached
                 failure_count = 0
                 while failure_count < int(self.config.settings['num_bulb_placement_failures']):
-                    if not self.phenotype.place_bulb_randomly(self.population[genotype_index].bulbs):
+                    if not self.phenotype.place_bulb_randomly(self.population[genotype_index].get_mutable_bulbs()):
                         failure_count += 1
                     else:
                         break
 
 
+        def init_puzzles_greedily():
+            """Fills each puzzle in population with bulbs, in a random order per genotype, wherever a bulb
+            causes no cross-shine and does not over-fill a black square.
+
+            Starting from each genotype's (forced) bulbs, the candidate cells (see LightUpPuzzle.place_bulb_randomly)
+            are visited once; a cell lit by an earlier bulb shares an occupied segment and is skipped, so
+            each genotype is built in time linear in the size of the board.
+            """
+            for genotype in self.population:
+                state = lighting_state_class.LightingState(self.phenotype, sorted(genotype.bulbs))
+                cells = list(self.phenotype.candidate_cells.cells)
+                random.shuffle(cells)
+
+                for cell in cells:
+                    if not state.lit_counts[cell] and state.can_add_bulb(cell):
+                        state.add_bulb(cell)
+
+                genotype.set_bulbs(state.bulbs)
+                state.release()
+
+
+        def warm_start_population():
+            """Seeds the first warm_start_fraction of population with the prior solutions (see
+            warm_start_soln_file_paths) of this board, then with mutated variants of them.
+
+            Solutions of other boards are ignored.
+            """
+            num_rows, num_cols, black_square_data = self.phenotype.get_board()
+            solutions = [frozenset([x * num_cols + y for x, y in bulbs]) for soln_num_cols, soln_num_rows, soln_black_square_data, _, bulbs in self.warm_start_solutions
+                         if (soln_num_rows, soln_num_cols) == (num_rows, num_cols) and sorted(soln_black_square_data) == sorted(black_square_data)]
+
+            if not solutions:
+                return
+
+            for genotype_index in range(min(len(self.population), round(float(self.config.settings['warm_start_fraction']) * len(self.population)))):
+                genotype = self.population[genotype_index]
+                genotype.set_bulbs(solutions[genotype_index % len(solutions)])
+
+                if genotype_index >= len(solutions):
+                    # Every solution is seeded as is first, then as mutated variants
+                    for _ in range(random.randint(1, int(self.config.settings['rand_num_bulb_shuffles']))):
+                        bulbs = genotype.get_mutable_bulbs()
+
+                        if bulbs:
+                            bulbs.remove(random.choice(sorted(bulbs, key=self.phenotype.get_column_major_key)))
+
+                        self.phenotype.place_bulb_randomly(bulbs)
+
+
         self.eval_count = 0
+        self.local_search_eval_count = 0
+        self.generation_count = 0
+        self.run_start_time = time.perf_counter()
+        self.termination_reason = None
         self.avg_fitness = 0.0
         self.total_fitnesses_seen = 0
         self.total_fitness_sum = 0
-        self.stale_fitness_count_termination = 0
-        self.stale_fitness_count_mutation = 0
-        self.prev_avg_fitness_termination = 0.0
-        self.prev_avg_fitness_mutation = 0.0
+        self.convergence_tracker = convergence_tracker_class.ConvergenceTracker(self.config)
         self.best_fit_local_genotype = genotype_class.Genotype()
         self.best_fit_local_genotype.fitness = -1 * int(self.config.settings['arbitrary_large_number'])
 
         # Create/reset the base puzzle class (phenotype)
-        self.phenotype = puzzle_class.LightUpPuzzle(self.config)
+        if self.fixed_phenotype:
+            self.phenotype = self.fixed_phenotype
+        else:
+            self.phenotype = puzzle_class.LightUpPuzzle(self.config)
+
+        # Solution of the board found in the solution store (see start_run)
+        self.stored_solution = self.phenotype.get_stored_solution(self.solution_store) if self.solution_store else None
+        self.used_stored_solution = False
+
+        # Crossover and mutation operator selection (see recombine and mutate)
+        if int(self.config.settings['use_adaptive_operator_selection']):
+            self.crossover_bandit = operator_bandit_class.OperatorBandit(self.crossover_operator_names, float(self.config.settings['operator_selection_exploration']),
+                                                                         float(self.config.settings['operator_credit_decay']))
+            self.mutation_bandit = operator_bandit_class.OperatorBandit(self.mutation_operator_names, float(self.config.settings['operator_selection_exploration']),
+                                                                        float(self.config.settings['operator_credit_decay']))
+        else:
+            self.crossover_bandit = None
+            self.mutation_bandit = None
+
+        self.child_operator_records = []
+
+        # Local search of the best offspring (see improve_children)
+        self.local_search = local_search_class.LocalSearch(self.config, self.phenotype) if self.local_search_num_offspring else None
+
+        # Best fitness seen so far under each fitness variant (see LightUpPuzzle.get_fitness_variants)
+        self.best_fitness_variants = [-1 * int(self.config.settings['arbitrary_large_number'])] * len(self.phenotype.fitness_variant_names)
 
         # Create/reset the puzzle population: a list genotypes
         self.population = []
@@ -97,33 +243,88 @@ class EADriver:
         self.parents = []
         self.children = []
 
+        # Min-heap of (fitness, serial, population index) entries of the population in steady-state mode,
+        # built on the first step (see insert_children). An entry is stale once its serial no longer
+        # matches population_serials at its index.
+        self.population_heap = None
+        self.population_serials = None
+        self.next_serial = 0
+
         if int(self.config.settings['force_validity']):
             # Use black square adjacency heuristic to force validity
             force_adj_bulbs()
         
-        init_puzzles_with_bulbs()
+        if int(self.config.settings['use_greedy_initialization']):
+            init_puzzles_greedily()
+        else:
+            init_puzzles_with_bulbs()
+
+        if self.warm_start_solutions:
+            warm_start_population()
 
     
     def evaluate(self, genotypes, log_run=True):
         """Evaluates all genotypes in the list genotypes, updating their fitness values, the average 
         fitness value, and the best fitness seen so far.
 
-        If log_run is True, the state of the experiment is written to the log file.
+        If log_run is True, the state of the experiment is written to the log file. With evaluation
+        workers, all genotypes are evaluated in parallel first and then accounted for in order, so
+        the results match a serial evaluation.
         """ 
-        for genotype in genotypes:
-            self.phenotype.get_fitness(genotype)
+        if self.parallel_evaluator:
+            self.parallel_evaluator.set_puzzle(self.phenotype)
+            parallel_results = self.parallel_evaluator.evaluate(genotypes)
+
+        for genotype_index, genotype in enumerate(genotypes):
+            if self.parallel_evaluator:
+                genotype.fitness, repaired_bulbs, fitness_variants = parallel_results[genotype_index]
+
+                if repaired_bulbs is not None:
+                    genotype.set_bulbs(repaired_bulbs)
+
+            else:
+                self.phenotype.get_fitness(genotype)
+                fitness_variants = self.phenotype.fitness_variants
+
+            if fitness_variants:
+                self.best_fitness_variants = [max(best, fitness) for best, fitness in zip(self.best_fitness_variants, fitness_variants)]
 
             # Calculate average fitness
             self.total_fitness_sum += genotype.fitness
             self.total_fitnesses_seen += 1
             self.avg_fitness = self.total_fitness_sum / self.total_fitnesses_seen
 
-            # Determine if this fitness is the new best fitness (both locally and globally)
-            if genotype.fitness > self.best_fit_local_genotype.fitness:
-                self.best_fit_local_genotype = genotype
+            self.update_best_fit_genotypes(genotype)
 
-                if self.best_fit_local_genotype.fitness > self.best_fit_global_genotype.fitness:
-                    self.best_fit_global_genotype = self.best_fit_local_genotype
+
+            # Determine if the population fitness is stagnating
+            self.convergence_tracker.add(genotype.fitness, genotype)
+
+            self.eval_count += 1
+
+            if self.get_stop_reason():
+                # Stop as soon as an anytime limit is reached
+                break
+
+        if log_run and self.write_output:
+            self.log.write_run_data(self.eval_count, self.avg_fitness, self.best_fit_local_genotype.fitness, self.get_extra_log_columns())
+
+
+    def update_best_fit_genotypes(self, genotype):
+        """Makes the given (evaluated) genotype the local and global best fit genotype if its fitness
+        is better, writing the solution files for a new global best.
+        """
+        # Determine if this fitness is the new best fitness (both locally and globally)
+        if genotype.fitness > self.best_fit_local_genotype.fitness:
+            self.best_fit_local_genotype = genotype
+
+            if self.best_fit_local_genotype.fitness > self.best_fit_global_genotype.fitness:
+                self.best_fit_global_genotype = self.best_fit_local_genotype
+
+                if self.write_output:
+                    if self.parallel_evaluator:
+                        # Update the puzzle's shined squares for the solution file
+                        self.phenotype.update_shined_squares(self.best_fit_global_genotype)
 
                     # Write to solution file
                     self.phenotype.write_to_soln_file(self.best_fit_global_genotype.bulbs)
@@ -132,24 +333,61 @@ class EADriver:
                     if int(self.config.settings['visualize_best_solution']):
                         self.phenotype.write_to_soln_visualization_file(self.best_fit_global_genotype.bulbs)
 
-            
-            # Determine if the population fitness is stagnating
-            if math.isclose(self.avg_fitness, self.prev_avg_fitness_termination, rel_tol=float(self.config.settings['termination_convergence_criterion_magnitude'])):
-                self.stale_fitness_count_termination += 1
-            else:
-                self.stale_fitness_count_termination = 0
-                self.prev_avg_fitness_termination = self.avg_fitness
-            
-            if math.isclose(self.avg_fitness, self.prev_avg_fitness_mutation, rel_tol=float(self.config.settings['mutation_factor_criterion_magnitude'])):
-                self.stale_fitness_count_mutation += 1
-            else:
-                self.stale_fitness_count_mutation = 0
-                self.prev_avg_fitness_mutation = self.avg_fitness
-            
-            self.eval_count += 1
 
-        if log_run:
-            self.log.write_run_data(self.eval_count, self.avg_fitness, self.best_fit_local_genotype.fitness)
+    def get_extra_log_columns(self):
+        """Returns the values of the extra columns of each run data line (see Log.write_run_data):
+        the number of local search evaluations and the best fitness of each fitness variant, if enabled.
+        """
+        extra_columns = []
+
+        if self.local_search:
+            extra_columns.append(self.local_search_eval_count)
+
+        if int(self.config.settings['log_fitness_variants']):
+            extra_columns += self.best_fitness_variants
+
+        return extra_columns
+
+
+    def credit_operators(self, evaluation_cpu_time):
+        """Rewards the crossover and mutation operators that produced each child (see recombine and
+        mutate) with the child's fitness gain over its fitter parent, obtained in the CPU time spent
+        applying the operator plus an equal share of evaluation_cpu_time (that of evaluating all children).
+        """
+        evaluation_share = evaluation_cpu_time / max(1, len(self.children))
+
+        for child, (crossover_index, crossover_time, mutation_index, mutation_time, parent_fitness) in zip(self.children, self.child_operator_records):
+            credit = max(0.0, child.fitness - parent_fitness)
+
+            self.crossover_bandit.reward(crossover_index, credit, crossover_time + evaluation_share)
+
+            if not mutation_index is None:
+                self.mutation_bandit.reward(mutation_index, credit, mutation_time + evaluation_share)
+
+
+    def improve_children(self):
+        """Applies local search (see LocalSearch.improve) to the local_search_num_offspring fittest
+        children, re-evaluating those that change.
+
+        Local search evaluations (each neighbour scored, plus each re-evaluation) are counted in
+        local_search_eval_count rather than eval_count. A child whose fitness would drop (e.g. after
+        repair) keeps its original bulbs.
+        """
+        for child in sorted(self.children, key=lambda g : g.fitness, reverse=True)[:self.local_search_num_offspring]:
+            bulbs = child.bulbs
+            fitness = child.fitness
+
+            self.local_search_eval_count += self.local_search.improve(child)
+
+            if not child.bulbs is bulbs:
+                self.phenotype.get_fitness(child)
+                self.local_search_eval_count += 1
+
+                if child.fitness < fitness:
+                    child.set_bulbs(bulbs)
+                    child.fitness = fitness
+
+                self.update_best_fit_genotypes(child)
 
 
     def select_parents(self):
@@ -187,10 +425,33 @@ class EADriver:
             self.parents = self.parents[:parent_population_size]
 
 
-    def recombine(self):
-        """Breeds lambda (offspring_pool_size) children from the existing parent population.
+    def select_steady_state_parents(self):
+        """Chooses two parents per child of a steady-state batch (see steady_state_batch_size) from the
+        population, using the configured parent selection method without building a parent population.
 
-        The resulting children are stored in self.children.
+        The resulting parents are stored in self.parents.
+        """
+        def generate_parents():
+            """Yields parents from the population indefinitely."""
+            while True:
+                if int(self.config.settings['use_uniform_random_parent_selection']):
+                    yield self.population[random.randint(0, len(self.population) - 1)]
+
+                elif int(self.config.settings['use_fitness_proportional_parent_selection']):
+                    yield random.choices(self.population, weights=[float(self.config.settings['fitness_proportional_parent_offset']) + (abs(g.fitness) / float(self.config.settings['fitness_proportional_parent_div'])) for g in self.population])[0]
+
+                else:
+                    yield self.perform_tournament_selection(self.population, int(self.config.settings['k_parent_selection']), w_replacement=True)
+
+        self.parents = list(itertools.islice(generate_parents(), 2 * self.steady_state_batch_size))
+
+
+    def recombine(self, num_children=None):
+        """Breeds num_children (lambda, offspring_pool_size, if None) children from the existing parent population.
+
+        The resulting children are stored in self.children. With adaptive operator selection,
+        each child's crossover operator is chosen by crossover_bandit and recorded (along with
+        its CPU time and the fitness of the fitter parent) in self.child_operator_records.
         """
 
         def breed(parent_a, parent_b):
@@ -199,8 +460,9 @@ class EADriver:
 
             Returns the child genotype.
             """
-            a_bulbs = list(parent_a.bulbs)
-            b_bulbs = list(parent_b.bulbs)
+            # Sort the bulbs so that crossover does not depend on set iteration order
+            a_bulbs = sorted(parent_a.bulbs, key=self.phenotype.get_column_major_key)
+            b_bulbs = sorted(parent_b.bulbs, key=self.phenotype.get_column_major_key)
 
             # Perform a n-point crossover on the parent's bulbs
             n = int(self.config.settings['n_point_crossover'])
@@ -242,20 +504,58 @@ class EADriver:
             return genotype_class.Genotype(child_bulbs)
 
 
+        def breed_block(parent_a, parent_b):
+            """Breeds two parent genotypes together to produce a child genotype using
+            block crossover: the child takes parent_a's bulbs inside a random rectangular
+            block of the board and parent_b's bulbs outside of it.
+
+            Returns the child genotype.
+            """
+            min_x, max_x = sorted([random.randint(0, self.phenotype.num_rows - 1), random.randint(0, self.phenotype.num_rows - 1)])
+            min_y, max_y = sorted([random.randint(0, self.phenotype.num_cols - 1), random.randint(0, self.phenotype.num_cols - 1)])
+
+            def in_block(cell):
+                x, y = divmod(cell, self.phenotype.num_cols)
+                return min_x <= x <= max_x and min_y <= y <= max_y
+
+            return genotype_class.Genotype([c for c in parent_a.bulbs if in_block(c)] + [c for c in parent_b.bulbs if not in_block(c)])
+
+
+        crossover_operators = {
+            'n_point': breed,
+            'block': breed_block
+        }
+
         self.children = []
+        self.child_operator_records = []
 
-        for _ in range(self.offspring_pool_size):
+        for _ in range(self.offspring_pool_size if num_children is None else num_children):
             # Select parents with replacement
             # Note: this implementation allows for parent_a and parent_b to be the same genotype
             parent_a = self.parents[random.randint(0, len(self.parents) - 1)]
             parent_b = self.parents[random.randint(0, len(self.parents) - 1)]
 
             # Produce a child
-            self.children.append(breed(parent_a, parent_b))
+            if self.crossover_bandit:
+                operator_index = self.crossover_bandit.select()
+                start_time = time.process_time()
+
+                self.children.append(crossover_operators[self.crossover_operator_names[operator_index]](parent_a, parent_b))
+
+                # [crossover operator, its CPU time, mutation operator (if any), its CPU time, fitness of the fitter parent]
+                self.child_operator_records.append([operator_index, time.process_time() - start_time, None, 0.0, max(parent_a.fitness, parent_b.fitness)])
+
+            else:
+                self.children.append(breed(parent_a, parent_b))
         
     
     def mutate(self):
-        """Probabilistically performs mutation on each child in the child population."""
+        """Probabilistically performs mutation on each child in the child population.
+
+        With adaptive operator selection, the mutation operator of each mutated child is chosen
+        by mutation_bandit (and recorded in self.child_operator_records), otherwise bulbs are
+        shuffled.
+        """
 
         def shuffle_bulb(child):
             """Attempts to move the placement of a random bulb to a random position in a given
@@ -265,31 +565,91 @@ class EADriver:
             """
             if random.random() < mutation_probability:
                 for _ in range(int(self.config.settings['num_bulb_removals_mutation'])):
-                    try:
-                        child.bulbs.pop()
-                    except:
+                    bulbs = child.get_mutable_bulbs()
+
+                    if not bulbs:
                         # The bulbs set is empty
                         break
+
+                    # Remove a random bulb (chosen independently of set iteration order)
+                    bulbs.remove(random.choice(sorted(bulbs, key=self.phenotype.get_column_major_key)))
             
             fail_count = 0
             while fail_count < int(self.config.settings['num_bulb_placement_failures_mutation']):
-                if self.phenotype.place_bulb_randomly(child.bulbs):
+                if self.phenotype.place_bulb_randomly(child.get_mutable_bulbs()):
                     break
                 else:
                     fail_count += 1
 
 
+        def move_bulb(child):
+            """Moves a random bulb of the given child genotype to a random adjacent white cell without a bulb (if any)."""
+            bulbs = child.get_mutable_bulbs()
+
+            if bulbs:
+                bulb = random.choice(sorted(bulbs, key=self.phenotype.get_column_major_key))
+                adj_cells = [c for c in self.phenotype.get_adj_cells(bulb) if self.phenotype.cell_grid[c] == self.phenotype.white_cell_value and not c in bulbs]
+
+                if adj_cells:
+                    bulbs.remove(bulb)
+                    bulbs.add(random.choice(adj_cells))
+
+
+        def flip_cell(child):
+            """Toggles the bulb of a random candidate cell (see LightUpPuzzle.candidate_cells) of the given child genotype."""
+            bulbs = child.get_mutable_bulbs()
+            cell = self.phenotype.candidate_cells.draw()
+
+            if cell in bulbs:
+                bulbs.remove(cell)
+            else:
+                bulbs.add(cell)
+
+
+        def swap_in_segment(child):
+            """Moves a random bulb of the given child genotype to a random cell without a bulb in its
+            row or column segment (the cells it lights).
+            """
+            bulbs = child.get_mutable_bulbs()
+
+            if bulbs:
+                bulb = random.choice(sorted(bulbs, key=self.phenotype.get_column_major_key))
+                segment = random.choice([self.phenotype.cell_row_segments[bulb], self.phenotype.cell_col_segments[bulb]])
+                cells = [c for c in self.phenotype.get_segment_cells(segment) if not c in bulbs]
+
+                if cells:
+                    bulbs.remove(bulb)
+                    bulbs.add(random.choice(cells))
+
+
+        mutation_operators = {
+            'shuffle': shuffle_bulb,
+            'move': move_bulb,
+            'flip': flip_cell,
+            'segment_swap': swap_in_segment
+        }
+
         mutation_probability = float(self.config.settings['mutation_probability'])
 
         # Determine if the stagnant population fitness requires more mutation
-        if self.stale_fitness_count_mutation >= int(self.config.settings['mutation_factor_criterion']):
-            # There has been no change in average fitness for too long
+        if self.convergence_tracker.stale_counts['mutation'] >= int(self.config.settings['mutation_factor_criterion']):
+            # There has been no change in the watched fitness statistic for too long
             mutation_probability *= float(self.config.settings['mutation_scale_factor'])
 
-        for child in self.children:
+        for child_index, child in enumerate(self.children):
             if random.random() < mutation_probability:
+                if self.mutation_bandit:
+                    operator_index = self.mutation_bandit.select()
+                    operator = mutation_operators[self.mutation_operator_names[operator_index]]
+                    start_time = time.process_time()
+                else:
+                    operator = shuffle_bulb
+
                 for i in range(random.randint(1, int(self.config.settings['rand_num_bulb_shuffles']))):
-                    shuffle_bulb(child)
+                    operator(child)
+
+                if self.mutation_bandit:
+                    self.child_operator_records[child_index][2:4] = [operator_index, time.process_time() - start_time]
 
 
     def select_for_survival(self):
@@ -344,24 +704,357 @@ class EADriver:
             self.population = self.population[:self.population_size]
 
 
+    def insert_children(self):
+        """Inserts each child of self.children into the population in steady-state mode, replacing the
+        least fit genotype (or, with use_steady_state_tournament_replacement, the loser of a
+        k_steady_state_replacement tournament) if the child is at least as fit.
+
+        The least fit genotype is found through population_heap in O(log mu), so the population is
+        never sorted or rebuilt.
+        """
+        def push_genotype(population_index):
+            """Gives the genotype at population_index a new serial and pushes its heap entry."""
+            self.population_serials[population_index] = self.next_serial
+            heapq.heappush(self.population_heap, (self.population[population_index].fitness, self.next_serial, population_index))
+            self.next_serial += 1
+
+
+        if self.population_heap is None or len(self.population_heap) > 2 * len(self.population):
+            # Build the heap (or drop its stale entries)
+            self.population_serials = list(range(self.next_serial, self.next_serial + len(self.population)))
+            self.next_serial += len(self.population)
+            self.population_heap = [(g.fitness, serial, i) for i, (g, serial) in enumerate(zip(self.population, self.population_serials))]
+            heapq.heapify(self.population_heap)
+
+        for child in self.children:
+            if int(self.config.settings['use_steady_state_tournament_replacement']):
+                arena_indices = random.sample(range(len(self.population)), min(len(self.population), int(self.config.settings['k_steady_state_replacement'])))
+                population_index = min(arena_indices, key=lambda i : self.population[i].fitness)
+
+            else:
+                # Discard stale entries until the least fit genotype is on top
+                while self.population_heap[0][1] != self.population_serials[self.population_heap[0][2]]:
+                    heapq.heappop(self.population_heap)
+
+                population_index = self.population_heap[0][2]
+
+            if child.fitness >= self.population[population_index].fitness:
+                self.population[population_index] = child
+                push_genotype(population_index)
+
+
+    def run(self):
+        """Runs the current run as a generator.
+
+        A GenerationEvent object is yielded after the initial population is evaluated and after
+        each generation. The consumer may stop the run early by no longer iterating. The final
+        RunResult object is the generator's return value (and is available from get_result).
+        """
+        if self.resuming:
+            # Continue the restored run where its checkpoint was taken
+            self.resuming = False
+
+        else:
+            generation_start_time = time.perf_counter()
+            self.start_run()
+            yield generation_event_class.GenerationEvent(self, time.perf_counter() - generation_start_time)
+
+        while not self.decide_termination():
+            generation_start_time = time.perf_counter()
+            self.step()
+            yield generation_event_class.GenerationEvent(self, time.perf_counter() - generation_start_time)
+
+        if self.use_steady_state and self.write_output and self.eval_count % self.steady_state_log_interval:
+            # Log the run's final state between two log intervals
+            self.log.write_run_data(self.eval_count, self.avg_fitness, self.best_fit_local_genotype.fitness, self.get_extra_log_columns())
+
+        if self.crossover_bandit and self.write_output:
+            self.log.write_operator_stats('crossover', self.crossover_bandit.get_stats())
+            self.log.write_operator_stats('mutation', self.mutation_bandit.get_stats())
+
+        if self.solution_store and not self.used_stored_solution:
+            # Keep the run's best solution for later runs on the same board
+            self.phenotype.store_solution(self.solution_store, self.best_fit_local_genotype)
+
+        return self.get_result()
+
+
+    def run_experiment(self):
+        """Runs num_experiment_runs runs.
+
+        If checkpoint_interval is set, a checkpoint is written every checkpoint_interval
+        generations and removed once the experiment completes. An experiment restored from
+        a checkpoint (see __init__) continues exactly where the checkpoint was taken.
+
+        Returns a list of the RunResult objects of each run.
+        """
+        if not self.resuming:
+            self.results = []
+
+        while self.run_count <= int(self.config.settings['num_experiment_runs']):
+            for _ in self.run():
+                if self.checkpoint_interval and self.generation_count and not self.generation_count % self.checkpoint_interval:
+                    self.write_checkpoint()
+
+            self.results.append(self.get_result())
+
+            self.init_run_variables()
+            self.increment_run_count()
+
+        if self.checkpoint_interval:
+            checkpoint_file.remove_checkpoint(self.checkpoint_file_path)
+
+        return self.results
+
+
+    def get_checkpoint(self):
+        """Returns a picklable snapshot of the experiment between two generations.
+
+        The population is stored as bulb bitmasks (see LightUpPuzzle.get_bitmask) and fitnesses
+        along with the run's counters and convergence statistics, the best genotypes, the results
+        of completed runs, the random number generator state and the log file offset.
+        """
+        return {
+            'run_count': self.run_count,
+            'results': self.results,
+            'board': self.phenotype.get_board(),
+            'population_bitmasks': [self.phenotype.get_bitmask(g.bulbs) for g in self.population],
+            'population_fitnesses': [g.fitness for g in self.population],
+            'best_fit_local_genotype': self.best_fit_local_genotype,
+            # The global best may belong to an earlier run's board, so it is stored as is
+            'best_fit_global_genotype': self.best_fit_global_genotype,
+            'eval_count': self.eval_count,
+            'local_search_eval_count': self.local_search_eval_count,
+            'generation_count': self.generation_count,
+            'elapsed_time': self.get_elapsed_time(),
+            'avg_fitness': self.avg_fitness,
+            'total_fitnesses_seen': self.total_fitnesses_seen,
+            'total_fitness_sum': self.total_fitness_sum,
+            'convergence_tracker': self.convergence_tracker,
+            'crossover_bandit': self.crossover_bandit,
+            'mutation_bandit': self.mutation_bandit,
+            'population_heap': self.population_heap,
+            'population_serials': self.population_serials,
+            'next_serial': self.next_serial,
+            'best_fitness_variants': self.best_fitness_variants,
+            'random_state': random.getstate(),
+            'log_offset': self.log.get_offset() if self.write_output else None
+        }
+
+
+    def write_checkpoint(self):
+        """Atomically writes a checkpoint (see get_checkpoint) to checkpoint_file_path."""
+        checkpoint_file.write_checkpoint(self.checkpoint_file_path, self.get_checkpoint())
+
+
+    def restore_checkpoint(self, checkpoint):
+        """Restores the experiment from the given checkpoint (see get_checkpoint).
+
+        The next call to run continues the restored run instead of starting a new one.
+        """
+        if not self.fixed_phenotype:
+            self.phenotype = puzzle_class.LightUpPuzzle(self.config, checkpoint['board'])
+
+            if self.local_search:
+                self.local_search = local_search_class.LocalSearch(self.config, self.phenotype)
+
+        self.population = []
+
+        for bitmask, fitness in zip(checkpoint['population_bitmasks'], checkpoint['population_fitnesses']):
+            genotype = genotype_class.Genotype(self.phenotype.get_bulbs(bitmask))
+            genotype.fitness = fitness
+            self.population.append(genotype)
+
+        for key in ('run_count', 'results', 'best_fit_local_genotype', 'best_fit_global_genotype', 'eval_count', 'local_search_eval_count', 'generation_count',
+                    'avg_fitness', 'total_fitnesses_seen', 'total_fitness_sum', 'convergence_tracker', 'best_fitness_variants',
+                    'crossover_bandit', 'mutation_bandit', 'population_heap', 'population_serials', 'next_serial'):
+            setattr(self, key, checkpoint[key])
+
+        self.run_start_time = time.perf_counter() - checkpoint['elapsed_time']
+        random.setstate(checkpoint['random_state'])
+
+        self.resuming = True
+
+
+    def close(self):
+        """Closes the log file (if any), stops the evaluation workers (if any) and closes the solution store (if any)."""
+        if self.write_output:
+            self.log.close()
+
+        if self.parallel_evaluator:
+            self.parallel_evaluator.close()
+
+        if self.solution_store:
+            self.solution_store.close()
+
+
+    def start_run(self):
+        """Starts the current run by writing its header and evaluating the initial population.
+
+        If the board has a stored solution of at least stored_solution_min_fitness, only that
+        solution is evaluated and the run ends immediately.
+        """
+        self.run_start_time = time.perf_counter()
+
+        if self.write_output:
+            self.log.write_run_header(self.run_count)
+
+        if self.stored_solution and self.stored_solution[1] >= float(self.config.settings['stored_solution_min_fitness']):
+            # The board (or a rotated or reflected variant of it) was solved before
+            self.used_stored_solution = True
+            self.evaluate([genotype_class.Genotype(self.stored_solution[0])])
+            return
+
+        self.evaluate(self.population)
+
+
+    def step(self):
+        """Performs a single generation: parent selection, recombination, mutation,
+        evaluation and survival selection.
+
+        In steady-state mode (use_steady_state), a generation is a batch of steady_state_batch_size
+        children that are inserted into the population (see insert_children) instead of survival
+        selection, and the run is logged every steady_state_log_interval evaluations.
+        """
+        prev_eval_count = self.eval_count
+
+        if self.use_steady_state:
+            self.select_steady_state_parents()
+            self.recombine(self.steady_state_batch_size)
+        else:
+            self.select_parents()
+            self.recombine()
+
+        self.mutate()
+
+        if self.crossover_bandit:
+            # Evaluation runs on the workers (if any), so its cost is measured in wall-clock time
+            clock = time.perf_counter if self.parallel_evaluator else time.process_time
+            start_time = clock()
+
+            self.evaluate(self.children, log_run=not self.use_steady_state)
+
+            self.credit_operators(clock() - start_time)
+
+        else:
+            self.evaluate(self.children, log_run=not self.use_steady_state)
+
+        if self.local_search:
+            self.improve_children()
+
+        if self.use_steady_state:
+            self.insert_children()
+
+            if self.write_output and self.eval_count // self.steady_state_log_interval > prev_eval_count // self.steady_state_log_interval:
+                self.log.write_run_data(self.eval_count, self.avg_fitness, self.best_fit_local_genotype.fitness, self.get_extra_log_columns())
+
+        else:
+            self.select_for_survival()
+
+        self.generation_count += 1
+
+
+    def set_budgets(self, time_budget=None, eval_budget=None, target_fitness=None):
+        """Sets the anytime limits of each run.
+
+        Where time_budget is in seconds of wall-clock time per run, eval_budget is the maximum
+        number of evaluations per run and target_fitness is the fitness at which a run stops.
+        Limits that are None are not enforced.
+        """
+        self.time_budget = time_budget
+        self.eval_budget = eval_budget
+        self.target_fitness = target_fitness
+
+
+    def request_stop(self):
+        """Requests that the current run stops after the evaluation in progress (e.g. on SIGINT)."""
+        self.stop_requested = True
+
+
+    def get_stop_reason(self):
+        """Returns the reason the current run must stop because of an anytime limit, None otherwise."""
+        if self.stop_requested:
+            return 'interrupted'
+
+        if self.used_stored_solution:
+            return 'stored_solution'
+
+        if self.target_fitness is not None and self.best_fit_local_genotype.fitness >= self.target_fitness:
+            return 'target_fitness'
+
+        if self.eval_budget is not None and self.eval_count >= self.eval_budget:
+            return 'eval_budget'
+
+        if self.time_budget is not None and self.get_elapsed_time() >= self.time_budget:
+            return 'time_budget'
+
+        return None
+
+
     def decide_termination(self):
         """Returns True if the program will terminate, False otherwise.
 
         The program will terminate if any of the following conditions are True:
-            1. There has been no change in fitness (average fitness) for n evaluations.
-            2. The number of evaluations specified in config has been reached.
+            1. An anytime limit (see set_budgets) has been reached or a stop has been requested.
+            2. There has been no change in the watched fitness statistic (see ConvergenceTracker) for n evaluations.
+            3. The number of evaluations specified in config has been reached.
+
+        The reason for terminating is stored in self.termination_reason.
         """
-        if self.stale_fitness_count_termination >= int(self.config.settings['n_termination_convergence_criterion']):
-            # There has been no change in average fitness for too long
+        self.termination_reason = self.get_stop_reason()
+
+        if self.termination_reason:
+            return True
+
+        if self.convergence_tracker.stale_counts['termination'] >= int(self.config.settings['n_termination_convergence_criterion']):
+            # There has been no change in the watched fitness statistic for too long
+            self.termination_reason = 'convergence'
             return True
 
         if self.eval_count >= int(self.config.settings['num_fitness_evaluations']):
             # The number of desired evaluations has been reached
+            self.termination_reason = 'num_fitness_evaluations'
             return True
 
         return False
 
 
+    def get_elapsed_time(self):
+        """Returns the wall-clock time (in seconds) since the current run started."""
+        return time.perf_counter() - self.run_start_time
+
+
+    def get_result(self):
+        """Returns a RunResult object describing the current run so far."""
+        return run_result_class.RunResult(self)
+
+
+    def get_migrants(self, num_migrants):
+        """Returns a list of the num_migrants most fit genotypes in the population."""
+        return sorted(self.population, key=lambda x : x.fitness, reverse=True)[:num_migrants]
+
+
+    def integrate_immigrants(self, bulb_sets):
+        """Replaces the least fit genotypes in the population with genotypes built from the
+        given list of bulb sets.
+
+        Immigrants are re-evaluated because their source population may use a different
+        fitness function.
+        """
+        immigrants = [genotype_class.Genotype(bulbs) for bulbs in bulb_sets[:self.population_size]]
+
+        if not immigrants:
+            return
+
+        self.evaluate(immigrants, log_run=False)
+
+        self.sort_genotypes(self.population)
+        self.population[len(self.population) - len(immigrants):] = immigrants
+
+        # The population order changed, so the steady-state heap is rebuilt on the next step
+        self.population_heap = None
+
+
     def sort_genotypes(self, genotype_list):
         """Sorts the given genotype list from most fit to least fit by each
         element's fitness ratio.
@@ -0,0 +1,16 @@
+class GenerationEvent:
+    __slots__ = ('run_count', 'generation_count', 'eval_count', 'avg_fitness', 'best_fitness', 'generation_time', 'elapsed_time')
+
+    def __init__(self, ea_driver, generation_time):
+        """Initializes the GenerationEvent class.
+
+        Where ea_driver is the EADriver object that just finished a generation and generation_time
+        is the wall-clock time (in seconds) that generation took.
+        """
+        self.run_count = ea_driver.run_count
+        self.generation_count = ea_driver.generation_count
+        self.eval_count = ea_driver.eval_count
+        self.avg_fitness = ea_driver.avg_fitness
+        self.best_fitness = ea_driver.best_fit_local_genotype.fitness
+        self.generation_time = generation_time
+        self.elapsed_time = ea_driver.get_elapsed_time()
@@ -1,12 +1,27 @@
-import copy
-
-
 class Genotype:
+    __slots__ = ('bulbs', 'owns_bulbs', 'fitness')
+
     def __init__(self, bulbs=None):
-        """Initializes the Genotype class."""
-        if bulbs:
-            self.bulbs = copy.deepcopy(bulbs)
-        else:
-            self.bulbs = set([])
+        """Initializes the Genotype class.
+
+        The given bulb set is stored as a frozenset and shared with any genotype built from it.
+        A private copy is only made when the genotype is mutated (see get_mutable_bulbs).
+        """
+        self.set_bulbs(bulbs if bulbs else frozenset())
 
         self.fitness = 0.0
+
+
+    def set_bulbs(self, bulbs):
+        """Replaces the genotype's bulbs with the given set of bulb cells (x * num_cols + y; shared, not copied, if it is a frozenset)."""
+        self.bulbs = frozenset(bulbs)
+        self.owns_bulbs = False
+
+
+    def get_mutable_bulbs(self):
+        """Returns the genotype's set of bulbs for modification, copying it first if it is shared."""
+        if not self.owns_bulbs:
+            self.bulbs = set(self.bulbs)
+            self.owns_bulbs = True
+
+        return self.bulbs
@@ -0,0 +1,213 @@
+import ea.ea_driver as ea_driver_class
+import ea.genotype as genotype_class
+import ea.log as log_class
+import multiprocessing
+import puzzle.light_up_puzzle as puzzle_class
+import random
+import util.config as config_class
+import util.seed as seed_class
+
+
+def send_report(conn, ea_driver, num_migrants, terminated):
+    """Sends the island's progress, best local genotype and migrants over conn (see run_island)."""
+    phenotype = ea_driver.phenotype
+    migrants = [phenotype.get_bitmask(g.bulbs) for g in ea_driver.get_migrants(num_migrants)]
+    best_fit_local_bitmask = phenotype.get_bitmask(ea_driver.best_fit_local_genotype.bulbs)
+
+    conn.send((ea_driver.eval_count, ea_driver.avg_fitness, ea_driver.best_fit_local_genotype.fitness, best_fit_local_bitmask, migrants, terminated))
+
+
+def run_island(conn, config_file_path, island_index, seed_val, migration_interval, num_migrants):
+    """Runs a single island (an EADriver population) in a worker process.
+
+    The island waits on conn for ('start', board) or ('stop',) messages. After every
+    migration_interval generations, and when the island terminates, it sends a report of
+    (eval_count, average fitness, best local fitness, best local bitmask, migrant bitmasks, terminated) and,
+    unless terminated, waits for a ('migrate', immigrant bitmasks) reply.
+    """
+    # Give each island its own random stream
+    random.seed(seed_val + island_index)
+
+    config = config_class.Config(config_file_path)
+
+    while True:
+        message = conn.recv()
+
+        if message[0] == 'stop':
+            break
+
+        phenotype = puzzle_class.LightUpPuzzle(config, message[1])
+        ea_driver = ea_driver_class.EADriver(config, phenotype, write_output=False)
+
+        # Stop the island config's evaluation workers and close its solution store (if any) after each run
+        try:
+            for event in ea_driver.run():
+                if event.generation_count and event.generation_count % migration_interval == 0:
+                    send_report(conn, ea_driver, num_migrants, False)
+
+                    immigrants = conn.recv()[1]
+                    ea_driver.integrate_immigrants([phenotype.get_bulbs(b) for b in immigrants])
+
+            send_report(conn, ea_driver, num_migrants, True)
+
+        finally:
+            ea_driver.close()
+
+    conn.close()
+
+
+class IslandModel:
+    def __init__(self, config):
+        """Initializes the IslandModel class.
+
+        Where config is a Config object. Each island is an independent EADriver population
+        running in its own process, configured by one of the config files listed in
+        island_config_file_paths (or by config itself if none are listed).
+        """
+        self.config = config
+
+        # Initialize the seed class
+        self.seed = seed_class.Seed(self.config)
+
+        self.num_islands = int(self.config.settings['num_islands'])
+        self.migration_interval = int(self.config.settings['migration_interval'])
+        self.num_migrants = int(self.config.settings['num_migrants'])
+        self.migration_topology = self.config.settings['migration_topology']
+
+        if not self.migration_topology in ('ring', 'fully_connected'):
+            raise ValueError('Unknown migration topology: ' + self.migration_topology)
+
+        # Assign a config file to each island, cycling through the listed files
+        island_config_file_paths = [p.strip() for p in self.config.settings['island_config_file_paths'].split(',') if p.strip()]
+
+        if not island_config_file_paths:
+            island_config_file_paths = [self.config.file_path]
+
+        self.island_config_file_paths = [island_config_file_paths[i % len(island_config_file_paths)] for i in range(self.num_islands)]
+
+        self.run_count = 1
+        self.best_fit_global_fitness = -1 * int(self.config.settings['arbitrary_large_number'])
+
+        # All islands share the same puzzle (phenotype)
+        self.phenotype = puzzle_class.LightUpPuzzle(self.config)
+
+        # Initialize the log file class
+        self.log = log_class.Log(self.config, self.seed, self.phenotype, overwrite=True)
+
+
+    def get_neighbors(self, island_index):
+        """Returns a list of the island indices that island_index sends migrants to."""
+        if self.migration_topology == 'ring':
+            return [(island_index + 1) % self.num_islands]
+
+        # Fully connected topology
+        return [i for i in range(self.num_islands) if not i == island_index]
+
+
+    def run(self):
+        """Runs num_experiment_runs runs of the island model EA.
+
+        Each run, every island reports its progress on each migration, which is written to the log
+        along with the combined run data (total evaluations, mean average fitness and best fitness
+        across all islands). The global best solution is written to the solution file.
+        """
+        connections = []
+        processes = []
+
+        for island_index in range(self.num_islands):
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=run_island, args=(child_conn, self.island_config_file_paths[island_index], island_index,
+                                                                      self.seed.val, self.migration_interval, self.num_migrants))
+            process.start()
+
+            connections.append(parent_conn)
+            processes.append(process)
+
+        try:
+            while self.run_count <= int(self.config.settings['num_experiment_runs']):
+                self.log.write_run_header(self.run_count)
+                self.run_islands(connections)
+
+                # Create a new puzzle for the next run
+                self.phenotype = puzzle_class.LightUpPuzzle(self.config)
+                self.run_count += 1
+
+        finally:
+            for conn in connections:
+                conn.send(('stop',))
+
+            for process in processes:
+                process.join()
+
+            self.log.close()
+
+
+    def run_islands(self, connections):
+        """Runs a single run of the island model EA over the islands connected by connections."""
+        board = self.phenotype.get_board()
+
+        for conn in connections:
+            conn.send(('start', board))
+
+        active_islands = set(range(self.num_islands))
+        eval_counts = [0] * self.num_islands
+        avg_fitnesses = [0.0] * self.num_islands
+        best_fit_local_fitness = -1 * int(self.config.settings['arbitrary_large_number'])
+
+        # Each island's last reported best bitmask and its fitness under the base config (see evaluate_with_base_config)
+        best_genotypes = [(None, None)] * self.num_islands
+
+        while active_islands:
+            immigrants = [[] for _ in range(self.num_islands)]
+
+            for island_index in sorted(active_islands):
+                eval_count, avg_fitness, best_fitness, best_bitmask, migrants, terminated = connections[island_index].recv()
+
+                eval_counts[island_index] = eval_count
+                avg_fitnesses[island_index] = avg_fitness
+                self.log.write_island_data(island_index, eval_count, avg_fitness, best_fitness)
+
+                # Islands may use different fitness functions, so their best genotypes are compared under the base config
+                if not best_genotypes[island_index][0] == best_bitmask:
+                    best_genotypes[island_index] = (best_bitmask, self.evaluate_with_base_config(best_bitmask))
+
+                genotype = best_genotypes[island_index][1]
+
+                if genotype.fitness > best_fit_local_fitness:
+                    best_fit_local_fitness = genotype.fitness
+
+                    if genotype.fitness > self.best_fit_global_fitness:
+                        self.best_fit_global_fitness = genotype.fitness
+                        self.write_solution(genotype)
+
+                # Send this island's migrants to its neighbors
+                for neighbor_index in self.get_neighbors(island_index):
+                    immigrants[neighbor_index] += migrants
+
+                if terminated:
+                    active_islands.remove(island_index)
+
+            self.log.write_run_data(sum(eval_counts), sum(avg_fitnesses) / self.num_islands, best_fit_local_fitness)
+
+            for island_index in active_islands:
+                connections[island_index].send(('migrate', immigrants[island_index]))
+
+
+    def evaluate_with_base_config(self, bitmask):
+        """Returns the genotype packed into bitmask, evaluated with the base config's fitness function
+        (which may repair it) so that the best genotypes of differently configured islands are comparable.
+        """
+        genotype = genotype_class.Genotype(self.phenotype.get_bulbs(bitmask))
+        self.phenotype.get_fitness(genotype)
+
+        return genotype
+
+
+    def write_solution(self, genotype):
+        """Writes the given genotype to the solution file (and visualization file, if configured)."""
+        # Update the puzzle's shined squares for the solution file
+        self.phenotype.update_shined_squares(genotype)
+        self.phenotype.write_to_soln_file(genotype.bulbs)
+
+        if int(self.config.settings['visualize_best_solution']):
+            self.phenotype.write_to_soln_visualization_file(genotype.bulbs)
@@ -0,0 +1,185 @@
+import array
+import puzzle.cell_sampler as cell_sampler_class
+import puzzle.lighting_state as lighting_state_class
+
+
+class LocalSearch:
+    def __init__(self, config, puzzle):
+        """Initializes the LocalSearch class.
+
+        Where config is a Config object and puzzle is the LightUpPuzzle object whose genotypes
+        are improved. Neighbours are scored incrementally on a LightingState, so each one costs
+        only the row and column segments of the bulbs it adds or removes.
+        """
+        self.config = config
+        self.puzzle = puzzle
+        self.move_budget = int(self.config.settings['local_search_move_budget'])
+        self.use_penalty_function = int(self.config.settings['use_penalty_function'])
+        self.penalty_coefficient = float(self.config.settings['penalty_coefficient'])
+
+        # Directions a bulb may move in, as (row offset, column offset)
+        self.directions = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+        # Moves are indexed by cell * move_stride + move kind: adding a bulb (0), removing it (1) or
+        # moving it in one of the directions (2 onwards)
+        self.move_stride = 2 + len(self.directions)
+
+        # White cell next to each white cell in each direction, indexed by cell * len(directions) + direction
+        # (-1 if there is none)
+        self.adj_cells = array.array('l', [-1]) * (puzzle.num_rows * puzzle.num_cols * len(self.directions))
+        white_cells = [cell for cell, value in enumerate(puzzle.cell_grid) if value == puzzle.white_cell_value]
+
+        for cell in white_cells:
+            x, y = divmod(cell, puzzle.num_cols)
+
+            for direction, (dx, dy) in enumerate(self.directions):
+                adj_cell = (x + dx) * puzzle.num_cols + y + dy
+
+                if 0 <= x + dx < puzzle.num_rows and 0 <= y + dy < puzzle.num_cols and puzzle.cell_grid[adj_cell] == puzzle.white_cell_value:
+                    self.adj_cells[cell * len(self.directions) + direction] = adj_cell
+
+        # Pool of the moves available from the current state (see update_moves), which is that of an empty
+        # board between calls to improve: adding a bulb to any white cell
+        self.moves = cell_sampler_class.CellSampler(puzzle.num_rows * puzzle.num_cols * self.move_stride, [cell * self.move_stride for cell in white_cells])
+
+
+    def get_score(self, state):
+        """Returns the score of the given LightingState (higher is better).
+
+        With the penalty function, this is the penalized number of lit cells. Otherwise (repair
+        and vanilla fitness) constraint violations are minimized first and lit cells maximized
+        second, so the search heads for valid genotypes.
+        """
+        num_violations = state.bulb_on_bulb_shine_count + state.invalid_black_cell_constraint_count
+
+        if self.use_penalty_function:
+            return (state.num_lit_cells - self.penalty_coefficient * num_violations, 0)
+
+        return (-num_violations, state.num_lit_cells)
+
+
+    def update_moves(self, state, changed_cells):
+        """Updates the move pool after bulbs were added to or removed from the given cells of the given
+        LightingState: adding a bulb to an unlit cell, removing a bulb, or moving a bulb to an adjacent
+        white cell without a bulb.
+
+        Only the cells of the changed cells' row and column segments (whose lit counts changed) and the
+        changed cells' neighbours are visited, so an update costs no more than the move itself.
+        """
+        def set_move(move, is_available):
+            if is_available:
+                self.moves.add(move)
+            else:
+                self.moves.remove(move)
+
+        lit_changed_cells = set([])
+        bulb_changed_cells = set([])
+
+        for cell in changed_cells:
+            for segment in (self.puzzle.cell_row_segments[cell], self.puzzle.cell_col_segments[cell]):
+                lit_changed_cells.update(self.puzzle.get_segment_cells(segment))
+
+            bulb_changed_cells.add(cell)
+            bulb_changed_cells.update([adj_cell for adj_cell in self.get_adj_cells(cell) if adj_cell >= 0])
+
+        for cell in sorted(lit_changed_cells):
+            set_move(cell * self.move_stride, not state.lit_counts[cell])
+
+        for cell in sorted(bulb_changed_cells):
+            is_bulb = cell in state.bulbs
+            set_move(cell * self.move_stride + 1, is_bulb)
+
+            for direction, adj_cell in enumerate(self.get_adj_cells(cell)):
+                if adj_cell >= 0:
+                    set_move(cell * self.move_stride + 2 + direction, is_bulb and not adj_cell in state.bulbs)
+
+
+    def get_adj_cells(self, cell):
+        """Returns the white cells next to the given white cell, by direction (-1 where there is none)."""
+        return self.adj_cells[cell * len(self.directions):(cell + 1) * len(self.directions)]
+
+
+    def get_move_cells(self, move):
+        """Returns the given move (see update_moves) as a tuple of (cells to remove a bulb from, cells to add a bulb to)."""
+        cell, kind = divmod(move, self.move_stride)
+
+        if kind == 0:
+            return (), (cell,)
+
+        if kind == 1:
+            return (cell,), ()
+
+        dx, dy = self.directions[kind - 2]
+
+        return (cell,), (cell + dx * self.puzzle.num_cols + dy,)
+
+
+    def improve(self, genotype):
+        """Hill-climbs from the given genotype by first improvement: the first neighbour (see update_moves)
+        that improves the score is taken, until no neighbour improves it or move_budget neighbours
+        have been tried.
+
+        The genotype's bulbs are replaced by the result (its fitness must then be re-evaluated).
+        Returns the number of neighbours scored.
+        """
+        initial_cells = genotype.bulbs
+        state = lighting_state_class.LightingState(self.puzzle, sorted(initial_cells))
+        self.update_moves(state, sorted(initial_cells))
+
+        score = self.get_score(state)
+        num_moves = 0
+        improved = True
+
+        while improved and num_moves < self.move_budget:
+            improved = False
+
+            # Moves tried from the current state are taken out of the pool, so each is tried once
+            tried_moves = []
+
+            while len(self.moves) and num_moves < self.move_budget:
+                move = self.moves.draw()
+                tried_moves.append((move, self.moves.remove(move)))
+                num_moves += 1
+
+                removed_cells, added_cells = self.get_move_cells(move)
+
+                for cell in removed_cells:
+                    state.remove_bulb(cell)
+
+                for cell in added_cells:
+                    state.add_bulb(cell)
+
+                new_score = self.get_score(state)
+
+                if new_score > score:
+                    # Take the first improving move
+                    score = new_score
+                    improved = True
+                    break
+
+                # Undo the move
+                for cell in added_cells:
+                    state.remove_bulb(cell)
+
+                for cell in removed_cells:
+                    state.add_bulb(cell)
+
+            for move, position in reversed(tried_moves):
+                self.moves.restore(move, position)
+
+            if improved:
+                self.update_moves(state, removed_cells + added_cells)
+
+        if not state.bulbs == initial_cells:
+            genotype.set_bulbs(state.bulbs)
+
+        # Return the move pool to that of an empty board
+        final_cells = sorted(state.bulbs)
+
+        for cell in final_cells:
+            state.remove_bulb(cell)
+
+        self.update_moves(state, final_cells)
+        state.release()
+
+        return num_moves
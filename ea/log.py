@@ -1,9 +1,17 @@
+import os
+import util.compressed_file as compressed_file
+
+
 class Log:
-    def __init__(self, config, seed, puzzle, overwrite=False):
+    def __init__(self, config, seed, puzzle, overwrite=False, resume_offset=None):
         """Initializes the Log class.
         
         Where config is a Config object and overwrite determines if the file will be
-        appended to or overwritten.
+        appended to or overwritten. Log file paths ending in a compressed extension
+        (e.g. .gz, see util.compressed_file) are written through a streaming compressor.
+
+        If resume_offset (see get_offset) is given, the file is truncated to that offset and
+        appended to without rewriting its header.
         """
 
         def write_config_params():
@@ -52,14 +60,34 @@ class Log:
 
             self.write()            
 
+            extra_column_names = []
 
-        self.config = config
+            if int(self.config.settings['local_search_num_offspring']):
+                extra_column_names.append('local_search_evaluations')
 
-        self.file = open(self.config.settings['log_file_path'], 'w' if overwrite else 'a')
+            if int(self.config.settings['log_fitness_variants']):
+                extra_column_names += self.puzzle.fitness_variant_names
+
+            if extra_column_names:
+                # Name the extra columns of each run data line
+                self.write('extra columns: ' + '\t'.join(extra_column_names))
+                self.write()
+
+
+        self.config = config
+        self.file_path = self.config.settings['log_file_path']
 
         self.seed = seed
         self.puzzle = puzzle
 
+        if resume_offset is not None:
+            # Drop whatever was written after the checkpoint
+            os.truncate(self.file_path, resume_offset)
+            self.file = compressed_file.open_file(self.file_path, 'a')
+            return
+
+        self.file = compressed_file.open_file(self.file_path, 'w' if overwrite else 'a')
+
         write_config_params()
         self.write('Result Log')
 
@@ -69,6 +97,29 @@ class Log:
         self.file.write(write_string + '\n')
 
 
+    def close(self):
+        """Closes the log file, completing the compressed stream (if any)."""
+        self.file.close()
+
+
+    def get_offset(self):
+        """Returns the size of the log file with everything written so far on disk.
+
+        A compressed stream is ended (and a new one appended to the file) so that the file
+        is complete at the returned offset.
+        """
+        if not self.file_path.endswith(tuple(compressed_file.compressed_extensions)):
+            self.file.flush()
+
+            return os.path.getsize(self.file_path)
+
+        self.file.close()
+        offset = os.path.getsize(self.file_path)
+        self.file = compressed_file.open_file(self.file_path, 'a')
+
+        return offset
+
+
     def write_run_header(self, run_count):
         """Writes the given run count to file and to the screen."""
         run_header = '\nRun %i' % (run_count)
@@ -76,8 +127,35 @@ class Log:
         print(run_header)
 
 
-    def write_run_data(self, eval_count, average_fitness, best_fitness):
-        """Writes the given run data to file and to the screen."""
+    def write_run_data(self, eval_count, average_fitness, best_fitness, extra_columns=[]):
+        """Writes the given run data to file and to the screen.
+
+        The values of extra_columns (local search evaluations and the best fitness of each fitness
+        variant, if enabled) follow as extra columns.
+        """
         run_data = str(eval_count) + '\t' + str(average_fitness) + '\t' + str(best_fitness)
+
+        for value in extra_columns:
+            run_data += '\t' + str(value)
+
         self.write(run_data)
         print(run_data)
+
+
+    def write_operator_stats(self, operator_kind, operator_stats):
+        """Writes the usage of each operator of the given kind (crossover or mutation) to file and to the screen.
+
+        Where operator_stats is a list of (name, number of uses, total fitness gain, total CPU time)
+        tuples (see OperatorBandit.get_stats).
+        """
+        for name, num_uses, credit, cpu_time in operator_stats:
+            operator_data = 'Operator ' + operator_kind + ' ' + name + '\tuses: ' + str(num_uses) + '\tfitness gain: ' + str(credit) + '\tcpu time: ' + str(cpu_time)
+            self.write(operator_data)
+            print(operator_data)
+
+
+    def write_island_data(self, island_index, eval_count, average_fitness, best_fitness):
+        """Writes the given island's run data to file and to the screen."""
+        island_data = 'Island ' + str(island_index) + '\t' + str(eval_count) + '\t' + str(average_fitness) + '\t' + str(best_fitness)
+        self.write(island_data)
+        print(island_data)
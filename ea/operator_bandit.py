@@ -0,0 +1,77 @@
+import math
+
+
+class OperatorBandit:
+    def __init__(self, operator_names, exploration, decay):
+        """Initializes the OperatorBandit class.
+
+        Where operator_names is a list of the names of the operators (arms) to choose from,
+        exploration is the weight of the UCB exploration term and decay is the factor every past
+        reward is discounted by when a new reward arrives (1 never forgets).
+
+        Operators are rewarded with the fitness gain they produced and the CPU time they cost,
+        and the operator with the best discounted gain per CPU-second (plus exploration bonus)
+        is selected.
+        """
+        self.operator_names = operator_names
+        self.exploration = exploration
+        self.decay = decay
+
+        # Totals of the run (see get_stats)
+        self.num_uses = [0] * len(operator_names)
+        self.total_credits = [0.0] * len(operator_names)
+        self.total_cpu_times = [0.0] * len(operator_names)
+
+        # Discounted totals used for selection
+        self.weighted_rewards = [0.0] * len(operator_names)
+        self.weighted_credits = [0.0] * len(operator_names)
+        self.weighted_cpu_times = [0.0] * len(operator_names)
+
+
+    def select(self):
+        """Returns the index of the operator to apply next.
+
+        Every operator is tried once before any is chosen by its upper confidence bound.
+        """
+        for operator_index, num_uses in enumerate(self.num_uses):
+            if not num_uses:
+                self.num_uses[operator_index] += 1
+                return operator_index
+
+        # Operators awaiting their first reward are tried again before any is scored
+        for operator_index, weighted_rewards in enumerate(self.weighted_rewards):
+            if not weighted_rewards:
+                self.num_uses[operator_index] += 1
+                return operator_index
+
+        rates = [credit / cpu_time if cpu_time > 0 else 0.0 for credit, cpu_time in zip(self.weighted_credits, self.weighted_cpu_times)]
+
+        # Normalize the rates so the exploration weight does not depend on the fitness scale
+        max_rate = max(rates) or 1.0
+        log_total_rewards = math.log(max(1.0, sum(self.weighted_rewards)))
+
+        operator_index = max(range(len(self.operator_names)),
+                             key=lambda i : rates[i] / max_rate + self.exploration * math.sqrt(log_total_rewards / self.weighted_rewards[i]))
+        self.num_uses[operator_index] += 1
+
+        return operator_index
+
+
+    def reward(self, operator_index, credit, cpu_time):
+        """Credits the operator at operator_index with the given fitness gain, obtained in cpu_time seconds."""
+        self.total_credits[operator_index] += credit
+        self.total_cpu_times[operator_index] += cpu_time
+
+        for i in range(len(self.operator_names)):
+            self.weighted_rewards[i] *= self.decay
+            self.weighted_credits[i] *= self.decay
+            self.weighted_cpu_times[i] *= self.decay
+
+        self.weighted_rewards[operator_index] += 1
+        self.weighted_credits[operator_index] += credit
+        self.weighted_cpu_times[operator_index] += cpu_time
+
+
+    def get_stats(self):
+        """Returns a list of (name, number of uses, total fitness gain, total CPU time) of each operator."""
+        return list(zip(self.operator_names, self.num_uses, self.total_credits, self.total_cpu_times))
@@ -0,0 +1,198 @@
+import ea.genotype as genotype_class
+import multiprocessing
+import multiprocessing.resource_tracker as resource_tracker
+import multiprocessing.shared_memory as shared_memory
+import puzzle.light_up_puzzle as puzzle_class
+import util.config as config_class
+
+
+# Size in bytes of each of the puzzle block's header fields (number of rows, number of columns)
+header_field_size = 8
+
+# Worker process state (see init_worker): its config, puzzles and the shared memory blocks it is attached to
+worker_config = None
+worker_puzzle_blocks = {}
+worker_puzzles = {}
+worker_population_blocks = {}
+
+
+def init_worker(config_file_path):
+    """Initializes an evaluation worker process with the config at config_file_path."""
+    global worker_config
+
+    worker_config = config_class.Config(config_file_path)
+
+
+def attach_block(blocks, block_name):
+    """Returns the shared memory block named block_name, attaching to it on first use.
+
+    Where blocks is the dict of attached blocks of the same kind; blocks of any other name are
+    closed, as the parent replaces (rather than adds) blocks.
+    """
+    if not block_name in blocks:
+        for old_block_name in list(blocks):
+            blocks.pop(old_block_name).close()
+
+        blocks[block_name] = shared_memory.SharedMemory(name=block_name)
+
+    return blocks[block_name]
+
+
+def get_worker_puzzle(puzzle_block_name):
+    """Returns the worker's LightUpPuzzle for the puzzle block named puzzle_block_name (see
+    ParallelEvaluator.set_puzzle), building it from the shared cell grid on first use.
+
+    Blocks of previous puzzles are released.
+    """
+    if not puzzle_block_name in worker_puzzles:
+        worker_puzzles.clear()
+
+        buffer = attach_block(worker_puzzle_blocks, puzzle_block_name).buf
+        num_rows = int.from_bytes(buffer[:header_field_size], 'little')
+        num_cols = int.from_bytes(buffer[header_field_size:2 * header_field_size], 'little')
+        cell_grid = buffer[2 * header_field_size:2 * header_field_size + num_rows * num_cols].cast('b')
+
+        black_square_data = [(cell // num_cols, cell % num_cols, value) for cell, value in enumerate(cell_grid) if value >= 0]
+        cell_grid.release()
+
+        worker_puzzles[puzzle_block_name] = puzzle_class.LightUpPuzzle(worker_config, (num_rows, num_cols, black_square_data))
+
+    return worker_puzzles[puzzle_block_name]
+
+
+def evaluate_rows(task):
+    """Evaluates the genotypes in rows start to stop of the population block in a worker process.
+
+    Where task is (puzzle block name, population block name, row size in bytes, start, stop).
+    Genotypes changed by the fitness function (repaired) are written back to their rows.
+
+    Returns (fitnesses, indices of changed rows, fitness variants of each genotype).
+    """
+    puzzle_block_name, population_block_name, row_size, start, stop = task
+
+    puzzle = get_worker_puzzle(puzzle_block_name)
+    buffer = attach_block(worker_population_blocks, population_block_name).buf
+
+    fitnesses = []
+    changed_rows = []
+    fitness_variants = []
+
+    for row in range(start, stop):
+        row_bytes = buffer[row * row_size:(row + 1) * row_size]
+        bulbs = puzzle.get_bulbs_from_bytes(row_bytes)
+        genotype = genotype_class.Genotype(bulbs)
+
+        puzzle.get_fitness(genotype)
+
+        if not genotype.bulbs == bulbs:
+            # Write back the repaired bulbs
+            row_bytes[:] = puzzle.get_bitmask_bytes(genotype.bulbs)
+            changed_rows.append(row)
+
+        row_bytes.release()
+
+        fitnesses.append(genotype.fitness)
+        fitness_variants.append(puzzle.fitness_variants)
+
+    return fitnesses, changed_rows, fitness_variants
+
+
+class ParallelEvaluator:
+    def __init__(self, config, num_workers):
+        """Initializes the ParallelEvaluator class.
+
+        Where config is a Config object (read from a file, which each of the num_workers worker
+        processes reads in turn). The puzzle's cell grid and the population's bulb bitmasks (one
+        row of bits per genotype) are placed in shared memory blocks that the workers attach to,
+        so only row ranges and fitnesses cross process boundaries.
+        """
+        self.config = config
+        self.num_workers = num_workers
+
+        # Start the resource tracker before the workers, so they share it instead of each starting
+        # their own (which would unlink the blocks they attached to when they exit)
+        resource_tracker.ensure_running()
+        self.pool = multiprocessing.Pool(num_workers, initializer=init_worker, initargs=(config.file_path,))
+
+        self.puzzle = None
+        self.puzzle_block = None
+        self.population_block = None
+        self.row_size = 0
+
+
+    def set_puzzle(self, puzzle):
+        """Places the given LightUpPuzzle's cell grid in a new shared memory block for the workers."""
+        if puzzle is self.puzzle:
+            return
+
+        self.release_blocks()
+        self.puzzle = puzzle
+
+        num_cells = puzzle.num_rows * puzzle.num_cols
+        self.puzzle_block = shared_memory.SharedMemory(create=True, size=2 * header_field_size + num_cells)
+
+        buffer = self.puzzle_block.buf
+        buffer[:header_field_size] = puzzle.num_rows.to_bytes(header_field_size, 'little')
+        buffer[header_field_size:2 * header_field_size] = puzzle.num_cols.to_bytes(header_field_size, 'little')
+        buffer[2 * header_field_size:2 * header_field_size + num_cells] = puzzle.cell_grid.tobytes()
+
+        # One bit per cell, rounded up to whole bytes
+        self.row_size = (num_cells + 7) // 8
+
+
+    def evaluate(self, genotypes):
+        """Evaluates the given list of genotypes (of the puzzle given to set_puzzle) on the workers.
+
+        The genotypes are not changed; instead returns a list of (fitness, repaired bulbs or None
+        if unchanged, fitness variants) tuples in the order of genotypes.
+        """
+        if not genotypes:
+            return []
+
+        if not self.population_block or self.population_block.size < len(genotypes) * self.row_size:
+            # Grow the population block (workers attach to the new block by name)
+            if self.population_block:
+                self.population_block.close()
+                self.population_block.unlink()
+
+            self.population_block = shared_memory.SharedMemory(create=True, size=len(genotypes) * self.row_size)
+
+        buffer = self.population_block.buf
+
+        for row, genotype in enumerate(genotypes):
+            buffer[row * self.row_size:(row + 1) * self.row_size] = self.puzzle.get_bitmask_bytes(genotype.bulbs)
+
+        # Split the rows into one contiguous range per worker
+        num_rows_per_task = -(-len(genotypes) // self.num_workers)
+        tasks = [(self.puzzle_block.name, self.population_block.name, self.row_size, start, min(start + num_rows_per_task, len(genotypes)))
+                 for start in range(0, len(genotypes), num_rows_per_task)]
+
+        results = []
+
+        for fitnesses, changed_rows, fitness_variants in self.pool.map(evaluate_rows, tasks):
+            repaired_bulbs = dict([(row, self.puzzle.get_bulbs_from_bytes(buffer[row * self.row_size:(row + 1) * self.row_size])) for row in changed_rows])
+            start = len(results)
+
+            for i in range(len(fitnesses)):
+                results.append((fitnesses[i], repaired_bulbs.get(start + i), fitness_variants[i]))
+
+        return results
+
+
+    def release_blocks(self):
+        """Closes and unlinks the shared memory blocks (if any)."""
+        for block in (self.puzzle_block, self.population_block):
+            if block:
+                block.close()
+                block.unlink()
+
+        self.puzzle = None
+        self.puzzle_block = None
+        self.population_block = None
+
+
+    def close(self):
+        """Stops the worker processes and releases the shared memory blocks."""
+        self.pool.close()
+        self.pool.join()
+        self.release_blocks()
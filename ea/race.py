@@ -0,0 +1,140 @@
+import configparser
+import ea.ea_driver as ea_driver_class
+import multiprocessing
+import os
+import random
+import scipy.stats as stats
+import util.config as config_class
+import util.stat_tests as stat_tests
+
+
+def run_race_job(job):
+    """Runs a single EA run of the candidate configured by the job (candidate_index, config_file_path)
+    in a worker process.
+
+    Returns (candidate_index, last best (local) fitness of the run).
+    """
+    candidate_index, config_file_path = job
+
+    # Forked workers share the parent's random state, and a race needs independent runs
+    random.seed()
+
+    ea_driver = ea_driver_class.EADriver(config_class.Config(config_file_path), write_output=False)
+
+    try:
+        for _ in ea_driver.run():
+            pass
+
+    finally:
+        ea_driver.close()
+
+    return candidate_index, ea_driver.best_fit_local_genotype.fitness
+
+
+class Race:
+    def __init__(self, race_file_path):
+        """Initializes the Race class.
+
+        Where race_file_path is a CFG file whose [race] section holds:
+            candidate_config_file_paths: comma separated config files to race
+            output_directory: where each candidate's final fitnesses are written
+            num_workers: number of worker processes
+            batch_size: runs of each surviving candidate per batch
+            min_num_runs: runs of each candidate before any is eliminated
+            max_num_runs: runs of each candidate after which the race stops
+            elimination_test: t_test (the f-test/t-test of the analysis scripts) or mann_whitney
+            alpha: significance level of the mann_whitney elimination test
+        """
+        race_settings = configparser.ConfigParser()
+        race_settings.read(race_file_path)
+
+        self.settings = race_settings['race']
+        self.candidate_config_file_paths = [p.strip() for p in self.settings['candidate_config_file_paths'].split(',') if p.strip()]
+        self.output_directory = self.settings['output_directory']
+        self.num_workers = int(self.settings['num_workers'])
+        self.batch_size = int(self.settings['batch_size'])
+        self.min_num_runs = int(self.settings['min_num_runs'])
+        self.max_num_runs = int(self.settings['max_num_runs'])
+        self.elimination_test = self.settings['elimination_test']
+        self.alpha = float(self.settings['alpha'])
+
+        if not self.elimination_test in ('t_test', 'mann_whitney'):
+            raise ValueError('Unknown elimination test: ' + self.elimination_test)
+
+        # Name each candidate after its config file
+        self.candidate_names = [os.path.splitext(os.path.basename(p))[0] for p in self.candidate_config_file_paths]
+
+        # Final (last best local) fitness of every run of each candidate
+        self.fitnesses = [[] for _ in self.candidate_config_file_paths]
+
+
+    def is_worse(self, a, b):
+        """Returns True if the final fitnesses a are significantly worse than b, False otherwise."""
+        if self.elimination_test == 'mann_whitney':
+            if len(set(a + b)) == 1:
+                # All fitnesses are identical
+                return False
+
+            return stats.mannwhitneyu(a, b, alternative='less').pvalue < self.alpha
+
+        assumption = stat_tests.f_test(a, b, print_info=False)
+
+        return stat_tests.t_test(a, b, assumption, print_info=False) is b
+
+
+    def run(self):
+        """Races the candidates: each batch, every surviving candidate is run batch_size more times
+        (in parallel), then candidates that are significantly worse than the candidate with the best
+        mean final fitness are eliminated. The race stops when one candidate survives or every
+        survivor has max_num_runs runs.
+
+        Returns the list of surviving candidate indices.
+        """
+        survivors = list(range(len(self.candidate_config_file_paths)))
+        num_runs = 0
+
+        with multiprocessing.Pool(self.num_workers) as pool:
+            while len(survivors) > 1 and num_runs < self.max_num_runs:
+                # Interleave the runs of all survivors
+                num_batch_runs = min(self.batch_size, self.max_num_runs - num_runs)
+                jobs = [(i, self.candidate_config_file_paths[i]) for _ in range(num_batch_runs) for i in survivors]
+
+                for candidate_index, fitness in pool.map(run_race_job, jobs):
+                    self.fitnesses[candidate_index].append(fitness)
+
+                num_runs += num_batch_runs
+
+                if num_runs >= self.min_num_runs:
+                    leader = max(survivors, key=lambda i : stat_tests.mean(self.fitnesses[i]))
+                    survivors = [i for i in survivors if i == leader or not self.is_worse(self.fitnesses[i], self.fitnesses[leader])]
+
+                print('Runs: ' + str(num_runs) + '\tsurvivors: ' + ', '.join([self.candidate_names[i] for i in survivors]))
+
+        self.write_fitnesses()
+
+        return survivors
+
+
+    def write_fitnesses(self):
+        """Writes the final fitnesses of each candidate to <output_directory>/<name>_last_best_local_fits.txt
+        (the format read by analysis/gen_stats.py).
+        """
+        os.makedirs(self.output_directory, exist_ok=True)
+
+        for name, fitnesses in zip(self.candidate_names, self.fitnesses):
+            with open(os.path.join(self.output_directory, name + '_last_best_local_fits.txt'), 'w') as out:
+                for fitness in fitnesses:
+                    out.write(str(fitness) + '\n')
+
+
+    def print_summary(self, survivors):
+        """Prints the comparison of the best surviving candidate against every other candidate
+        that has enough runs to be compared.
+        """
+        leader = max(survivors, key=lambda i : stat_tests.mean(self.fitnesses[i]))
+
+        for candidate_index in range(len(self.candidate_config_file_paths)):
+            if candidate_index == leader or len(self.fitnesses[candidate_index]) < 2:
+                continue
+
+            stat_tests.print_comparison(self.fitnesses[leader], self.fitnesses[candidate_index], self.candidate_names[leader], self.candidate_names[candidate_index])
@@ -0,0 +1,135 @@
+import ea.genotype as genotype_class
+import ea.log as log_class
+import ea.solver as solver
+import multiprocessing
+import puzzle.exact_search as exact_search_class
+import puzzle.light_up_puzzle as puzzle_class
+import random
+import util.config as config_class
+import util.seed as seed_class
+
+
+def solve_region(job):
+    """Solves a single region of a board in a worker process.
+
+    Where job is (config file path, region board (see LightUpPuzzle.get_region_board), seed value,
+    run count, number of regions, region index). The region is solved with exact search if region_solver_method is exact (falling
+    back to the EA if no valid placement lighting every cell is found within exact_search_node_budget),
+    with a single EA run otherwise.
+
+    Returns (list of the (x, y) of each bulb on the region board, number of fitness evaluations or
+    search nodes used).
+    """
+    config_file_path, board, seed_val, run_count, num_regions, region_index = job
+
+    # Give each region of each run its own random stream
+    random.seed(seed_val + run_count * num_regions + region_index)
+
+    config = config_class.Config(config_file_path)
+    phenotype = puzzle_class.LightUpPuzzle(config, board)
+
+    if config.settings['region_solver_method'] == 'exact':
+        exact_search = exact_search_class.ExactSearch(phenotype, int(config.settings['exact_search_node_budget']))
+        solution = exact_search.solve()
+
+        if solution and solution[1] == phenotype.num_possible_lit_cells:
+            return [divmod(c, phenotype.num_cols) for c in solution[0]], exact_search.num_nodes
+
+    result = solver.solve(config, phenotype=phenotype)
+
+    return [divmod(c, phenotype.num_cols) for c in result.bulbs], result.eval_count
+
+
+class RegionSolver:
+    def __init__(self, config):
+        """Initializes the RegionSolver class.
+
+        Where config is a Config object. Each run's board is split into its independent regions (see
+        LightUpPuzzle.generate_regions), every region is solved on its own (see solve_region) on
+        num_region_solver_workers processes (all CPUs if 0), and the partial solutions are combined
+        into one solution of the board.
+        """
+        self.config = config
+
+        # Initialize the seed class
+        self.seed = seed_class.Seed(self.config)
+
+        self.num_workers = int(self.config.settings['num_region_solver_workers']) or None
+
+        if not self.config.settings['region_solver_method'] in ('ea', 'exact'):
+            raise ValueError('Unknown region solver method: ' + self.config.settings['region_solver_method'])
+
+        self.run_count = 1
+        self.best_fit_global_fitness = -1 * int(self.config.settings['arbitrary_large_number'])
+
+        self.phenotype = puzzle_class.LightUpPuzzle(self.config)
+
+        # Initialize the log file class
+        self.log = log_class.Log(self.config, self.seed, self.phenotype, overwrite=True)
+
+
+    def solve(self, pool):
+        """Solves the current board region by region on the given worker pool.
+
+        Returns (combined genotype, evaluated on the whole board, total number of fitness evaluations
+        or search nodes used by all regions).
+        """
+        jobs = []
+        offsets = []
+
+        for region_index in range(self.phenotype.num_regions):
+            board, offset = self.phenotype.get_region_board(region_index)
+            jobs.append((self.config.file_path, board, self.seed.val, self.run_count, self.phenotype.num_regions, region_index))
+            offsets.append(offset)
+
+        bulbs = []
+        eval_count = 0
+
+        # Larger regions take longer, so they are dispatched first
+        job_order = sorted(range(len(jobs)), key=lambda i : len(self.phenotype.get_region_cells(i)), reverse=True)
+
+        for region_index, (region_bulbs, region_eval_count) in zip(job_order, pool.imap(solve_region, [jobs[i] for i in job_order])):
+            x_offset, y_offset = offsets[region_index]
+            bulbs += [(x + x_offset) * self.phenotype.num_cols + y + y_offset for x, y in region_bulbs]
+            eval_count += region_eval_count
+
+        genotype = genotype_class.Genotype(bulbs)
+        self.phenotype.get_fitness(genotype)
+
+        return genotype, eval_count
+
+
+    def run(self):
+        """Runs num_experiment_runs runs, solving each run's board region by region.
+
+        Each run's combined fitness is written to the log (as both its average and best fitness) and
+        the global best solution is written to the solution file.
+        """
+        with multiprocessing.Pool(self.num_workers) as pool:
+            while self.run_count <= int(self.config.settings['num_experiment_runs']):
+                self.log.write_run_header(self.run_count)
+
+                genotype, eval_count = self.solve(pool)
+
+                print('Regions: ' + str(self.phenotype.num_regions) + ', largest region: ' + str(max([len(self.phenotype.get_region_cells(r)) for r in range(self.phenotype.num_regions)] + [0])) + ' cells')
+                self.log.write_run_data(eval_count, genotype.fitness, genotype.fitness)
+
+                if genotype.fitness > self.best_fit_global_fitness:
+                    self.best_fit_global_fitness = genotype.fitness
+                    self.write_solution(genotype)
+
+                # Create a new puzzle for the next run
+                self.phenotype = puzzle_class.LightUpPuzzle(self.config)
+                self.run_count += 1
+
+        self.log.close()
+
+
+    def write_solution(self, genotype):
+        """Writes the given genotype to the solution file (and visualization file, if configured)."""
+        # Update the puzzle's shined squares for the solution file
+        self.phenotype.update_shined_squares(genotype)
+        self.phenotype.write_to_soln_file(genotype.bulbs)
+
+        if int(self.config.settings['visualize_best_solution']):
+            self.phenotype.write_to_soln_visualization_file(genotype.bulbs)
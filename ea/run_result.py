@@ -0,0 +1,23 @@
+class RunResult:
+    def __init__(self, ea_driver):
+        """Initializes the RunResult class.
+
+        Where ea_driver is the EADriver object whose current run is summarized. The result is a
+        snapshot: it does not change as the run continues.
+        """
+        self.run_count = ea_driver.run_count
+        self.best_genotype = ea_driver.best_fit_local_genotype
+        self.best_fitness = ea_driver.best_fit_local_genotype.fitness
+        self.bulbs = set(ea_driver.best_fit_local_genotype.bulbs)
+        self.avg_fitness = ea_driver.avg_fitness
+        self.eval_count = ea_driver.eval_count
+        self.generation_count = ea_driver.generation_count
+        self.elapsed_time = ea_driver.get_elapsed_time()
+        self.termination_reason = ea_driver.termination_reason
+
+
+    def __str__(self):
+        """Returns a summary of the result in string form."""
+        return 'run: ' + str(self.run_count) + ', best fitness: ' + str(self.best_fitness) + ', evaluations: ' + str(self.eval_count) + \
+               ', generations: ' + str(self.generation_count) + ', elapsed time: ' + str(self.elapsed_time) + \
+               ', termination reason: ' + str(self.termination_reason)
@@ -0,0 +1,40 @@
+import ea.ea_driver as ea_driver_class
+import signal
+import threading
+
+
+def solve(config, time_budget=None, eval_budget=None, target_fitness=1.0, phenotype=None, write_output=False, on_generation=None):
+    """Runs a single run of the EA until an anytime limit is reached or the run terminates normally.
+
+    Where config is a Config object, time_budget is in seconds of wall-clock time, eval_budget is
+    the maximum number of evaluations and target_fitness is the fitness at which the run stops
+    (a fitness of 1.0 is a perfect, valid solution). Limits that are None are not enforced.
+    If phenotype (a LightUpPuzzle object) is given, it is solved instead of creating a new puzzle.
+    If on_generation is given, it is called with each GenerationEvent object; the run stops
+    early if it returns True.
+
+    A SIGINT received during the run stops it after the evaluation in progress.
+    Returns a RunResult object holding the best-so-far genotype and run statistics.
+    """
+    ea_driver = ea_driver_class.EADriver(config, phenotype, write_output)
+    ea_driver.set_budgets(time_budget, eval_budget, target_fitness)
+
+    # Signal handlers can only be installed from the main thread
+    handle_sigint = threading.current_thread() is threading.main_thread()
+
+    if handle_sigint:
+        prev_sigint_handler = signal.signal(signal.SIGINT, lambda signum, frame: ea_driver.request_stop())
+
+    try:
+        for event in ea_driver.run():
+            if on_generation and on_generation(event):
+                ea_driver.termination_reason = 'stopped'
+                break
+
+    finally:
+        ea_driver.close()
+
+        if handle_sigint:
+            signal.signal(signal.SIGINT, prev_sigint_handler)
+
+    return ea_driver.get_result()
@@ -0,0 +1,179 @@
+import configparser
+import contextlib
+import ea.ea_driver as ea_driver_class
+import hashlib
+import itertools
+import multiprocessing
+import os
+import random
+import time
+import util.config as config_class
+import util.result_store as result_store_class
+
+
+# Config settings that do not change an experiment's outcome, excluded from its config hash
+unhashed_keys = set([
+    'log_file_path',
+    'soln_file_path',
+    'checkpoint_file_path'
+])
+
+
+def get_config_hash(settings):
+    """Returns a hash identifying the experiment described by settings, a dict-like of config settings."""
+    hashed_settings = ''.join([key + '=' + settings[key] + '\n' for key in sorted(settings) if not key in unhashed_keys])
+
+    return hashlib.sha1(hashed_settings.encode('utf-8')).hexdigest()[:16]
+
+
+def run_job(job):
+    """Runs the experiment configured by the job (config_hash, config_file_path) in a worker process.
+
+    Returns (config_hash, last best fitness of each run, evaluation count of each run, elapsed time).
+    """
+    config_hash, config_file_path = job
+    config = config_class.Config(config_file_path)
+
+    # Forked workers share the parent's random state, so reseed each job
+    random.seed(float(config.settings['seed']) if int(config.settings['use_external_seed']) else None)
+
+    start_time = time.perf_counter()
+
+    # Keep the per-generation output of parallel jobs off the screen
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        ea_driver = ea_driver_class.EADriver(config)
+        results = ea_driver.run_experiment()
+        ea_driver.close()
+
+    return config_hash, [r.best_fitness for r in results], [r.eval_count for r in results], time.perf_counter() - start_time
+
+
+class Sweep:
+    def __init__(self, sweep_file_path):
+        """Initializes the Sweep class.
+
+        Where sweep_file_path is a CFG file with the following sections:
+            [sweep]  base_config_file_path, output_directory, num_workers,
+                     num_random_samples (0 runs the full grid) and random_seed
+            [grid]   comma separated values of config settings to sweep over
+            [random] low, high bounds of config settings sampled uniformly
+                     (integers if both bounds are integers; requires num_random_samples)
+        """
+        sweep_settings = configparser.ConfigParser()
+        sweep_settings.read(sweep_file_path)
+
+        self.settings = sweep_settings['sweep']
+        self.base_config = config_class.Config(self.settings['base_config_file_path'])
+        self.output_directory = self.settings['output_directory']
+        self.num_workers = int(self.settings['num_workers'])
+        self.num_random_samples = int(self.settings['num_random_samples'])
+        self.random_seed = int(self.settings['random_seed'])
+
+        self.grid = {}
+        self.random_bounds = {}
+
+        if sweep_settings.has_section('grid'):
+            for key, values in sweep_settings['grid'].items():
+                self.grid[key] = [v.strip() for v in values.split(',')]
+
+        if sweep_settings.has_section('random'):
+            for key, bounds in sweep_settings['random'].items():
+                self.random_bounds[key] = [b.strip() for b in bounds.split(',')]
+
+        for key in list(self.grid) + list(self.random_bounds):
+            if not key in self.base_config.settings:
+                raise KeyError('Swept setting is not in the base config: ' + key)
+
+        if self.random_bounds and not self.num_random_samples:
+            raise ValueError('Sampling [random] settings requires num_random_samples > 0')
+
+        os.makedirs(self.output_directory, exist_ok=True)
+        self.result_store = result_store_class.ResultStore(os.path.join(self.output_directory, 'results.sqlite3'))
+
+
+    def get_jobs(self):
+        """Returns a list of dicts of config settings, one per job.
+
+        The full grid is expanded unless num_random_samples is set, in which case that many jobs
+        are sampled (reproducibly, using random_seed) from the grid values and random bounds.
+        """
+        if not self.num_random_samples:
+            keys = sorted(self.grid)
+
+            return [dict(zip(keys, values)) for values in itertools.product(*[self.grid[key] for key in keys])]
+
+        sampler = random.Random(self.random_seed)
+        jobs = []
+
+        for _ in range(self.num_random_samples):
+            parameters = {}
+
+            for key in sorted(self.grid):
+                parameters[key] = sampler.choice(self.grid[key])
+
+            for key in sorted(self.random_bounds):
+                low, high = self.random_bounds[key]
+
+                if low.lstrip('-').isdigit() and high.lstrip('-').isdigit():
+                    parameters[key] = str(sampler.randint(int(low), int(high)))
+                else:
+                    parameters[key] = str(sampler.uniform(float(low), float(high)))
+
+            jobs.append(parameters)
+
+        return jobs
+
+
+    def write_job_config(self, parameters):
+        """Writes the base config overridden by parameters to the job's directory.
+
+        Returns (config_hash, config_file_path).
+        """
+        settings = dict(self.base_config.settings)
+        settings.update(parameters)
+
+        config_hash = get_config_hash(settings)
+        job_directory = os.path.join(self.output_directory, config_hash)
+        os.makedirs(job_directory, exist_ok=True)
+
+        settings['log_file_path'] = os.path.join(job_directory, config_hash + '_log.txt')
+        settings['soln_file_path'] = os.path.join(job_directory, config_hash + '_soln.txt')
+        settings['checkpoint_file_path'] = os.path.join(job_directory, config_hash + '_checkpoint.pkl')
+
+        config_file_path = os.path.join(job_directory, config_hash + '.cfg')
+        job_config = configparser.ConfigParser()
+        job_config['DEFAULT'] = settings
+
+        with open(config_file_path, 'w') as config_file:
+            job_config.write(config_file)
+
+        return config_hash, config_file_path
+
+
+    def run(self):
+        """Runs all jobs not yet in the result store on a pool of num_workers processes,
+        storing each job's summary as it completes.
+
+        Returns the list of all stored results (see ResultStore.get_results).
+        """
+        all_jobs = self.get_jobs()
+        jobs = []
+        job_parameters = {}
+
+        for parameters in all_jobs:
+            config_hash, config_file_path = self.write_job_config(parameters)
+
+            if not self.result_store.contains(config_hash) and not config_hash in job_parameters:
+                jobs.append((config_hash, config_file_path))
+                job_parameters[config_hash] = (config_file_path, parameters)
+
+        print('Running ' + str(len(jobs)) + ' jobs (' + str(len(all_jobs) - len(jobs)) + ' already completed or duplicated)')
+
+        with multiprocessing.Pool(self.num_workers) as pool:
+            for job_count, (config_hash, best_fitnesses, eval_counts, elapsed_time) in enumerate(pool.imap_unordered(run_job, jobs), 1):
+                config_file_path, parameters = job_parameters[config_hash]
+                self.result_store.add(config_hash, config_file_path, parameters, best_fitnesses, eval_counts, elapsed_time)
+
+                print('%i/%i\t%s\t%s\tmean best fitness: %f' % (job_count, len(jobs), config_hash, str(parameters), sum(best_fitnesses) / len(best_fitnesses)))
+
+        return self.result_store.get_results()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 
 import ea.ea_driver as ea_driver_class
+import ea.island_model as island_model_class
+import ea.region_solver as region_solver_class
 import util.args as args_class
 import util.config as config_class
 
@@ -8,7 +10,7 @@ import util.config as config_class
 if __name__ == '__main__':
 
     # Process command line arguments
-    args = args_class.Arguments(1, ['config/default.cfg'])
+    args = args_class.Arguments(1, ['config/default.cfg'], flags=['--resume'])
     config_file = args.get_args()[0]
 
 
@@ -16,29 +18,22 @@ if __name__ == '__main__':
     config = config_class.Config(config_file)
 
 
-    # Initialize the EA driver and its run variables
-    ea_driver = ea_driver_class.EADriver(config)
+    if int(config.settings['use_island_model']):
+        # Run the island model EA across worker processes
+        island_model = island_model_class.IslandModel(config)
+        island_model.run()
 
+    elif int(config.settings['use_region_decomposition']):
+        # Solve each independent region of the board separately across worker processes
+        region_solver = region_solver_class.RegionSolver(config)
+        region_solver.run()
 
-    # Run the EA
-    while ea_driver.run_count <= int(config.settings["num_experiment_runs"]):
+    else:
+        # Initialize the EA driver and its run variables
+        # With --resume, continue from the last checkpoint (if any)
+        ea_driver = ea_driver_class.EADriver(config, resume=args.has_flag('--resume'))
 
-        ea_driver.log.write_run_header(ea_driver.run_count)
-        ea_driver.evaluate(ea_driver.population)
 
-        while True:
-            ea_driver.select_parents()
-
-            ea_driver.recombine()
-
-            ea_driver.mutate()
-
-            ea_driver.evaluate(ea_driver.children)
-
-            ea_driver.select_for_survival()
-
-            if ea_driver.decide_termination():
-                break
-            
-        ea_driver.init_run_variables()
-        ea_driver.increment_run_count()
+        # Run the EA
+        ea_driver.run_experiment()
+        ea_driver.close()
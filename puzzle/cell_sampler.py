@@ -0,0 +1,77 @@
+import array
+import random
+
+
+class CellSampler:
+    def __init__(self, num_cells, cells=()):
+        """Initializes the CellSampler class.
+
+        Where num_cells is the number of cells of the board and cells is an iterable of the cell
+        indices (x * num_cols + y, see LightUpPuzzle.cell_grid) initially in the pool. The pool is a list indexed by
+        the position of each cell, so cells are drawn, added and removed in constant time.
+        """
+        self.cells = []
+
+        # Position of each cell in self.cells (-1 if not in the pool)
+        self.positions = array.array('l', [-1]) * num_cells
+
+        for cell in cells:
+            self.add(cell)
+
+
+    def __len__(self):
+        """Returns the number of cells in the pool."""
+        return len(self.cells)
+
+
+    def __contains__(self, cell):
+        """Returns True if the given cell index is in the pool, False otherwise."""
+        return self.positions[cell] >= 0
+
+
+    def add(self, cell):
+        """Adds the given cell index to the pool (if it is not already in it)."""
+        if self.positions[cell] < 0:
+            self.positions[cell] = len(self.cells)
+            self.cells.append(cell)
+
+
+    def remove(self, cell):
+        """Removes the given cell index from the pool (if it is in it) by moving the last cell into its place.
+
+        Returns the cell's former position (-1 if it was not in the pool), which restore takes to undo the removal.
+        """
+        position = self.positions[cell]
+
+        if position >= 0:
+            last_cell = self.cells.pop()
+
+            if not last_cell == cell:
+                self.cells[position] = last_cell
+                self.positions[last_cell] = position
+
+            self.positions[cell] = -1
+
+        return position
+
+
+    def restore(self, cell, position):
+        """Puts the given cell index back at the given position (see remove), moving the cell there to the end.
+
+        Undoing removals in reverse order restores the pool exactly, so draws do not depend on earlier exclusions.
+        """
+        if position < len(self.cells):
+            moved_cell = self.cells[position]
+            self.positions[moved_cell] = len(self.cells)
+            self.cells.append(moved_cell)
+            self.cells[position] = cell
+
+        else:
+            self.cells.append(cell)
+
+        self.positions[cell] = position
+
+
+    def draw(self):
+        """Returns a uniformly random cell index of the pool (which must not be empty)."""
+        return self.cells[random.randrange(len(self.cells))]
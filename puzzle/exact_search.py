@@ -0,0 +1,103 @@
+import puzzle.lighting_state as lighting_state_class
+
+
+class ExactSearch:
+    def __init__(self, puzzle, node_budget):
+        """Initializes the ExactSearch class.
+
+        Where puzzle is a LightUpPuzzle object (typically a single region, see LightUpPuzzle.get_region_board)
+        and node_budget is the maximum number of bulb placements tried.
+
+        The search is a depth-first search that repeatedly lights the unlit cell with the fewest cells
+        a bulb could light it from, trying each of those cells in turn. A cell tried (and backtracked)
+        is excluded from its siblings' subtrees, so no bulb placement is explored twice.
+        """
+        self.puzzle = puzzle
+        self.node_budget = node_budget
+        self.num_nodes = 0
+
+        self.white_cells = [cell for cell, value in enumerate(puzzle.cell_grid) if value == puzzle.white_cell_value]
+
+
+    def solve(self):
+        """Searches for a valid placement of bulbs lighting every cell.
+
+        Returns (set of bulb cell indices, number of lit cells) of the valid placement lighting the most
+        cells seen within node_budget (every cell if a solution exists and is found), None if no
+        valid placement was seen.
+        """
+        state = lighting_state_class.LightingState(self.puzzle)
+        excluded_cells = set([])
+        best = None
+
+        def get_choices():
+            """Returns the cells a bulb may be placed at to light the unlit cell with the fewest of them,
+            [] if some unlit cell (or numbered black square) can no longer be satisfied or every cell is lit.
+            """
+            nonlocal best
+
+            if not state.invalid_black_cell_constraint_count and (best is None or state.num_lit_cells > best[1]):
+                best = (set(state.bulbs), state.num_lit_cells)
+
+            if state.num_lit_cells == len(self.white_cells):
+                return []
+
+            def can_add_bulb(cell):
+                return not cell in excluded_cells and state.can_add_bulb(cell)
+
+            # Every numbered black square must still be able to get its bulbs
+            for black_cell, adj_cells in self.puzzle.numbered_black_square_adj_cells.items():
+                if state.get_black_square_error(black_cell) + sum(1 for cell in adj_cells if can_add_bulb(cell)) < 0:
+                    return []
+
+            fewest_choices = None
+
+            for cell in self.white_cells:
+                if not state.lit_counts[cell]:
+                    choices = set([])
+
+                    for segment in (self.puzzle.cell_row_segments[cell], self.puzzle.cell_col_segments[cell]):
+                        choices.update([c for c in self.puzzle.get_segment_cells(segment) if can_add_bulb(c)])
+
+                    if fewest_choices is None or len(choices) < len(fewest_choices):
+                        fewest_choices = choices
+
+                        if not fewest_choices:
+                            break
+
+            # Try the choices in cell order (popped from the end)
+            return sorted(fewest_choices, reverse=True)
+
+
+        # Each frame holds the choices left at a depth and the cells its tried choices excluded
+        stack = [(get_choices(), [])]
+        placed_cells = []
+
+        while stack and self.num_nodes < self.node_budget and not (best and best[1] == len(self.white_cells)):
+            choices, frame_excluded_cells = stack[-1]
+
+            if not choices:
+                # Backtrack, allowing this frame's excluded cells again
+                stack.pop()
+                excluded_cells.difference_update(frame_excluded_cells)
+
+                if stack:
+                    cell = placed_cells.pop()
+                    state.remove_bulb(cell)
+
+                    # The parent frame's later choices must not place this bulb again
+                    excluded_cells.add(cell)
+                    stack[-1][1].append(cell)
+
+                continue
+
+            cell = choices.pop()
+            state.add_bulb(cell)
+            placed_cells.append(cell)
+            self.num_nodes += 1
+
+            stack.append((get_choices(), []))
+
+        state.release()
+
+        return best
@@ -1,31 +1,29 @@
-import copy
-import puzzle.coordinate as coord_class
+import array
+import puzzle.cell_sampler as cell_sampler_class
+import puzzle.lighting_state as lighting_state_class
 import random
+import re
 import time
 
 
 class LightUpPuzzle:
-    def __init__(self, config):
+    def __init__(self, config, board=None):
         """Initializes the LightUpPuzzle class.
 
-        Where config is a Config object for the light up puzzle problem.
+        Where config is a Config object for the light up puzzle problem and board is an
+        optional board description (as returned by get_board) used in place of generating
+        or reading a board.
         """
 
-        def generate_coord_boards():
-            """Generates a 2D coordinate board and its transpose.
+        def generate_cell_grid():
+            """Generates an empty cell grid: a flat int8 array indexed by cell (x * num_cols + y) holding each
+            black square's adjacency value and white_cell_value for white cells.
 
-            These are used when verifying solutions and creating random boards.
+            The grid (rather than per-cell objects) backs the board's black squares, segments, fitness
+            and visualization, and bulbs are sets of cell indices, so memory stays at a byte per cell
+            on large boards.
             """
-            self.coord_board = []
-
-            for x in range(self.num_rows):
-                coord_list = []
-                for y in range(self.num_cols):
-                    coord_list.append(coord_class.Coordinate(x, y))
-
-                self.coord_board.append(coord_list)
-
-            self.transpose_coord_board = [list(l) for l in zip(*self.coord_board)]
+            self.cell_grid = array.array('b', [self.white_cell_value]) * (self.num_rows * self.num_cols)
 
 
         def generate_random_board():
@@ -38,7 +36,6 @@ class LightUpPuzzle:
 
             This function should only be called in __init__
             """
-            self.black_squares = {}
             bulbs = set([])
 
             if int(self.config.settings["override_random_board_dimensions"]):
@@ -52,22 +49,19 @@ class LightUpPuzzle:
                 self.num_rows = random.randint(min_dimension, max_dimension)
                 self.num_cols = random.randint(min_dimension, max_dimension)
 
-            generate_coord_boards()
+            generate_cell_grid()
 
-            # Create a list of shuffled coordinates used in assigning black squares & bulbs
-            shuffled_coords = []
-            for row in self.coord_board:
-                for coord in row:
-                    shuffled_coords.append(coord)
+            # Create a list of shuffled cells used in assigning black squares & bulbs
+            shuffled_cells = list(range(self.num_rows * self.num_cols))
 
-            random.shuffle(shuffled_coords)
+            random.shuffle(shuffled_cells)
 
             # Assign black squares & bulbs to the board
-            for coord in shuffled_coords:
-                if not coord in bulbs: 
+            for cell in shuffled_cells:
+                if not cell in bulbs: 
                     if random.random() <= float(self.config.settings["black_square_placement_prob"]):
                         # Place a black square
-                        adj_coord_list = self.get_adj_coords(coord)
+                        adj_cell_list = self.get_adj_cells(cell)
                         num_placed_bulbs = 0
 
                         # Compute the random max value for this black square
@@ -75,143 +69,461 @@ class LightUpPuzzle:
 
                         if max_value == int(self.config.settings["adj_value_dont_care"]):
                             # Always place a black square with value adj_value_dont_care
-                            self.black_squares[coord] = max_value
+                            self.cell_grid[cell] = max_value
                         
                         else:
                             # Put a placeholder black square to ensure the maximum amount of bulbs can be placed
-                            self.black_squares[coord] = int(self.config.settings["adj_value_dont_care"])
+                            self.cell_grid[cell] = int(self.config.settings["adj_value_dont_care"])
 
                             # Place bulbs around the square, if allowed
-                            for adj_coord in adj_coord_list:
-                                if num_placed_bulbs < max_value and self.place_bulb(adj_coord, bulbs, allow_cross_shine=False):
+                            for adj_cell in adj_cell_list:
+                                if num_placed_bulbs < max_value and self.place_bulb(adj_cell, bulbs, allow_cross_shine=False):
                                     num_placed_bulbs += 1
 
                             # Account for black square placements with value zero
-                            if num_placed_bulbs == 0 and len([c for c in self.get_adj_coords(coord) if c in bulbs]):
+                            if num_placed_bulbs == 0 and len([c for c in self.get_adj_cells(cell) if c in bulbs]):
                                 # Place a adj_value_dont_care black square to preserve the bulb placement validity
-                                self.black_squares[coord] = int(self.config.settings["adj_value_dont_care"])
+                                self.cell_grid[cell] = int(self.config.settings["adj_value_dont_care"])
                                 
                             else:
                                 # Update the real black square value to match the number of adjacent bulbs
-                                self.black_squares[coord] = num_placed_bulbs
+                                self.cell_grid[cell] = num_placed_bulbs
                     
                     elif random.random() <= float(self.config.settings["bulb_placement_prob"]):
                         # Attempt to place a bulb
-                        self.place_bulb(coord, bulbs)
+                        self.place_bulb(cell, bulbs)
+
+
+        def generate_segments():
+            """Generates the row and column segments of the board, indexed by cell (x * num_cols + y).
+
+            A segment is a maximal run of white cells in a row or column; a bulb lights exactly the
+            cells of its row and column segments. Segments are stored as arrays of their first cell,
+            length and stride (see get_segment_cells). Also indexes the numbered black squares (those
+            with an enforced adjacency value) and their adjacent white cells.
+            """
+            num_cells = self.num_rows * self.num_cols
+            self.cell_row_segments = array.array('l', [-1]) * num_cells
+            self.cell_col_segments = array.array('l', [-1]) * num_cells
+            self.segment_starts = array.array('l')
+            self.segment_lengths = array.array('l')
+            self.segment_strides = array.array('l')
+
+            # Rows are runs of consecutive cells, columns are runs of cells num_cols apart
+            for num_lines, line_length, line_stride, stride, cell_segments in ((self.num_rows, self.num_cols, self.num_cols, 1, self.cell_row_segments),
+                                                                               (self.num_cols, self.num_rows, 1, self.num_cols, self.cell_col_segments)):
+                for line in range(num_lines):
+                    start = line * line_stride
+                    length = 0
+
+                    for i in range(line_length + 1):
+                        cell = start + i * stride
+
+                        if i == line_length or not self.cell_grid[cell] == self.white_cell_value:
+                            # A black square (or the board edge) ends the segment
+                            if length:
+                                segment_start = cell - length * stride
+                                cell_segments[segment_start:cell:stride] = array.array('l', [len(self.segment_starts)]) * length
+
+                                self.segment_starts.append(segment_start)
+                                self.segment_lengths.append(length)
+                                self.segment_strides.append(stride)
+                                length = 0
+
+                        else:
+                            length += 1
+
+            self.numbered_black_squares = {}
+            self.numbered_black_square_adj_cells = {}
+
+            # Only cells next to a numbered black square are indexed
+            self.cell_adj_numbered_black_squares = {}
+
+            if int(self.config.settings["enforce_adj_quotas"]):
+                adj_value_dont_care = int(self.config.settings["adj_value_dont_care"])
+
+                # Index in cell order, so the repair does not depend on the order black squares were placed or read
+                for black_cell in self.black_square_cells:
+                    value = self.cell_grid[black_cell]
+
+                    if value < adj_value_dont_care:
+                        adj_cells = [c for c in self.get_adj_cells(black_cell) if self.cell_grid[c] == self.white_cell_value]
+
+                        self.numbered_black_squares[black_cell] = value
+                        self.numbered_black_square_adj_cells[black_cell] = adj_cells
+
+                        for cell in adj_cells:
+                            self.cell_adj_numbered_black_squares.setdefault(cell, []).append(black_cell)
+
+
+        def generate_regions():
+            """Generates the independent regions of the board: the connected components of white cells,
+            where two cells are connected if they share a row or column segment or a numbered black square.
+
+            A bulb only affects the lit cells and constraints of its own region, so regions can be solved
+            separately (see get_region_board). Regions are numbered in order of their first cell; the cells
+            of each region, in cell order, are stored consecutively in region_cells, from region_starts[region]
+            to region_starts[region + 1] (see get_region_cells).
+            """
+            num_cells = self.num_rows * self.num_cols
+            parents = array.array('l', range(num_cells))
+
+            def find(cell):
+                while not parents[cell] == cell:
+                    parents[cell] = parents[parents[cell]]
+                    cell = parents[cell]
+
+                return cell
+
+            def union(cells):
+                roots = [find(cell) for cell in cells]
+
+                for root in roots[1:]:
+                    parents[root] = roots[0]
+
+            for segment in range(len(self.segment_starts)):
+                union([find(cell) for cell in self.get_segment_cells(segment)])
+
+            for adj_cells in self.numbered_black_square_adj_cells.values():
+                if adj_cells:
+                    union(adj_cells)
+
+            # Number the regions by their roots, counting the cells of each
+            self.cell_regions = array.array('l', [-1]) * num_cells
+            root_regions = array.array('l', [-1]) * num_cells
+            region_sizes = array.array('l')
+
+            for cell, value in enumerate(self.cell_grid):
+                if value == self.white_cell_value:
+                    root = find(cell)
+
+                    if root_regions[root] < 0:
+                        root_regions[root] = len(region_sizes)
+                        region_sizes.append(0)
+
+                    self.cell_regions[cell] = root_regions[root]
+                    region_sizes[root_regions[root]] += 1
+
+            self.num_regions = len(region_sizes)
+            self.region_starts = array.array('l', [0]) * (self.num_regions + 1)
+
+            for region in range(self.num_regions):
+                self.region_starts[region + 1] = self.region_starts[region] + region_sizes[region]
+
+            # Place each cell after the cells of its region placed so far
+            self.region_cells = array.array('l', [0]) * self.region_starts[self.num_regions]
+            region_ends = self.region_starts[:self.num_regions]
+
+            for cell, region in enumerate(self.cell_regions):
+                if region >= 0:
+                    self.region_cells[region_ends[region]] = cell
+                    region_ends[region] += 1
 
 
-        self.black_squares = {}
         self.config = config
+        self.num_shined_squares = 0
+
+        # Value of white cells in the cell grid (black squares hold their adjacency value)
+        self.white_cell_value = -1
+
+        # Fitness variants computed in a shared pass (see get_fitness_variants)
+        self.penalty_coefficients = [float(self.config.settings['penalty_coefficient'])]
+
+        for coefficient in self.config.settings['shadow_penalty_coefficients'].split(','):
+            if coefficient.strip() and not float(coefficient) in self.penalty_coefficients:
+                self.penalty_coefficients.append(float(coefficient))
 
-        if int(self.config.settings["generate_uniform_random_puzzle"]):
+        self.fitness_variant_names = ['vanilla', 'repair'] + ['penalty_' + str(c) for c in self.penalty_coefficients]
+        self.fitness_variants = []
+
+        # Zeroed lit count buffers of released LightingStates (see LightingState.release)
+        self.free_lit_count_buffers = []
+
+        if board:
+            # Use the given board description
+            self.num_rows, self.num_cols, black_square_data = board
+            generate_cell_grid()
+
+            for x, y, value in black_square_data:
+                self.cell_grid[x * self.num_cols + y] = value
+
+        elif int(self.config.settings["generate_uniform_random_puzzle"]):
             # Generate random initial board state
             generate_random_board()
 
         else:
-            # Read initial board state
+            # Read initial board state in bulk
             with open(self.config.settings["input_file_path"], 'r') as input_file:
-                # Read line 0 (number of columns)
-                self.num_cols = int(input_file.readline())
+                # The number of columns, the number of rows, then the (column, row, adjacency value) of each black square
+                input_data = array.array('l', map(int, input_file.read().split()))
 
-                # Read line 1 (number of rows)
-                self.num_rows = int(input_file.readline())
+            self.num_cols, self.num_rows = input_data[0], input_data[1]
+            generate_cell_grid()
 
-                # Read line 2 to eof (coordinates of black squares and their adjacency values)
-                for row in input_file:
-                    black_square_data = [int(i) for i in row.split()]
-                    self.black_squares[coord_class.Coordinate(black_square_data[1] - 1, black_square_data[0] - 1)] = black_square_data[2]
+            for col, row, value in zip(input_data[2::3], input_data[3::3], input_data[4::3]):
+                self.cell_grid[(row - 1) * self.num_cols + col - 1] = value
+
+        # Cell indices of the black squares, in cell order (their values are in the cell grid)
+        self.black_square_cells = array.array('l', [cell for cell, value in enumerate(self.cell_grid) if not value == self.white_cell_value])
 
-            # Generate coordinate versions of the board
-            generate_coord_boards()
-        
         # Calculate the number of squares that have the possibility of being be lit up
-        self.num_possible_lit_cells = self.num_rows * self.num_cols - len(self.black_squares)
+        self.num_possible_lit_cells = self.num_rows * self.num_cols - len(self.black_square_cells)
+
+        generate_segments()
+
+        generate_regions()
+
+        # Cells random bulbs are drawn from (see place_bulb_randomly): white cells, except those next to
+        # a black square that must have no adjacent bulbs
+        forbidden_cells = set([])
+
+        for black_cell, value in self.numbered_black_squares.items():
+            if value == 0:
+                forbidden_cells.update(self.numbered_black_square_adj_cells[black_cell])
+
+        self.candidate_cells = cell_sampler_class.CellSampler(self.num_rows * self.num_cols, [cell for cell, value in enumerate(self.cell_grid)
+                                                                                            if value == self.white_cell_value and not cell in forbidden_cells])
+
+        # Whether each cell is a candidate cell, for LightingStates tracking the free ones
+        self.candidate_cell_flags = bytearray(self.num_rows * self.num_cols)
+
+        for cell in self.candidate_cells.cells:
+            self.candidate_cell_flags[cell] = 1
+
+        self.exclude_lit_candidate_cells = int(self.config.settings['exclude_lit_candidate_cells'])
+
+
+    def get_board(self):
+        """Returns a picklable description of the board: (num_rows, num_cols, black_square_data).
+
+        Where black_square_data is a list of (x, y, value) tuples, in column-major order.
+        """
+        return (self.num_rows, self.num_cols, [divmod(cell, self.num_cols) + (self.cell_grid[cell],) for cell in sorted(self.black_square_cells, key=self.get_column_major_key)])
+
+
+    def get_region_board(self, region_index):
+        """Returns (board, (x offset, y offset)) of the region at region_index (see generate_regions).
+
+        Where board (see get_board) covers the region's bounding box grown by a cell on each side (within
+        this board), so the numbered black squares next to the region are on it. Every cell of the board
+        outside of the region is a black square without an adjacency constraint, except those numbered
+        black squares (so the region's segments and constraints are unchanged). A bulb at (x, y) of the
+        board is at (x + x offset, y + y offset) of this board.
+        """
+        region_cells = self.get_region_cells(region_index)
+        min_x, max_x = max(region_cells[0] // self.num_cols - 1, 0), min(region_cells[-1] // self.num_cols + 1, self.num_rows - 1)
+        min_y, max_y = max(min(c % self.num_cols for c in region_cells) - 1, 0), min(max(c % self.num_cols for c in region_cells) + 1, self.num_cols - 1)
+
+        adj_value_dont_care = int(self.config.settings['adj_value_dont_care'])
+        black_square_data = []
+
+        for x in range(min_x, max_x + 1):
+            for y in range(min_y, max_y + 1):
+                cell = x * self.num_cols + y
+
+                if self.cell_regions[cell] == region_index:
+                    continue
+
+                value = adj_value_dont_care
 
+                # Keep the values of the black squares next to the region
+                if not self.cell_grid[cell] == self.white_cell_value and any(self.cell_regions[c] == region_index for c in self.get_adj_cells(cell)):
+                    value = self.cell_grid[cell]
 
-    def get_random_coord(self):
-        """Returns a random coordinate ranging in the space (num_cols, num_rows)."""
-        return coord_class.Coordinate(random.randint(0, self.num_rows - 1), random.randint(0, self.num_cols - 1))
+                black_square_data.append((x - min_x, y - min_y, value))
 
+        return (max_x - min_x + 1, max_y - min_y + 1, black_square_data), (min_x, min_y)
 
-    def get_adj_coords(self, coord):
-        """Returns a list of coordinates adjacent to coordinate coord"""
-        adj_coords = []
 
-        if not coord.x == 0:
-            adj_coords.append(coord_class.Coordinate(coord.x - 1, coord.y))
+    def get_stored_solution(self, solution_store):
+        """Returns (set of bulb cells, fitness) of the solution of this board (or of a rotated or
+        reflected variant of it) in the given SolutionStore, None if there is none.
+        """
+        stored_solution = solution_store.lookup(self.get_board(), int(self.config.settings['enforce_adj_quotas']))
+
+        if stored_solution is None:
+            return None
+
+        bulbs, fitness = stored_solution
+
+        return set([x * self.num_cols + y for x, y in bulbs]), fitness
+
+
+    def store_solution(self, solution_store, genotype):
+        """Stores the bulbs of the given genotype in the given SolutionStore if they are a valid solution
+        (no bulbs shining on eachother and no unsatisfied black squares) that lights more cells than the
+        stored solution of this board.
+
+        The stored fitness is the ratio of lit cells, independent of the fitness function.
+        Returns True if the solution was stored, False otherwise.
+        """
+        state, bulb_on_bulb_shine_count, invalid_black_cell_constraint_count = self.get_fitness_terms(genotype)
+
+        num_lit_cells = state.num_lit_cells
+        state.release()
+
+        if bulb_on_bulb_shine_count or invalid_black_cell_constraint_count:
+            return False
 
-        if not coord.x == self.num_rows - 1:
-            adj_coords.append(coord_class.Coordinate(coord.x + 1, coord.y))
+        return solution_store.add(self.get_board(), int(self.config.settings['enforce_adj_quotas']), [divmod(c, self.num_cols) for c in genotype.bulbs],
+                                  num_lit_cells / self.num_possible_lit_cells)
+
+
+    def get_bitmask_bytes(self, bulbs):
+        """Returns the given set of bulb cells packed into a little-endian bitmask of
+        (num_rows * num_cols + 7) // 8 bytes (see get_bitmask).
+
+        Bits are set in a bytearray, so packing costs a constant per bulb whatever the board size.
+        """
+        bitmask_bytes = bytearray((self.num_rows * self.num_cols + 7) // 8)
+
+        for cell in bulbs:
+            bitmask_bytes[cell >> 3] |= 1 << (cell & 7)
+
+        return bitmask_bytes
+
+
+    def get_bulbs_from_bytes(self, bitmask_bytes):
+        """Returns the set of bulb cells packed into the given little-endian bitmask bytes (see
+        get_bitmask_bytes).
+
+        Nonzero bytes are found by a regular expression scan, so unpacking costs a constant per bulb
+        plus a fast scan of the bytes.
+        """
+        bulbs = set([])
 
-        if not coord.y == 0:
-            adj_coords.append(coord_class.Coordinate(coord.x, coord.y - 1))
+        for match in re.finditer(b'[^\x00]', bitmask_bytes):
+            byte_index = match.start()
+            byte = bitmask_bytes[byte_index]
 
-        if not coord.y == self.num_cols - 1:
-            adj_coords.append(coord_class.Coordinate(coord.x, coord.y + 1))
+            for bit in range(8):
+                if byte >> bit & 1:
+                    bulbs.add(byte_index * 8 + bit)
 
-        return adj_coords
+        return bulbs
 
 
-    def check_cross_shine(self, coord, bulbs):
-        """Returns True if a bulb placed at coord causes cross-shine.
+    def get_bitmask(self, bulbs):
+        """Returns the given set of bulb cells packed into an integer bitmask.
+
+        The bulb at cell x * num_cols + y is stored in bit x * num_cols + y. The mask is built as bytes
+        (see get_bitmask_bytes) and converted once.
+        """
+        return int.from_bytes(self.get_bitmask_bytes(bulbs), 'little')
+
+
+    def get_bulbs(self, bitmask):
+        """Returns the set of bulb cells packed into the given integer bitmask (see get_bitmask)."""
+        return self.get_bulbs_from_bytes(bitmask.to_bytes((self.num_rows * self.num_cols + 7) // 8, 'little'))
+
+
+    def get_column_major_key(self, cell):
+        """Returns the sort key of the given cell that orders cells by column, then by row (the order of
+        the solution file).
+        """
+        return (cell % self.num_cols, cell // self.num_cols)
+
+
+    def get_region_cells(self, region):
+        """Returns the cells of the given region in cell order (see generate_regions)."""
+        return self.region_cells[self.region_starts[region]:self.region_starts[region + 1]]
+
+
+    def get_segment_cells(self, segment):
+        """Returns the range of cell indices in the given segment (see generate_segments)."""
+        start = self.segment_starts[segment]
+        stride = self.segment_strides[segment]
+
+        return range(start, start + self.segment_lengths[segment] * stride, stride)
+
+
+    def get_random_cell(self):
+        """Returns a random cell index ranging in the space (num_rows, num_cols)."""
+        return random.randint(0, self.num_rows - 1) * self.num_cols + random.randint(0, self.num_cols - 1)
+
+
+    def get_adj_cells(self, cell):
+        """Returns a list of the cell indices adjacent to the given cell (above, below, left and right)."""
+        adj_cells = []
+        x, y = divmod(cell, self.num_cols)
+
+        if not x == 0:
+            adj_cells.append(cell - self.num_cols)
+
+        if not x == self.num_rows - 1:
+            adj_cells.append(cell + self.num_cols)
+
+        if not y == 0:
+            adj_cells.append(cell - 1)
+
+        if not y == self.num_cols - 1:
+            adj_cells.append(cell + 1)
+
+        return adj_cells
+
+
+    def check_cross_shine(self, cell, bulbs):
+        """Returns True if a bulb placed at the given cell causes cross-shine.
         
-        Returns False otherwise (if the bulb is safe to place at coord).
+        Returns False otherwise (if the bulb is safe to place at the cell).
         """
-        # Check for cross-shine in the coordinate's row (same x value)
-        matching_x_coord_bulbs = [c for c in bulbs if c.x == coord.x]
+        x, y = divmod(cell, self.num_cols)
+
+        # Check for cross-shine in the cell's row (same x value)
+        matching_x_bulbs = [c for c in bulbs if c // self.num_cols == x]
         num_x_delimeters = 0
 
-        for bulb_coord in matching_x_coord_bulbs:
-            min_y = min(bulb_coord.y, coord.y)
-            max_y = max(bulb_coord.y, coord.y)
+        for bulb_cell in matching_x_bulbs:
+            min_cell = min(bulb_cell, cell)
+            max_cell = max(bulb_cell, cell)
 
-            if max_y - min_y < 2:
+            if max_cell - min_cell < 2:
                 return True
 
-            for black_coord in [c for c in self.black_squares if c.x == coord.x]:
-                if black_coord.y < max_y and black_coord.y > min_y:
+            for black_cell in range(min_cell + 1, max_cell):
+                if not self.cell_grid[black_cell] == self.white_cell_value:
                     num_x_delimeters += 1
 
-        if num_x_delimeters < len(matching_x_coord_bulbs):
+        if num_x_delimeters < len(matching_x_bulbs):
             return True
 
-        # Check for cross-shine in the coordinate's column (same y value)
-        matching_y_coord_bulbs = [c for c in bulbs if c.y == coord.y]
+        # Check for cross-shine in the cell's column (same y value)
+        matching_y_bulbs = [c for c in bulbs if c % self.num_cols == y]
         num_y_delimeters = 0
 
-        for bulb_coord in matching_y_coord_bulbs:
-            min_x = min(bulb_coord.x, coord.x)
-            max_x = max(bulb_coord.x, coord.x)
+        for bulb_cell in matching_y_bulbs:
+            min_cell = min(bulb_cell, cell)
+            max_cell = max(bulb_cell, cell)
 
-            if max_x - min_x < 2:
+            if max_cell - min_cell < 2 * self.num_cols:
                 return True
 
-            for black_coord in [c for c in self.black_squares if c.y == coord.y]:
-                if black_coord.x < max_x and black_coord.x > min_x:
+            for black_cell in range(min_cell + self.num_cols, max_cell, self.num_cols):
+                if not self.cell_grid[black_cell] == self.white_cell_value:
                     num_y_delimeters += 1
 
-        if num_y_delimeters < len(matching_y_coord_bulbs):
+        if num_y_delimeters < len(matching_y_bulbs):
             return True
         
         return False
 
 
-    def place_bulb(self, coord, bulbs, allow_cross_shine=True):
-        """Attempts to place a bulb at coord position on the board.
+    def place_bulb(self, cell, bulbs, allow_cross_shine=True):
+        """Attempts to place a bulb at the given cell of the board.
 
         Returns True on success, False on fail.
         """
-        if coord in self.black_squares:
+        if not self.cell_grid[cell] == self.white_cell_value:
             return False # Can't place a bulb on a black square 
         
         if not allow_cross_shine:
             # Check cross shine and placement of bulbs next to zero-valued black square
-            if not self.check_cross_shine(coord, bulbs) and len([c for c in self.get_adj_coords(coord) if c in self.black_squares and self.black_squares[c] == 0]) == 0:
-                bulbs.add(coord)
+            if not self.check_cross_shine(cell, bulbs) and len([c for c in self.get_adj_cells(cell) if self.cell_grid[c] == 0]) == 0:
+                bulbs.add(cell)
                 return True
 
         else:
-            bulbs.add(coord)
+            bulbs.add(cell)
             return True
         
         return False
@@ -224,13 +536,10 @@ class LightUpPuzzle:
         'x' Black square (with 0 <= x <= self.config.settings["adj_value_dont_care"])
         '!' Light bulb
         """
-        board = [ [ '_' for col in range(self.num_cols) ] for row in range(self.num_rows) ]
+        board = [ [ '_' if value == self.white_cell_value else str(value) for value in self.cell_grid[row * self.num_cols:(row + 1) * self.num_cols] ] for row in range(self.num_rows) ]
 
-        for coord, value in self.black_squares.items():
-            board[coord.x][coord.y] = str(value)
-
-        for coord in bulbs:
-            board[coord.x][coord.y] = '!'
+        for cell in bulbs:
+            board[cell // self.num_cols][cell % self.num_cols] = '!'
 
         vis_str = ''
 
@@ -249,78 +558,40 @@ class LightUpPuzzle:
             return vis_str
 
 
-    def get_num_bulbs(self, coord_list, bulbs):
-        """Returns the number of bulbs in coord_list."""
-        num_adj_bulbs = 0
-
-        for coord in coord_list:
-            if coord in bulbs:
-                num_adj_bulbs += 1
-
-        return num_adj_bulbs
-
-
-    def get_num_black_squares(self, coord_list):
-        """Returns the number of black squares in coord_list."""
+    def get_num_black_squares(self, cell_list):
+        """Returns the number of black squares in cell_list."""
         num_adj_black_squares = 0  
 
-        for coord in coord_list:
-            if coord in self.black_squares:
+        for cell in cell_list:
+            if not self.cell_grid[cell] == self.white_cell_value:
                 num_adj_black_squares += 1
 
         return num_adj_black_squares 
 
 
     def update_shined_squares(self, genotype):
-        """Updates the object's set of shined squares.
+        """Updates the object's number of shined squares.
 
-        Returns the number of bulbs shining on eachother.
+        Returns the number of bulbs shining on eachother (every ordered pair of bulbs sharing
+        a row or column segment).
         """
-        bulb_on_bulb_shine_count = 0
-        self.shined_squares = set([])
-
-        for bulb_coord in genotype.bulbs:
-            # Create a list of adjacency lists - used for determining where the bulb shines
-            adj_coord_lists = []
-
-            adj_coord_lists.append(self.coord_board[bulb_coord.x][:bulb_coord.y][::-1])           # Row from this column to the left
-            adj_coord_lists.append(self.coord_board[bulb_coord.x][bulb_coord.y + 1:])             # Row from this column to the right
-            adj_coord_lists.append(self.transpose_coord_board[bulb_coord.y][:bulb_coord.x][::-1]) # Column from this row up
-            adj_coord_lists.append(self.transpose_coord_board[bulb_coord.y][bulb_coord.x + 1:])   # Column from this row down
-
-            for coord_list in adj_coord_lists:
-                for coord in coord_list:
-                    if coord in self.black_squares:
-                        break # Shine cannot propagate any further
-                    elif coord in genotype.bulbs:
-                        # Redundant check for bulb on bulb shining
-                        bulb_on_bulb_shine_count += 1
-                    else:
-                        self.shined_squares.add(coord)
-
-        # Ensure bulbs count as shined squares
-        for bulb_coord in genotype.bulbs:
-            self.shined_squares.add(bulb_coord)
-        
-        return bulb_on_bulb_shine_count
+        state = lighting_state_class.LightingState(self, sorted(genotype.bulbs))
+        self.num_shined_squares = state.num_lit_cells
+        state.release()
 
+        return state.bulb_on_bulb_shine_count
 
-    def update_black_square_conditions(self, genotype):
-        """Returns the number of invalid black square conditions and the associated
-        invalid coordinates.
 
-        Checks against the config file for whether or not to enforce black cell constraints.
+    def get_fitness_terms(self, genotype):
+        """Returns the terms every fitness function is computed from as a tuple of (LightingState of the
+        genotype's bulbs, number of bulbs shining on eachother, number of missing or extra bulbs next
+        to black squares).
+
+        Black square constraints are only counted if enforced by the config file.
         """
-        invalid_black_cell_constraint_count = 0
-        invalid_black_coords = []
-
-        if int(self.config.settings["enforce_adj_quotas"]):
-            for coord, adj_value in self.black_squares.items():
-                if adj_value < int(self.config.settings["adj_value_dont_care"]) and self.get_num_bulbs(self.get_adj_coords(coord), genotype.bulbs) != adj_value:
-                    invalid_black_cell_constraint_count += abs(adj_value - self.get_num_bulbs(self.get_adj_coords(coord), genotype.bulbs))
-                    invalid_black_coords.append(coord)
-        
-        return invalid_black_cell_constraint_count, invalid_black_coords
+        state = lighting_state_class.LightingState(self, sorted(genotype.bulbs))
+
+        return state, state.bulb_on_bulb_shine_count, state.invalid_black_cell_constraint_count
 
 
     def get_fitness(self, genotype):
@@ -339,14 +610,24 @@ class LightUpPuzzle:
 
         Note: the type of fitness function used is specified in config.
         """
-        # Get number of shined squares
-        bulb_on_bulb_shine_count = self.update_shined_squares(genotype)
-        
-        # Get number of black cell constraints violated and the corresponding black cell coordinates 
-        invalid_black_cell_constraint_count, invalid_black_coords = self.update_black_square_conditions(genotype)
+        if int(self.config.settings['log_fitness_variants']):
+            # Compute every fitness variant at once; the configured one becomes the genotype's fitness
+            self.get_fitness_variants(genotype)
+            return
+
+        if not int(self.config.settings['use_penalty_function']) and int(self.config.settings['use_repair_function']):
+            # Repair the genotype (a valid genotype is left unchanged)
+            # The repair computes the fitness itself, so no separate evaluation is needed
+            self.repair(genotype)
+            return
+
+        # Get number of shined squares and constraints violated
+        state, bulb_on_bulb_shine_count, invalid_black_cell_constraint_count = self.get_fitness_terms(genotype)
+        self.num_shined_squares = state.num_lit_cells
+        state.release()
 
         # Calculate the genotype's fitness
-        genotype.fitness = len(self.shined_squares) / self.num_possible_lit_cells 
+        genotype.fitness = self.num_shined_squares / self.num_possible_lit_cells 
 
         if int(self.config.settings['use_penalty_function']):
             # Use the constraint satisfaction fitness function
@@ -354,31 +635,103 @@ class LightUpPuzzle:
             genotype.fitness -= float(self.config.settings['penalty_coefficient']) * (bulb_on_bulb_shine_count + invalid_black_cell_constraint_count) / self.num_possible_lit_cells
         
         elif bulb_on_bulb_shine_count or invalid_black_cell_constraint_count:
-            if int(self.config.settings['use_repair_function']):
-                # Repair the defective genotype
-                for _ in range(int(self.config.settings['repair_retry_count'])):
-                    self.repair(genotype, bulb_on_bulb_shine_count, invalid_black_cell_constraint_count, invalid_black_coords)
+            # Use the original problem statement function
+            # Set the fitness to zero because some constraints are invalid
+            genotype.fitness = 0
 
-                    if genotype.fitness != 0:
-                        break
 
-            else:
-                # Use the original problem statement function
-                # Set the fitness to zero because some constraints are invalid
-                genotype.fitness = 0
+    def get_fitness_variants(self, genotype):
+        """Updates the given genotype's fitness and self.fitness_variants, the genotype's fitness under
+        every fitness function (named in self.fitness_variant_names): vanilla, repair and penalty with
+        each of penalty_coefficient and shadow_penalty_coefficients.
+
+        The lit cell count and constraint violations are computed once, from a single LightingState,
+        and every variant is derived from them; the repair variant then repairs that same state. The
+        variant selected by the configuration (see get_fitness) becomes the genotype's fitness, and
+        the genotype is only repaired if the repair function is configured.
+        """
+        state, bulb_on_bulb_shine_count, invalid_black_cell_constraint_count = self.get_fitness_terms(genotype)
+        bulb_cells = set(state.bulbs)
+
+        # Shared terms: every ordered pair of bulbs shining on eachother and every missing or extra bulb next to a black square
+        lit_fitness = state.num_lit_cells / self.num_possible_lit_cells
+        num_violations = bulb_on_bulb_shine_count + invalid_black_cell_constraint_count
+
+        vanilla_fitness = 0 if num_violations else lit_fitness
+        penalty_fitnesses = [lit_fitness - c * num_violations / self.num_possible_lit_cells for c in self.penalty_coefficients]
+        num_lit_cells = state.num_lit_cells
+
+        # Repair the shared state last, as it changes the lit cells
+        repair_fitness = state.num_lit_cells / self.num_possible_lit_cells if self.repair_state(state) else 0
+
+        self.fitness_variants = [vanilla_fitness, repair_fitness] + penalty_fitnesses
+        state.release()
+
+        if int(self.config.settings['use_penalty_function']):
+            genotype.fitness = penalty_fitnesses[0]
+            self.num_shined_squares = num_lit_cells
+
+        elif int(self.config.settings['use_repair_function']):
+            if not state.bulbs == bulb_cells:
+                genotype.set_bulbs(state.bulbs)
+
+            genotype.fitness = repair_fitness
+            self.num_shined_squares = state.num_lit_cells
+
+        else:
+            genotype.fitness = vanilla_fitness
+            self.num_shined_squares = num_lit_cells
 
 
     def place_bulb_randomly(self, bulbs):
         """Attempts to put a bulb randomly on the board in a valid location.
 
-        Stops trying to put a bulb after max_num_random_bulb_placements tries.
+        With use_candidate_cell_sampler, the bulb is drawn uniformly from the free candidate cells: those
+        that hold no bulb (and, with exclude_lit_candidate_cells, are not lit by bulbs). Up to
+        num_candidate_cell_draws cells are drawn from all candidate cells, keeping the first free one,
+        which takes constant expected time while most candidate cells are free. Failing that, the draw
+        is made from the free candidate cells tracked by a LightingState of the bulbs (see
+        LightingState.draw_candidate_cell). Either way, no bulb is placed on a black square or an occupied
+        cell. Otherwise, random board cells are tried and placing stops after
+        max_num_random_bulb_placements tries.
+
         Returns True if successful, False otherwise.
         """
-        coord = self.get_random_coord()
+        if int(self.config.settings['use_candidate_cell_sampler']):
+            def is_free(cell):
+                if cell in bulbs:
+                    return False
+
+                if self.exclude_lit_candidate_cells:
+                    for segment in (self.cell_row_segments[cell], self.cell_col_segments[cell]):
+                        if any(c in bulbs for c in self.get_segment_cells(segment)):
+                            return False
+
+                return True
+
+            if len(self.candidate_cells):
+                for _ in range(int(self.config.settings['num_candidate_cell_draws'])):
+                    cell = self.candidate_cells.draw()
+
+                    if is_free(cell):
+                        bulbs.add(cell)
+                        return True
+
+            state = lighting_state_class.LightingState(self, bulbs, track_candidate_cells=True)
+            cell = state.draw_candidate_cell()
+            state.release()
+
+            if cell is None:
+                return False
+
+            bulbs.add(cell)
+            return True
+
+        cell = self.get_random_cell()
         count = 0
 
-        while count < int(self.config.settings["max_num_random_bulb_placements"]) and not self.place_bulb(coord, bulbs):
-            coord = self.get_random_coord()
+        while count < int(self.config.settings["max_num_random_bulb_placements"]) and not self.place_bulb(cell, bulbs):
+            cell = self.get_random_cell()
             count += 1
 
         if count < int(self.config.settings["max_num_random_bulb_placements"]):
@@ -393,13 +746,13 @@ class LightUpPuzzle:
             soln_file.write(str(self.num_cols) + '\n')
             soln_file.write(str(self.num_rows) + '\n')
 
-            for coord in sorted(self.black_squares):
-                soln_file.write(str(coord.y) + ' ' + str(coord.x) + ' ' + str(self.black_squares[coord]) + '\n')
+            for cell in sorted(self.black_square_cells, key=self.get_column_major_key):
+                soln_file.write(str(cell % self.num_cols) + ' ' + str(cell // self.num_cols) + ' ' + str(self.cell_grid[cell]) + '\n')
 
-            soln_file.write(str(len(self.shined_squares)) + '\n')
+            soln_file.write(str(self.num_shined_squares) + '\n')
 
-            for coord in sorted(bulbs):
-                soln_file.write(str(coord.y) + ' ' + str(coord.x) + '\n')
+            for cell in sorted(bulbs, key=self.get_column_major_key):
+                soln_file.write(str(cell % self.num_cols) + ' ' + str(cell // self.num_cols) + '\n')
 
             soln_file.write('\n')
 
@@ -412,73 +765,69 @@ class LightUpPuzzle:
             soln_vis_file.write(self.visualize(bulbs, print_vis=False))
 
 
-    def repair(self, genotype, bulb_on_bulb_shine_count, invalid_black_cell_constraint_count, invalid_black_coords):
+    def repair(self, genotype):
         """Attempts to repair the given genotype to eliminate bulbs shining on eachother and invalid black
-        cell constraints.
+        cell constraints, updating its bulbs and fitness.
+
+        The repair is a single pass over a LightingState: of every group of bulbs sharing a row or
+        column segment, the bulbs whose removal leaves the fewest cells unlit are removed, then bulbs
+        are removed from over-filled and added around under-filled black squares. The fitness is
+        taken from the state's counters rather than re-evaluated.
 
         If a repair cannot be made, the fitness is set to zero.
         """
-        if bulb_on_bulb_shine_count:
-            # Remove bulbs until the cross-shine constraint is valid
-            tmp_bulbs = copy.deepcopy(genotype.bulbs)
-            for b in tmp_bulbs:
-                if self.check_cross_shine(b, genotype.bulbs):
-                    genotype.bulbs.remove(b)
-                    bulb_on_bulb_shine_count -= 2
-
-                    if bulb_on_bulb_shine_count <= 0:
-                        break
-        
-        if invalid_black_cell_constraint_count:
-            # Add or remove bulbs around black cells (enforcing the cross-shine constraint) until black cell constraints are met
-            for black_coord in invalid_black_coords:
-                adj_coords = self.get_adj_coords(black_coord)
-                adj_bulb_coords = [c for c in adj_coords if c in genotype.bulbs]
-                bulbs_to_add = self.black_squares[black_coord] - len(adj_bulb_coords) 
-
-                if bulbs_to_add > 0:
-                    # Add adjacent bulbs
-                    num_added_bulbs = 0
-
-                    for coord in adj_coords:
-                        if self.place_bulb(coord, genotype.bulbs, allow_cross_shine=False):
-                            num_added_bulbs += 1
-
-                            if num_added_bulbs == bulbs_to_add:
-                                break
-
-                    # Validate the problem is fixed
-                    if num_added_bulbs != bulbs_to_add:
-                        genotype.fitness = 0
-                        break
+        bulb_cells = genotype.bulbs
+        state = lighting_state_class.LightingState(self, sorted(bulb_cells))
+        is_valid = self.repair_state(state)
+
+        if not state.bulbs == bulb_cells:
+            genotype.set_bulbs(state.bulbs)
+
+        self.num_shined_squares = state.num_lit_cells
+        state.release()
+
+        # Set the genotype's fitness
+        if is_valid:
+            genotype.fitness = state.num_lit_cells / self.num_possible_lit_cells
+
+        else:
+            genotype.fitness = 0
+
+
+    def repair_state(self, state):
+        """Repairs the given LightingState in place (see repair).
 
-                elif bulbs_to_add < 0:
-                    # Remove adjacent bulbs
-                    bulbs_to_remove = -1 * bulbs_to_add
-                    num_removed_bulbs = 0
+        Returns True if the repaired state meets every black square constraint, False otherwise.
+        """
+        # Remove bulbs until the cross-shine constraint is valid
+        for segment in state.get_conflicting_segments():
+            while len(state.segment_bulbs.get(segment, [])) > 1:
+                state.remove_bulb(min(state.segment_bulbs[segment], key=state.get_removal_cost))
+
+        # Add or remove bulbs around black squares (enforcing the cross-shine constraint) until black square constraints are met
+        pending_black_cells = list(self.numbered_black_squares)
+
+        while pending_black_cells:
+            black_cell = pending_black_cells.pop()
+            error = state.get_black_square_error(black_cell)
 
-                    for coord in adj_bulb_coords:
-                        genotype.bulbs.remove(coord)
-                        num_removed_bulbs += 1
+            if error > 0:
+                # Remove the adjacent bulbs that are cheapest to lose
+                for _ in range(error):
+                    bulb_cell = min([c for c in self.numbered_black_square_adj_cells[black_cell] if c in state.bulbs], key=state.get_removal_cost)
+                    state.remove_bulb(bulb_cell)
 
-                        if num_removed_bulbs == bulbs_to_remove:
-                            break
+                    # Other black squares next to the removed bulb may now need bulbs
+                    pending_black_cells += [c for c in self.cell_adj_numbered_black_squares.get(bulb_cell, ()) if not c == black_cell]
 
-                    # Validate the problem is fixed
-                    if num_removed_bulbs != bulbs_to_remove:
-                        genotype.fitness = 0
+            elif error < 0:
+                # Add the adjacent bulbs that light the most cells
+                for _ in range(-error):
+                    candidate_cells = [c for c in self.numbered_black_square_adj_cells[black_cell] if state.can_add_bulb(c)]
+
+                    if not candidate_cells:
                         break
-        
-        # Re-evaluate the fitness
-        # Get number of shined squares
-        bulb_on_bulb_shine_count = self.update_shined_squares(genotype)
-        
-        # Get number of black cell constraints violated and the corresponding black cell coordinates 
-        invalid_black_cell_constraint_count, invalid_black_coords = self.update_black_square_conditions(genotype)
 
-        # Set the genotype's fitness
-        if bulb_on_bulb_shine_count or invalid_black_cell_constraint_count:
-            genotype.fitness = 0
+                    state.add_bulb(max(candidate_cells, key=state.get_addition_gain))
 
-        else:
-            genotype.fitness = len(self.shined_squares) / self.num_possible_lit_cells 
+        return not any(state.get_black_square_error(c) for c in self.numbered_black_squares)
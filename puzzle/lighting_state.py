@@ -0,0 +1,211 @@
+import array
+
+
+class LightingState:
+    def __init__(self, puzzle, bulb_cells=(), track_candidate_cells=False):
+        """Initializes the LightingState class.
+
+        Where puzzle is a LightUpPuzzle object and bulb_cells is an iterable of the cell indices
+        (x * num_cols + y, see LightUpPuzzle.cell_grid) of the initial bulbs.
+
+        With track_candidate_cells, the puzzle's candidate cells (see LightUpPuzzle.candidate_cells) are
+        kept to those a random bulb may be placed at (see draw_candidate_cell) as bulbs are added and
+        removed. The pool is shared with the puzzle and restored by release, so at most one state of a
+        puzzle may track it at a time.
+
+        The state keeps incremental counters so bulbs can be added and removed at the cost of
+        the row and column segments they shine on:
+            lit_counts: number of bulbs shining on each cell (a bulb shines on its own cell twice)
+            segment_bulbs: bulbs in each occupied row/column segment
+            black_square_counts: number of bulbs adjacent to each numbered black square
+            bulb_on_bulb_shine_count: number of ordered pairs of bulbs sharing a segment
+            invalid_black_cell_constraint_count: number of missing or extra bulbs next to numbered black squares
+        """
+        self.puzzle = puzzle
+
+        # Reuse a zeroed buffer released by an earlier state of the puzzle (see release), so a state
+        # costs the cells its bulbs light rather than the size of the board
+        if puzzle.free_lit_count_buffers:
+            self.lit_counts = puzzle.free_lit_count_buffers.pop()
+        else:
+            self.lit_counts = array.array('l', [0]) * (puzzle.num_rows * puzzle.num_cols)
+
+        self.segment_bulbs = {}
+        self.black_square_counts = {}
+        self.bulbs = set([])
+        self.num_lit_cells = 0
+        self.bulb_on_bulb_shine_count = 0
+
+        # Every numbered black square starts without bulbs
+        self.invalid_black_cell_constraint_count = sum(puzzle.numbered_black_squares.values())
+
+        # Changes to the candidate cells as (cell, former position), or (cell, -1) for an added cell
+        self.candidate_cells = puzzle.candidate_cells if track_candidate_cells else None
+        self.exclude_lit_candidate_cells = track_candidate_cells and puzzle.exclude_lit_candidate_cells
+        self.candidate_cell_changes = []
+
+        for cell in bulb_cells:
+            self.add_bulb(cell)
+
+
+    def release(self):
+        """Returns the state's lit count buffer to the puzzle for reuse by later states, zeroing only the
+        cells of the segments its bulbs occupy (the only cells with a nonzero count).
+
+        Its lit counts (and the checks based on them) must not be used afterwards. The puzzle's candidate
+        cells (if tracked) are restored by undoing their changes in reverse order.
+        """
+        for cell, position in reversed(self.candidate_cell_changes):
+            if position < 0:
+                self.candidate_cells.remove(cell)
+            else:
+                self.candidate_cells.restore(cell, position)
+
+        self.candidate_cells = None
+        self.candidate_cell_changes = []
+
+        for segment in self.segment_bulbs:
+            for cell in self.puzzle.get_segment_cells(segment):
+                self.lit_counts[cell] = 0
+
+        self.puzzle.free_lit_count_buffers.append(self.lit_counts)
+        self.lit_counts = None
+
+
+    def add_bulb(self, cell):
+        """Places a bulb at the given cell index, updating all counters."""
+        self.bulbs.add(cell)
+
+        if self.candidate_cells is not None and not self.exclude_lit_candidate_cells:
+            self.remove_candidate_cell(cell)
+
+        for segment in (self.puzzle.cell_row_segments[cell], self.puzzle.cell_col_segments[cell]):
+            segment_bulbs = self.segment_bulbs.setdefault(segment, [])
+
+            # The new bulb and each bulb already in the segment shine on eachother
+            self.bulb_on_bulb_shine_count += 2 * len(segment_bulbs)
+            segment_bulbs.append(cell)
+
+            for lit_cell in self.puzzle.get_segment_cells(segment):
+                if not self.lit_counts[lit_cell]:
+                    self.num_lit_cells += 1
+
+                    if self.exclude_lit_candidate_cells:
+                        self.remove_candidate_cell(lit_cell)
+
+                self.lit_counts[lit_cell] += 1
+
+        for black_cell in self.puzzle.cell_adj_numbered_black_squares.get(cell, ()):
+            error = self.get_black_square_error(black_cell)
+            self.invalid_black_cell_constraint_count += abs(error + 1) - abs(error)
+            self.black_square_counts[black_cell] = self.black_square_counts.get(black_cell, 0) + 1
+
+
+    def remove_bulb(self, cell):
+        """Removes the bulb at the given cell index, updating all counters."""
+        self.bulbs.remove(cell)
+
+        for segment in (self.puzzle.cell_row_segments[cell], self.puzzle.cell_col_segments[cell]):
+            self.segment_bulbs[segment].remove(cell)
+            self.bulb_on_bulb_shine_count -= 2 * len(self.segment_bulbs[segment])
+
+            if not self.segment_bulbs[segment]:
+                del self.segment_bulbs[segment]
+
+            for lit_cell in self.puzzle.get_segment_cells(segment):
+                self.lit_counts[lit_cell] -= 1
+
+                if not self.lit_counts[lit_cell]:
+                    self.num_lit_cells -= 1
+
+                    if self.exclude_lit_candidate_cells:
+                        self.add_candidate_cell(lit_cell)
+
+        for black_cell in self.puzzle.cell_adj_numbered_black_squares.get(cell, ()):
+            error = self.get_black_square_error(black_cell)
+            self.invalid_black_cell_constraint_count += abs(error - 1) - abs(error)
+            self.black_square_counts[black_cell] -= 1
+
+        if self.candidate_cells is not None and not self.exclude_lit_candidate_cells:
+            self.add_candidate_cell(cell)
+
+
+    def add_candidate_cell(self, cell):
+        """Puts the given cell index back in the tracked candidate cells (if it is one of the puzzle's)."""
+        if self.puzzle.candidate_cell_flags[cell] and not cell in self.candidate_cells:
+            self.candidate_cells.add(cell)
+            self.candidate_cell_changes.append((cell, -1))
+
+
+    def remove_candidate_cell(self, cell):
+        """Takes the given cell index out of the tracked candidate cells (if it is in them)."""
+        position = self.candidate_cells.remove(cell)
+
+        if position >= 0:
+            self.candidate_cell_changes.append((cell, position))
+
+
+    def draw_candidate_cell(self):
+        """Returns a uniformly random tracked candidate cell: a candidate cell of the puzzle without a bulb
+        (and, with exclude_lit_candidate_cells, unlit). Returns None if there is none.
+        """
+        if not len(self.candidate_cells):
+            return None
+
+        return self.candidate_cells.draw()
+
+
+    def get_removal_cost(self, cell):
+        """Returns the cost of removing the bulb at the given cell index as a tuple of
+        (number of adjacent black squares left without enough bulbs, number of cells left unlit).
+        """
+        num_unlit_cells = 1 if self.lit_counts[cell] == 2 else 0
+
+        for segment in (self.puzzle.cell_row_segments[cell], self.puzzle.cell_col_segments[cell]):
+            for lit_cell in self.puzzle.get_segment_cells(segment):
+                if self.lit_counts[lit_cell] == 1 and not lit_cell == cell:
+                    num_unlit_cells += 1
+
+        num_deficient_black_squares = 0
+
+        for black_cell in self.puzzle.cell_adj_numbered_black_squares.get(cell, ()):
+            if self.black_square_counts[black_cell] <= self.puzzle.numbered_black_squares[black_cell]:
+                num_deficient_black_squares += 1
+
+        return num_deficient_black_squares, num_unlit_cells
+
+
+    def get_addition_gain(self, cell):
+        """Returns the number of cells newly lit by placing a bulb at the given cell index."""
+        num_lit_cells = 0 if self.lit_counts[cell] else 1
+
+        for segment in (self.puzzle.cell_row_segments[cell], self.puzzle.cell_col_segments[cell]):
+            for lit_cell in self.puzzle.get_segment_cells(segment):
+                if not self.lit_counts[lit_cell] and not lit_cell == cell:
+                    num_lit_cells += 1
+
+        return num_lit_cells
+
+
+    def can_add_bulb(self, cell):
+        """Returns True if a bulb can be placed at the given cell index without causing cross-shine
+        or over-filling an adjacent black square, False otherwise.
+        """
+        if cell in self.bulbs or self.puzzle.cell_row_segments[cell] in self.segment_bulbs or self.puzzle.cell_col_segments[cell] in self.segment_bulbs:
+            return False
+
+        for black_cell in self.puzzle.cell_adj_numbered_black_squares.get(cell, ()):
+            if self.black_square_counts.get(black_cell, 0) >= self.puzzle.numbered_black_squares[black_cell]:
+                return False
+
+        return True
+
+
+    def get_conflicting_segments(self):
+        """Returns a list of the segments holding more than one bulb (bulbs shining on eachother)."""
+        return [segment for segment, bulbs in self.segment_bulbs.items() if len(bulbs) > 1]
+
+
+    def get_black_square_error(self, black_cell):
+        """Returns the number of bulbs adjacent to the numbered black square at black_cell minus its value."""
+        return self.black_square_counts.get(black_cell, 0) - self.puzzle.numbered_black_squares[black_cell]
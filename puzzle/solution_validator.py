@@ -0,0 +1,169 @@
+import multiprocessing
+import os
+
+
+def read_solution_file(soln_file_path):
+    """Reads the solution file at soln_file_path (see LightUpPuzzle.write_to_soln_file).
+
+    Returns (number of columns, number of rows, list of (x, y, value) of each black square,
+    recorded number of lit cells, list of (x, y) of each bulb). Raises ValueError if the file
+    is malformed.
+    """
+    with open(soln_file_path, 'r') as soln_file:
+        lines = [line.split() for line in soln_file.read().split('\n') if line.strip()]
+
+    if len(lines) < 3 or not all(len(line) == 1 for line in lines[:2]):
+        raise ValueError('missing board size')
+
+    num_cols, num_rows = int(lines[0][0]), int(lines[1][0])
+    black_squares = []
+    num_lit_cells = None
+    bulbs = []
+
+    for line in lines[2:]:
+        if num_lit_cells is None and len(line) == 3:
+            black_squares.append((int(line[1]), int(line[0]), int(line[2])))
+
+        elif num_lit_cells is None and len(line) == 1:
+            num_lit_cells = int(line[0])
+
+        elif not num_lit_cells is None and len(line) == 2:
+            bulbs.append((int(line[1]), int(line[0])))
+
+        else:
+            raise ValueError('unexpected line: ' + ' '.join(line))
+
+    if num_lit_cells is None:
+        raise ValueError('missing number of lit cells')
+
+    return num_cols, num_rows, black_squares, num_lit_cells, bulbs
+
+
+def check_solution(num_cols, num_rows, black_squares, bulbs, adj_value_dont_care=5):
+    """Recomputes the lit cells and constraint violations of the given solution (see read_solution_file).
+
+    Cells are indexed as in LightUpPuzzle.cell_grid. Each row and column segment (a run of white
+    cells between black squares) is a strided slice of the board, so segments are found from the
+    sorted black squares of each line and counted and lit with slice operations.
+
+    Returns (number of lit cells, number of bulbs shining on eachother (ordered pairs), number of
+    black squares with a value below adj_value_dont_care whose adjacent bulb count differs from it).
+    Raises ValueError if a bulb is off the board or on a black square.
+    """
+    num_cells = num_rows * num_cols
+    black = bytearray(num_cells)
+    bulb = bytearray(num_cells)
+    lit = bytearray(num_cells)
+
+    row_blacks = [[] for _ in range(num_rows)]
+    col_blacks = [[] for _ in range(num_cols)]
+
+    for x, y, _ in black_squares:
+        black[x * num_cols + y] = 1
+        row_blacks[x].append(y)
+        col_blacks[y].append(x)
+
+    for x, y in bulbs:
+        if not (0 <= x < num_rows and 0 <= y < num_cols):
+            raise ValueError('bulb off the board: ' + str(y) + ' ' + str(x))
+
+        if black[x * num_cols + y]:
+            raise ValueError('bulb on a black square: ' + str(y) + ' ' + str(x))
+
+        bulb[x * num_cols + y] = 1
+
+    num_shine_pairs = 0
+
+    # Row segments are runs of consecutive cells, column segments are runs of cells num_cols apart
+    for line_blacks, line_length, line_stride, stride in ((row_blacks, num_cols, num_cols, 1), (col_blacks, num_rows, 1, num_cols)):
+        for line, blacks in enumerate(line_blacks):
+            boundaries = [-1] + sorted(blacks) + [line_length]
+
+            for start, stop in zip(boundaries[:-1], boundaries[1:]):
+                if stop - start > 1:
+                    segment = slice(line * line_stride + (start + 1) * stride, line * line_stride + stop * stride, stride)
+                    num_segment_bulbs = bulb[segment].count(1)
+
+                    if num_segment_bulbs:
+                        lit[segment] = b'\x01' * (stop - start - 1)
+                        num_shine_pairs += num_segment_bulbs * (num_segment_bulbs - 1)
+
+    num_unsatisfied_black_squares = 0
+
+    for x, y, value in black_squares:
+        if value < adj_value_dont_care:
+            num_adj_bulbs = 0
+
+            for adj_x, adj_y in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if 0 <= adj_x < num_rows and 0 <= adj_y < num_cols:
+                    num_adj_bulbs += bulb[adj_x * num_cols + adj_y]
+
+            if not num_adj_bulbs == value:
+                num_unsatisfied_black_squares += 1
+
+    return lit.count(1), num_shine_pairs, num_unsatisfied_black_squares
+
+
+def validate_solution_file(job):
+    """Validates a single solution file in a worker process.
+
+    Where job is (solution file path, adj_value_dont_care). Returns (path, status, recorded number
+    of lit cells, recomputed number of lit cells, number of bulbs shining on eachother, number of
+    unsatisfied black squares, error message). status is one of:
+        ok: the recorded lit count matches and the solution is valid
+        invalid: the recorded lit count matches, but bulbs shine on eachother or black squares are unsatisfied
+        mismatch: the recorded lit count does not match the recomputed one
+        error: the file is malformed (the counts are None)
+    """
+    soln_file_path, adj_value_dont_care = job
+
+    try:
+        num_cols, num_rows, black_squares, recorded_num_lit_cells, bulbs = read_solution_file(soln_file_path)
+        num_lit_cells, num_shine_pairs, num_unsatisfied_black_squares = check_solution(num_cols, num_rows, black_squares, bulbs, adj_value_dont_care)
+
+    except (ValueError, OSError) as error:
+        return soln_file_path, 'error', None, None, None, None, str(error)
+
+    if not num_lit_cells == recorded_num_lit_cells:
+        status = 'mismatch'
+    elif num_shine_pairs or num_unsatisfied_black_squares:
+        status = 'invalid'
+    else:
+        status = 'ok'
+
+    return soln_file_path, status, recorded_num_lit_cells, num_lit_cells, num_shine_pairs, num_unsatisfied_black_squares, None
+
+
+class SolutionValidator:
+    def __init__(self, directory_path, adj_value_dont_care=5, num_workers=None):
+        """Initializes the SolutionValidator class.
+
+        Where directory_path is searched recursively for solution files (ending in _soln.txt),
+        adj_value_dont_care is the black square value without an adjacency constraint and
+        num_workers is the number of worker processes (all CPUs if None).
+        """
+        self.directory_path = directory_path
+        self.adj_value_dont_care = adj_value_dont_care
+        self.num_workers = num_workers
+
+
+    def get_solution_file_paths(self):
+        """Yields the path of every solution file under directory_path as it is found."""
+        for dir_path, dir_names, file_names in os.walk(self.directory_path):
+            dir_names.sort()
+
+            for file_name in sorted(file_names):
+                if file_name.endswith('_soln.txt'):
+                    yield os.path.join(dir_path, file_name)
+
+
+    def run(self):
+        """Validates the solution files in parallel, streaming them to the workers as they are found.
+
+        Yields the result of each file (see validate_solution_file) in the order the files are found.
+        """
+        jobs = ((soln_file_path, self.adj_value_dont_care) for soln_file_path in self.get_solution_file_paths())
+
+        with multiprocessing.Pool(self.num_workers) as pool:
+            for result in pool.imap(validate_solution_file, jobs, chunksize=64):
+                yield result
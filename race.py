@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+
+import ea.race as race_class
+import util.args as args_class
+
+
+if __name__ == '__main__':
+
+    # Process command line arguments
+    args = args_class.Arguments(1, ['config/race/default_race.cfg'])
+    race_file = args.get_args()[0]
+
+
+    # Race the candidate configs, eliminating significantly worse ones after each batch
+    race = race_class.Race(race_file)
+    survivors = race.run()
+
+
+    # Print the statistical comparisons of the best candidate
+    print()
+    race.print_summary(survivors)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+
+import ea.sweep as sweep_class
+import util.args as args_class
+
+
+if __name__ == '__main__':
+
+    # Process command line arguments
+    args = args_class.Arguments(1, ['config/sweep/default_sweep.cfg'])
+    sweep_file = args.get_args()[0]
+
+
+    # Run all jobs of the sweep that have not been completed yet
+    sweep = sweep_class.Sweep(sweep_file)
+    results = sweep.run()
+
+
+    # Print the summary of every job, best first
+    for result in results:
+        print(result['config_hash'] + '\t' + str(result['parameters']) + '\tmean best fitness: ' + str(result['mean_best_fitness']) +
+              '\tmax best fitness: ' + str(result['max_best_fitness']))
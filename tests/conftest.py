@@ -0,0 +1,14 @@
+import pytest
+import util.config as config_class
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    """Returns a function building a Config object from the default config with the given settings overridden."""
+    def make_config(**settings):
+        config_file_path = tmp_path / 'test.cfg'
+        config_file_path.write_text('[DEFAULT]\n' + ''.join([key + ' = ' + str(value) + '\n' for key, value in settings.items()]))
+
+        return config_class.Config(str(config_file_path))
+
+    return make_config
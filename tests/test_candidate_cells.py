@@ -0,0 +1,66 @@
+import pytest
+import puzzle.light_up_puzzle as puzzle_class
+import puzzle.lighting_state as lighting_state_class
+import random
+
+
+def make_puzzle(make_config, **settings):
+    rng = random.Random(0)
+    black_square_data = [(x, y, rng.choice([0, 1, 2, 5, 5, 5])) for x in range(12) for y in range(12) if rng.random() < 0.2]
+
+    return puzzle_class.LightUpPuzzle(make_config(**settings), (12, 12, black_square_data))
+
+
+def get_free_candidate_cells(phenotype, state, exclude_lit_candidate_cells):
+    return set([cell for cell in range(phenotype.num_rows * phenotype.num_cols) if phenotype.candidate_cell_flags[cell] and not cell in state.bulbs and
+                not (exclude_lit_candidate_cells and state.lit_counts[cell])])
+
+
+@pytest.mark.parametrize('exclude_lit_candidate_cells', [0, 1])
+def test_tracked_candidate_cells_match_free_cells(make_config, exclude_lit_candidate_cells):
+    phenotype = make_puzzle(make_config, exclude_lit_candidate_cells=exclude_lit_candidate_cells)
+    initial_cells = list(phenotype.candidate_cells.cells)
+    white_cells = [cell for cell, value in enumerate(phenotype.cell_grid) if value == phenotype.white_cell_value]
+    rng = random.Random(1)
+
+    for _ in range(20):
+        state = lighting_state_class.LightingState(phenotype, rng.sample(white_cells, 10), track_candidate_cells=True)
+
+        for _ in range(50):
+            cell = rng.choice(white_cells)
+
+            if cell in state.bulbs:
+                state.remove_bulb(cell)
+            else:
+                state.add_bulb(cell)
+
+            assert set(phenotype.candidate_cells.cells) == get_free_candidate_cells(phenotype, state, exclude_lit_candidate_cells)
+
+        state.release()
+
+        # The pool is restored exactly, so later draws do not depend on earlier states
+        assert phenotype.candidate_cells.cells == initial_cells
+
+
+@pytest.mark.parametrize('exclude_lit_candidate_cells', [0, 1])
+@pytest.mark.parametrize('num_candidate_cell_draws', [0, 8])
+def test_random_bulbs_are_placed_on_free_candidate_cells(make_config, exclude_lit_candidate_cells, num_candidate_cell_draws):
+    phenotype = make_puzzle(make_config, exclude_lit_candidate_cells=exclude_lit_candidate_cells, num_candidate_cell_draws=num_candidate_cell_draws)
+    random.seed(2)
+
+    for _ in range(20):
+        bulbs = set([])
+
+        while True:
+            state = lighting_state_class.LightingState(phenotype, bulbs)
+            free_cells = get_free_candidate_cells(phenotype, state, exclude_lit_candidate_cells)
+            state.release()
+
+            previous_bulbs = set(bulbs)
+
+            if not phenotype.place_bulb_randomly(bulbs):
+                assert not free_cells
+                break
+
+            new_bulbs = bulbs - previous_bulbs
+            assert len(new_bulbs) == 1 and new_bulbs.pop() in free_cells
@@ -0,0 +1,69 @@
+import ea.ea_driver as ea_driver_class
+import os
+import pytest
+import random
+
+
+class Interrupted(Exception):
+    pass
+
+
+def run_experiment(config, resume=False):
+    """Returns the results of the given config's experiment as comparable tuples."""
+    ea_driver = ea_driver_class.EADriver(config, resume=resume)
+
+    try:
+        return [(r.run_count, r.best_fitness, r.bulbs, r.eval_count, r.generation_count, r.termination_reason) for r in ea_driver.run_experiment()]
+    finally:
+        ea_driver.close()
+
+
+def read_output(config):
+    """Returns the contents of the given config's log and solution files, removing them."""
+    output = []
+
+    for key in ('log_file_path', 'soln_file_path'):
+        with open(config.settings[key]) as output_file:
+            output.append(output_file.read())
+
+        os.remove(config.settings[key])
+
+    return output
+
+
+@pytest.mark.parametrize('use_steady_state', [0, 1])
+def test_resumed_experiment_matches_uninterrupted_experiment(make_config, tmp_path, monkeypatch, use_steady_state):
+    # The seed is only logged, so an external one keeps the logs comparable
+    config = make_config(use_external_seed=1, seed=5, num_experiment_runs=2, num_fitness_evaluations=600, checkpoint_interval=3,
+                         use_steady_state=use_steady_state, log_file_path=tmp_path / 'log.txt', soln_file_path=tmp_path / 'soln.txt',
+                         checkpoint_file_path=tmp_path / 'checkpoint.pkl')
+
+    random.seed(5)
+    uninterrupted_results = run_experiment(config)
+    uninterrupted_output = read_output(config)
+
+    # Stop the experiment right after a checkpoint in its second run
+    write_checkpoint = ea_driver_class.EADriver.write_checkpoint
+
+    def write_checkpoint_and_stop(ea_driver):
+        write_checkpoint(ea_driver)
+
+        if ea_driver.run_count == 2:
+            raise Interrupted()
+
+    random.seed(5)
+    monkeypatch.setattr(ea_driver_class.EADriver, 'write_checkpoint', write_checkpoint_and_stop)
+
+    with pytest.raises(Interrupted):
+        run_experiment(config)
+
+    monkeypatch.setattr(ea_driver_class.EADriver, 'write_checkpoint', write_checkpoint)
+    assert os.path.exists(config.settings['checkpoint_file_path'])
+
+    # Resume with a different random state, which the checkpoint replaces
+    random.seed(6)
+    resumed_results = run_experiment(config, resume=True)
+
+    assert resumed_results == uninterrupted_results
+    assert read_output(config) == uninterrupted_output
+    assert not os.path.exists(config.settings['checkpoint_file_path'])
@@ -0,0 +1,89 @@
+import ea.dispatcher as dispatcher_class
+import os
+
+
+def make_dispatcher(tmp_path, make_config, num_runs=3):
+    dispatcher = dispatcher_class.Dispatcher(str(tmp_path / 'spool'), lease_duration=60)
+    dispatcher.submit(make_config().file_path, num_runs)
+
+    return dispatcher
+
+
+def test_submit_skips_known_jobs(tmp_path, make_config):
+    dispatcher = make_dispatcher(tmp_path, make_config)
+
+    assert dispatcher.get_status() == (3, 0, 0)
+    assert dispatcher.submit(make_config().file_path, 3) == 0
+
+
+def test_each_job_is_claimed_once(tmp_path, make_config):
+    dispatcher = make_dispatcher(tmp_path, make_config)
+    job_ids = [dispatcher.claim('worker' + str(i))[0]['job_id'] for i in range(3)]
+
+    assert len(set(job_ids)) == 3
+    assert dispatcher.claim('worker3') is None
+    assert dispatcher.get_status() == (0, 3, 0)
+
+
+def test_claim_starts_the_lease_lifetime(tmp_path, make_config, monkeypatch):
+    dispatcher = make_dispatcher(tmp_path, make_config, 1)
+    rename = os.rename
+
+    # A job queued long ago must not be re-queued as expired by another worker right after it is claimed
+    for file_name in os.listdir(dispatcher.queue_directory):
+        os.utime(os.path.join(dispatcher.queue_directory, file_name), (0, 0))
+
+    def rename_then_requeue(source, destination):
+        rename(source, destination)
+
+        if os.path.dirname(destination) == dispatcher.lease_directory:
+            dispatcher.requeue_expired_leases()
+
+    monkeypatch.setattr(dispatcher_class.os, 'rename', rename_then_requeue)
+    _, lease_file_path = dispatcher.claim('worker0')
+
+    assert os.path.exists(lease_file_path)
+    assert dispatcher.get_status() == (0, 1, 0)
+
+
+def test_expired_leases_are_requeued(tmp_path, make_config):
+    dispatcher = make_dispatcher(tmp_path, make_config, 2)
+    leases = [dispatcher.claim('worker' + str(i)) for i in range(2)]
+
+    # Complete the first job, then let both leases expire
+    dispatcher_class.write_json_atomically(os.path.join(dispatcher.result_directory, leases[0][0]['job_id'] + '.json'), {})
+
+    for _, lease_file_path in leases:
+        os.utime(lease_file_path, (0, 0))
+
+    dispatcher.requeue_expired_leases()
+
+    assert dispatcher.get_job_ids(dispatcher.queue_directory) == [leases[1][0]['job_id']]
+    assert dispatcher.get_status() == (1, 0, 1)
+
+
+def test_claim_drops_completed_jobs(tmp_path, make_config):
+    dispatcher = make_dispatcher(tmp_path, make_config, 2)
+    job_ids = dispatcher.get_job_ids(dispatcher.queue_directory)
+    dispatcher_class.write_json_atomically(os.path.join(dispatcher.result_directory, job_ids[0] + '.json'), {})
+
+    assert dispatcher.claim('worker0')[0]['job_id'] == job_ids[1]
+    assert dispatcher.claim('worker0') is None
+    assert dispatcher.get_status() == (0, 1, 1)
+
+
+def test_claim_skips_jobs_taken_by_other_workers(tmp_path, make_config, monkeypatch):
+    dispatcher = make_dispatcher(tmp_path, make_config, 2)
+    job_ids = dispatcher.get_job_ids(dispatcher.queue_directory)
+    rename = os.rename
+
+    def rename_after_other_worker(source, destination):
+        # Another worker claims the first job between listing the queue and renaming it
+        if os.path.basename(source) == job_ids[0] + '.json':
+            rename(source, os.path.join(dispatcher.lease_directory, job_ids[0] + '.other.json'))
+
+        rename(source, destination)
+
+    monkeypatch.setattr(dispatcher_class.os, 'rename', rename_after_other_worker)
+
+    assert dispatcher.claim('worker0')[0]['job_id'] == job_ids[1]
@@ -0,0 +1,80 @@
+import ea.ea_driver as ea_driver_class
+import ea.genotype as genotype_class
+import ea.island_model as island_model_class
+import multiprocessing
+import pytest
+import puzzle.light_up_puzzle as puzzle_class
+import random
+import threading
+
+
+@pytest.fixture
+def closed_drivers(monkeypatch):
+    """Records every EADriver closed."""
+    closed_drivers = []
+    close = ea_driver_class.EADriver.close
+
+    def record_close(ea_driver):
+        closed_drivers.append(ea_driver)
+        close(ea_driver)
+
+    monkeypatch.setattr(ea_driver_class.EADriver, 'close', record_close)
+
+    return closed_drivers
+
+
+def make_board(config):
+    rng = random.Random(0)
+
+    return puzzle_class.LightUpPuzzle(config, (8, 8, [(x, y, rng.choice([0, 1, 2, 5])) for x in range(8) for y in range(8) if rng.random() < 0.2])).get_board()
+
+
+def test_island_reports_runs_and_closes_their_drivers(make_config, closed_drivers):
+    config = make_config(num_fitness_evaluations=300)
+    board = make_board(config)
+    phenotype = puzzle_class.LightUpPuzzle(config, board)
+    conn, island_conn = multiprocessing.Pipe()
+
+    island = threading.Thread(target=island_model_class.run_island, args=(island_conn, config.file_path, 0, 1.0, 2, 3))
+    island.start()
+
+    try:
+        for _ in range(2):
+            conn.send(('start', board))
+            num_migrations = 0
+
+            while True:
+                eval_count, avg_fitness, best_fitness, best_bitmask, migrants, terminated = conn.recv()
+
+                # The reported best genotype has the reported fitness
+                genotype = genotype_class.Genotype(phenotype.get_bulbs(best_bitmask))
+                phenotype.get_fitness(genotype)
+                assert genotype.fitness == best_fitness and len(migrants) == 3
+
+                if terminated:
+                    break
+
+                conn.send(('migrate', migrants))
+                num_migrations += 1
+
+            assert num_migrations and eval_count >= 300
+
+    finally:
+        conn.send(('stop',))
+        island.join()
+
+    assert len(closed_drivers) == 2
+
+
+def test_island_closes_its_driver_when_a_run_fails(make_config, closed_drivers):
+    config = make_config(num_fitness_evaluations=300)
+    conn, island_conn = multiprocessing.Pipe()
+
+    # Malformed immigrants stop the run at its first migration
+    conn.send(('start', make_board(config)))
+    conn.send(('migrate', None))
+
+    with pytest.raises(TypeError):
+        island_model_class.run_island(island_conn, config.file_path, 0, 1.0, 2, 3)
+
+    assert len(closed_drivers) == 1
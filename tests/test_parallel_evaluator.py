@@ -0,0 +1,59 @@
+import ea.ea_driver as ea_driver_class
+import ea.genotype as genotype_class
+import ea.parallel_evaluator as parallel_evaluator_class
+import pytest
+import puzzle.light_up_puzzle as puzzle_class
+import random
+
+
+fitness_functions = [
+    dict(use_penalty_function=0, use_repair_function=0),
+    dict(use_penalty_function=0, use_repair_function=1),
+    dict(use_penalty_function=1, use_repair_function=0)
+]
+
+
+@pytest.mark.parametrize('log_fitness_variants', [0, 1])
+@pytest.mark.parametrize('fitness_function', fitness_functions)
+def test_parallel_fitness_matches_serial_fitness(make_config, fitness_function, log_fitness_variants):
+    config = make_config(log_fitness_variants=log_fitness_variants, **fitness_function)
+    rng = random.Random(0)
+    black_square_data = [(x, y, rng.choice([0, 1, 2, 5, 5])) for x in range(10) for y in range(10) if rng.random() < 0.2]
+    phenotype = puzzle_class.LightUpPuzzle(config, (10, 10, black_square_data))
+    white_cells = [cell for cell, value in enumerate(phenotype.cell_grid) if value == phenotype.white_cell_value]
+    genotypes = [genotype_class.Genotype(rng.sample(white_cells, rng.randint(0, 30))) for _ in range(25)]
+
+    parallel_evaluator = parallel_evaluator_class.ParallelEvaluator(config, 3)
+
+    try:
+        parallel_evaluator.set_puzzle(phenotype)
+        results = parallel_evaluator.evaluate(genotypes)
+    finally:
+        parallel_evaluator.close()
+
+    for genotype, (fitness, repaired_bulbs, fitness_variants) in zip(genotypes, results):
+        serial_genotype = genotype_class.Genotype(genotype.bulbs)
+        phenotype.get_fitness(serial_genotype)
+
+        assert fitness == serial_genotype.fitness
+        assert (genotype.bulbs if repaired_bulbs is None else repaired_bulbs) == serial_genotype.bulbs
+
+        if log_fitness_variants:
+            assert fitness_variants == phenotype.fitness_variants
+
+
+def test_parallel_run_matches_serial_run(make_config):
+    results = []
+
+    for num_evaluation_workers in (0, 2):
+        config = make_config(num_evaluation_workers=num_evaluation_workers, num_experiment_runs=2, num_fitness_evaluations=400)
+        random.seed(3)
+
+        ea_driver = ea_driver_class.EADriver(config, write_output=False)
+
+        try:
+            results.append([(r.best_fitness, r.bulbs, r.eval_count) for r in ea_driver.run_experiment()])
+        finally:
+            ea_driver.close()
+
+    assert results[0] == results[1]
@@ -0,0 +1,58 @@
+import puzzle.exact_search as exact_search_class
+import puzzle.light_up_puzzle as puzzle_class
+import puzzle.lighting_state as lighting_state_class
+import random
+
+
+def solve_by_regions(config, phenotype):
+    """Solves each region of the given puzzle with exact search and returns the recombined bulb cells."""
+    bulb_cells = []
+
+    for region_index in range(phenotype.num_regions):
+        board, (x_offset, y_offset) = phenotype.get_region_board(region_index)
+        region_phenotype = puzzle_class.LightUpPuzzle(config, board)
+        solution = exact_search_class.ExactSearch(region_phenotype, 100000).solve()
+
+        assert solution and solution[1] == region_phenotype.num_possible_lit_cells
+
+        for x, y in [divmod(c, region_phenotype.num_cols) for c in solution[0]]:
+            bulb_cells.append((x + x_offset) * phenotype.num_cols + y + y_offset)
+
+    return bulb_cells
+
+
+def assert_valid_solution(phenotype, bulb_cells):
+    state = lighting_state_class.LightingState(phenotype, bulb_cells)
+
+    assert state.num_lit_cells == phenotype.num_possible_lit_cells
+    assert state.bulb_on_bulb_shine_count == 0
+    assert state.invalid_black_cell_constraint_count == 0
+
+
+def test_region_board_keeps_numbered_square_outside_bounding_box(make_config):
+    # The 1 below the middle of the top row touches the row's region only from outside its bounding box
+    config = make_config()
+    phenotype = puzzle_class.LightUpPuzzle(config, (2, 3, [(1, 0, 5), (1, 1, 1), (1, 2, 5)]))
+
+    assert phenotype.num_regions == 1
+
+    board, _ = phenotype.get_region_board(0)
+
+    assert (1, 1, 1) in board[2]
+    assert_valid_solution(phenotype, solve_by_regions(config, phenotype))
+
+
+def test_regions_recombine_into_a_whole_board_solution(make_config):
+    config = make_config()
+    rng = random.Random(0)
+    num_solved_boards = 0
+
+    while num_solved_boards < 20:
+        black_square_data = [(x, y, rng.choice([0, 1, 2, 5, 5, 5])) for x in range(6) for y in range(6) if rng.random() < 0.4]
+        phenotype = puzzle_class.LightUpPuzzle(config, (6, 6, black_square_data))
+        solution = exact_search_class.ExactSearch(phenotype, 100000).solve()
+
+        # Only boards with a solution lighting every cell have regions that must all be solvable
+        if solution and solution[1] == phenotype.num_possible_lit_cells:
+            assert_valid_solution(phenotype, solve_by_regions(config, phenotype))
+            num_solved_boards += 1
@@ -0,0 +1,46 @@
+import ea.genotype as genotype_class
+import pytest
+import puzzle.light_up_puzzle as puzzle_class
+import puzzle.solution_validator as solution_validator_class
+import random
+
+
+def check_bulbs(phenotype, bulbs):
+    """Returns (lit cells, bulbs shining on eachother, unsatisfied black squares) of the given bulb cells,
+    recomputed by the solution validator.
+    """
+    num_rows, num_cols, black_square_data = phenotype.get_board()
+
+    return solution_validator_class.check_solution(num_cols, num_rows, black_square_data, [divmod(c, num_cols) for c in bulbs])
+
+
+@pytest.mark.parametrize('log_fitness_variants', [0, 1])
+def test_repaired_genotypes_are_valid(make_config, log_fitness_variants):
+    config = make_config(use_penalty_function=0, use_repair_function=1, log_fitness_variants=log_fitness_variants)
+    rng = random.Random(0)
+
+    for _ in range(30):
+        black_square_data = [(x, y, rng.choice([0, 1, 2, 3, 5, 5])) for x in range(8) for y in range(8) if rng.random() < 0.25]
+        phenotype = puzzle_class.LightUpPuzzle(config, (8, 8, black_square_data))
+        white_cells = [cell for cell, value in enumerate(phenotype.cell_grid) if value == phenotype.white_cell_value]
+
+        for num_bulbs in (0, 5, 15, len(white_cells)):
+            genotype = genotype_class.Genotype(rng.sample(white_cells, num_bulbs))
+            genotype.fitness = None
+            phenotype.get_fitness(genotype)
+
+            num_lit_cells, num_shine_pairs, num_unsatisfied_black_squares = check_bulbs(phenotype, genotype.bulbs)
+
+            # Bulbs never shine on eachother after a repair; the fitness is zero unless every constraint is met
+            assert num_shine_pairs == 0
+
+            if num_unsatisfied_black_squares:
+                assert genotype.fitness == 0
+                continue
+
+            assert genotype.fitness == num_lit_cells / phenotype.num_possible_lit_cells
+
+            # A valid genotype is left unchanged by another repair
+            bulbs = genotype.bulbs
+            phenotype.get_fitness(genotype)
+            assert genotype.bulbs == bulbs and genotype.fitness == num_lit_cells / phenotype.num_possible_lit_cells
@@ -0,0 +1,83 @@
+import puzzle.solution_validator as solution_validator_class
+import random
+import util.solution_store as solution_store_class
+
+
+def make_board(rng, num_rows, num_cols):
+    return (num_rows, num_cols, [(x, y, rng.choice([0, 1, 2, 5])) for x in range(num_rows) for y in range(num_cols) if rng.random() < 0.25])
+
+
+def transform_board(board, symmetry):
+    num_rows, num_cols, black_square_data = board
+
+    return solution_store_class.get_transformed_size(symmetry, num_rows, num_cols) + \
+           ([solution_store_class.transform_coord(symmetry, x, y, num_rows, num_cols) + (value,) for x, y, value in black_square_data],)
+
+
+def check_bulbs(board, bulbs):
+    num_rows, num_cols, black_square_data = board
+
+    return solution_validator_class.check_solution(num_cols, num_rows, black_square_data, bulbs)
+
+
+def test_inverse_symmetries_undo_symmetries():
+    for num_rows, num_cols in ((4, 4), (3, 5), (5, 2)):
+        for symmetry in range(solution_store_class.num_symmetries):
+            transformed_num_rows, transformed_num_cols = solution_store_class.get_transformed_size(symmetry, num_rows, num_cols)
+            inverse_symmetry = solution_store_class.get_inverse_symmetry(symmetry)
+            transformed_coords = set([])
+
+            for x in range(num_rows):
+                for y in range(num_cols):
+                    transformed_x, transformed_y = solution_store_class.transform_coord(symmetry, x, y, num_rows, num_cols)
+
+                    assert 0 <= transformed_x < transformed_num_rows and 0 <= transformed_y < transformed_num_cols
+                    assert solution_store_class.transform_coord(inverse_symmetry, transformed_x, transformed_y, transformed_num_rows, transformed_num_cols) == (x, y)
+
+                    transformed_coords.add((transformed_x, transformed_y))
+
+            # Every symmetry is a permutation of the board's cells
+            assert len(transformed_coords) == num_rows * num_cols
+
+
+def test_variants_share_canonical_form():
+    rng = random.Random(0)
+
+    for num_rows, num_cols in ((6, 6), (4, 7)):
+        board = make_board(rng, num_rows, num_cols)
+        canonical_board, _ = solution_store_class.get_canonical_form(board)
+
+        for symmetry in range(solution_store_class.num_symmetries):
+            variant_canonical_board, variant_symmetry = solution_store_class.get_canonical_form(transform_board(board, symmetry))
+
+            assert variant_canonical_board == canonical_board
+
+            # The returned symmetry maps the variant onto its canonical form
+            transformed_variant = transform_board(transform_board(board, symmetry), variant_symmetry)
+            assert transformed_variant[:2] == canonical_board[:2] and sorted(transformed_variant[2]) == canonical_board[2]
+
+
+def test_stored_solution_maps_onto_every_variant(tmp_path):
+    rng = random.Random(1)
+    solution_store = solution_store_class.SolutionStore(str(tmp_path / 'solutions.sqlite3'))
+
+    for num_rows, num_cols in ((6, 6), (4, 7)):
+        board = make_board(rng, num_rows, num_cols)
+        black_cells = set([(x, y) for x, y, _ in board[2]])
+        bulbs = rng.sample([(x, y) for x in range(num_rows) for y in range(num_cols) if not (x, y) in black_cells], 6)
+
+        assert solution_store.add(board, 1, bulbs, 0.5)
+
+        for symmetry in range(solution_store_class.num_symmetries):
+            variant = transform_board(board, symmetry)
+            variant_bulbs, fitness = solution_store.lookup(variant, 1)
+
+            # The stored bulbs land on the cells the symmetry moved them to
+            assert sorted(variant_bulbs) == sorted([solution_store_class.transform_coord(symmetry, x, y, num_rows, num_cols) for x, y in bulbs])
+            assert check_bulbs(variant, variant_bulbs) == check_bulbs(board, bulbs)
+            assert fitness == 0.5
+
+        # A different adjacency constraint setting is stored separately
+        assert solution_store.lookup(board, 0) is None
+
+    solution_store.close()
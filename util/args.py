@@ -2,22 +2,34 @@ import sys
 
 
 class Arguments:
-    def __init__(self, num_expected_args, default_values):
-        """Initializes the Arguments class."""
+    def __init__(self, num_expected_args, default_values, flags=[]):
+        """Initializes the Arguments class.
+
+        Where flags is a list of optional command line flags (e.g. '--resume') that may appear
+        anywhere among the arguments and are not counted as arguments.
+        """
         self.num_expected_args = num_expected_args
         self.default_values = default_values
+        self.flags = flags
     
 
     def get_args(self): 
         """Returns the arguments provided by the command line if there are
-        num_expected_args (not including the script name).
+        num_expected_args (not including the script name and flags).
 
         Returns default_values otherwise.
         """
-        if len(sys.argv) != self.num_expected_args + 1:
+        args = [arg for arg in sys.argv[1:] if not arg in self.flags]
+
+        if len(args) != self.num_expected_args:
             # There are not enough arguments
             # Default to default_values 
             return self.default_values
     
         # Use the provided arguments
-        return sys.argv[1:]
+        return args
+
+
+    def has_flag(self, flag):
+        """Returns True if the given flag was provided on the command line, False otherwise."""
+        return flag in sys.argv[1:]
@@ -0,0 +1,33 @@
+import os
+import pickle
+
+
+def write_checkpoint(file_path, state):
+    """Pickles state to file_path atomically.
+
+    The state is written to a temporary file next to file_path, flushed to disk and then renamed
+    over file_path, so an interrupted write never leaves a partial checkpoint behind.
+    """
+    tmp_file_path = file_path + '.tmp'
+
+    with open(tmp_file_path, 'wb') as tmp_file:
+        pickle.dump(state, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_file.flush()
+        os.fsync(tmp_file.fileno())
+
+    os.replace(tmp_file_path, file_path)
+
+
+def read_checkpoint(file_path):
+    """Returns the state pickled at file_path (see write_checkpoint), None if there is no checkpoint."""
+    if not os.path.exists(file_path):
+        return None
+
+    with open(file_path, 'rb') as checkpoint_file:
+        return pickle.load(checkpoint_file)
+
+
+def remove_checkpoint(file_path):
+    """Removes the checkpoint at file_path (if any)."""
+    if os.path.exists(file_path):
+        os.remove(file_path)
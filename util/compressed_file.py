@@ -0,0 +1,53 @@
+import bz2
+import gzip
+import lzma
+import os
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Supported compressed file extensions
+compressed_extensions = ['.gz', '.bz2', '.xz', '.zst']
+
+
+def open_file(file_path, mode='r'):
+    """Opens file_path as a text file with the given mode ('r', 'w' or 'a').
+
+    Files ending in .gz, .bz2, .xz or .zst are transparently (de)compressed as a stream.
+    Zstandard compression requires the zstandard package.
+    """
+    if file_path.endswith('.gz'):
+        return gzip.open(file_path, mode + 't', encoding='utf-8')
+
+    if file_path.endswith('.bz2'):
+        return bz2.open(file_path, mode + 't', encoding='utf-8')
+
+    if file_path.endswith('.xz'):
+        return lzma.open(file_path, mode + 't', encoding='utf-8')
+
+    if file_path.endswith('.zst'):
+        if not zstandard:
+            raise ImportError('The zstandard package is required for .zst files: ' + file_path)
+
+        return zstandard.open(file_path, mode + 't', encoding='utf-8')
+
+    return open(file_path, mode)
+
+
+def find_file(file_path):
+    """Returns file_path if it exists, otherwise the first existing compressed version of it
+    (file_path with a compressed extension appended).
+
+    Returns file_path if no version of it exists.
+    """
+    if os.path.exists(file_path):
+        return file_path
+
+    for extension in compressed_extensions:
+        if os.path.exists(file_path + extension):
+            return file_path + extension
+
+    return file_path
@@ -1,14 +1,22 @@
 import configparser
+import os
+
+
+# Config file whose settings every other config file inherits unless it overrides them
+default_config_file_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config', 'default.cfg')
 
 
 class Config:
     def __init__(self, config_file):
         """Initializes the Config class.
 
-        This class assumes CFG format for data in config_file.
+        This class assumes CFG format for data in config_file. Settings missing from config_file
+        are read from the default config file (config/default.cfg).
         """
+        self.file_path = config_file
+
         self.settings = configparser.ConfigParser()
-        self.settings.read(config_file)
+        self.settings.read([default_config_file_path, config_file])
 
         # Remove the reference to the DEFAULT section for ease of use
         # (i.e. direct access of config settings from self.settings)
@@ -0,0 +1,59 @@
+import json
+import sqlite3
+
+
+class ResultStore:
+    def __init__(self, store_file_path):
+        """Initializes the ResultStore class.
+
+        Where store_file_path is the path of a SQLite database holding one summary per experiment,
+        keyed by the hash of the experiment's config (see ea.sweep.get_config_hash).
+        """
+        self.connection = sqlite3.connect(store_file_path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS results (config_hash TEXT PRIMARY KEY, config_file_path TEXT, parameters TEXT, '
+                                'best_fitnesses TEXT, eval_counts TEXT, mean_best_fitness REAL, max_best_fitness REAL, elapsed_time REAL)')
+        self.connection.commit()
+
+
+    def contains(self, config_hash):
+        """Returns True if a result is stored for config_hash, False otherwise."""
+        return self.connection.execute('SELECT 1 FROM results WHERE config_hash = ?', (config_hash,)).fetchone() is not None
+
+
+    def add(self, config_hash, config_file_path, parameters, best_fitnesses, eval_counts, elapsed_time):
+        """Stores (or replaces) the result of the experiment with the given config hash.
+
+        Where parameters is a dict of the swept config settings, best_fitnesses and eval_counts are
+        lists holding the last best (local) fitness and the evaluation count of each run, and
+        elapsed_time is the wall-clock time of the experiment in seconds.
+        """
+        self.connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                (config_hash, config_file_path, json.dumps(parameters, sort_keys=True), json.dumps(best_fitnesses), json.dumps(eval_counts),
+                                 sum(best_fitnesses) / len(best_fitnesses), max(best_fitnesses), elapsed_time))
+        self.connection.commit()
+
+
+    def get_results(self):
+        """Returns a list of all stored results as dicts, from highest to lowest mean best fitness."""
+        results = []
+
+        for row in self.connection.execute('SELECT * FROM results ORDER BY mean_best_fitness DESC'):
+            config_hash, config_file_path, parameters, best_fitnesses, eval_counts, mean_best_fitness, max_best_fitness, elapsed_time = row
+
+            results.append({
+                'config_hash': config_hash,
+                'config_file_path': config_file_path,
+                'parameters': json.loads(parameters),
+                'best_fitnesses': json.loads(best_fitnesses),
+                'eval_counts': json.loads(eval_counts),
+                'mean_best_fitness': mean_best_fitness,
+                'max_best_fitness': max_best_fitness,
+                'elapsed_time': elapsed_time
+            })
+
+        return results
+
+
+    def close(self):
+        """Closes the store."""
+        self.connection.close()
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import sqlite3
+
+
+# Number of board symmetries: the 4 rotations, each optionally mirrored
+num_symmetries = 8
+
+
+def transform_coord(symmetry, x, y, num_rows, num_cols):
+    """Returns (x, y) of the cell at (x, y) of a num_rows x num_cols board after applying the given
+    symmetry (0 to 3 quarter turns clockwise, then a left-right mirror if symmetry >= 4).
+    """
+    for _ in range(symmetry % 4):
+        # A quarter turn also swaps the board's dimensions
+        x, y = y, num_rows - 1 - x
+        num_rows, num_cols = num_cols, num_rows
+
+    if symmetry >= 4:
+        y = num_cols - 1 - y
+
+    return x, y
+
+
+def get_transformed_size(symmetry, num_rows, num_cols):
+    """Returns (num_rows, num_cols) of a num_rows x num_cols board after applying the given symmetry."""
+    return (num_cols, num_rows) if symmetry % 2 else (num_rows, num_cols)
+
+
+def get_inverse_symmetry(symmetry):
+    """Returns the symmetry that undoes the given symmetry (mirrored symmetries undo themselves)."""
+    return (4 - symmetry) % 4 if symmetry < 4 else symmetry
+
+
+def get_canonical_form(board):
+    """Returns (canonical board, symmetry) of the given board (see LightUpPuzzle.get_board).
+
+    The canonical board is the smallest of the board's 8 transformed versions (rotations and
+    reflections; a non-square board's quarter turns swap its dimensions), so every rotated or
+    reflected variant of a board has the same canonical board. symmetry maps the given board
+    onto it.
+    """
+    num_rows, num_cols, black_square_data = board
+    forms = []
+
+    for symmetry in range(num_symmetries):
+        transformed_black_squares = sorted([transform_coord(symmetry, x, y, num_rows, num_cols) + (value,) for x, y, value in black_square_data])
+        forms.append((get_transformed_size(symmetry, num_rows, num_cols) + (transformed_black_squares,), symmetry))
+
+    return min(forms)
+
+
+class SolutionStore:
+    def __init__(self, store_file_path):
+        """Initializes the SolutionStore class.
+
+        Where store_file_path is the path of a SQLite database holding the best valid solution of
+        each solved board, keyed by a hash of the board's canonical form (see get_canonical_form)
+        and of the adjacency constraints enforced. Solutions are stored in canonical coordinates,
+        so a rotated or reflected variant of a stored board is found and mapped back.
+        """
+        self.connection = sqlite3.connect(store_file_path, timeout=60)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS solutions (board_hash TEXT PRIMARY KEY, board TEXT, bulbs TEXT, fitness REAL)')
+        self.connection.commit()
+
+
+    def get_key(self, canonical_board, enforce_adj_quotas):
+        """Returns the key of the given canonical board under the given adjacency constraint setting."""
+        board_text = json.dumps([list(canonical_board[:2]), [list(b) for b in canonical_board[2]], enforce_adj_quotas])
+
+        return hashlib.sha1(board_text.encode('utf-8')).hexdigest(), board_text
+
+
+    def lookup(self, board, enforce_adj_quotas):
+        """Returns (list of the (x, y) of each bulb on the given board, fitness) of the stored solution
+        of the board or any of its rotated or reflected variants, None if there is none.
+        """
+        canonical_board, symmetry = get_canonical_form(board)
+        board_hash, _ = self.get_key(canonical_board, enforce_adj_quotas)
+
+        row = self.connection.execute('SELECT bulbs, fitness FROM solutions WHERE board_hash = ?', (board_hash,)).fetchone()
+
+        if row is None:
+            return None
+
+        # Map the canonical bulbs back onto the given board
+        canonical_num_rows, canonical_num_cols = canonical_board[:2]
+        inverse_symmetry = get_inverse_symmetry(symmetry)
+        bulbs = [transform_coord(inverse_symmetry, x, y, canonical_num_rows, canonical_num_cols) for x, y in json.loads(row[0])]
+
+        return bulbs, row[1]
+
+
+    def add(self, board, enforce_adj_quotas, bulbs, fitness):
+        """Stores the given valid solution (list of the (x, y) of each bulb) of the given board if its
+        fitness is higher than that of the board's stored solution (if any).
+
+        Returns True if the solution was stored, False otherwise.
+        """
+        canonical_board, symmetry = get_canonical_form(board)
+        board_hash, board_text = self.get_key(canonical_board, enforce_adj_quotas)
+        canonical_bulbs = sorted([transform_coord(symmetry, x, y, board[0], board[1]) for x, y in bulbs])
+
+        cursor = self.connection.execute('INSERT INTO solutions VALUES (?, ?, ?, ?) ON CONFLICT (board_hash) DO UPDATE SET bulbs = excluded.bulbs, '
+                                         'fitness = excluded.fitness WHERE excluded.fitness > solutions.fitness',
+                                         (board_hash, board_text, json.dumps(canonical_bulbs), fitness))
+        self.connection.commit()
+
+        return cursor.rowcount > 0
+
+
+    def close(self):
+        """Closes the store."""
+        self.connection.close()
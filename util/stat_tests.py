@@ -0,0 +1,160 @@
+from enum import Enum
+import math
+import numpy as np
+import scipy.stats as stats
+
+
+class Assumptions(Enum):
+    ASSUME_EQUAL_VARIANCES = 0
+    ASSUME_UNEQUAL_VARIANCES = 1
+
+
+def mean(lst):
+    """Computes the mean of lst."""
+    return sum(lst) / len(lst)
+
+
+def var(lst):
+    """Computes the variance of lst."""
+    return np.var(lst)
+    
+
+def std_dev(var):
+    """Computes the std. deviation given variance."""
+    return math.sqrt(var)
+    
+
+def f_test(a, b, print_info=True):
+    """Computes the f-test and related information.
+
+    H0: var1 == var2
+    H1: var1 != var2
+
+    Returns ASSUME_EQUAL_VARIANCES or ASSUME_UNEQUAL_VARIANCES
+    """
+    # Calculate each mean and variance
+    mean_a = mean(a)
+    mean_b = mean(b)
+    var_a = var(a)
+    var_b = var(b)
+    std_dev_a = std_dev(var_a)
+    std_dev_b = std_dev(var_b)
+
+    # Calculate test statistic
+    if var_a == 0 or var_b == 0:
+        return Assumptions.ASSUME_UNEQUAL_VARIANCES
+    else:
+        F = var_a / var_b
+
+    # Calculate degrees of freedom
+    df_a = len(a) - 1
+    df_b = len(b) - 1
+
+    # Significance level
+    alpha = 0.05
+
+    # Calculate F-Critical
+    F_crit = stats.f.ppf(alpha, dfn=df_a, dfd=df_b)
+
+    # Print information
+    if print_info:
+        print('mean, ' + str(mean_a) + ', ' + str(mean(b)))
+        print('variance, ' + str(var_a) + ', ' + str(var_b))
+        print('standard deviation, ' + str(std_dev_a) + ', ' + str(std_dev_b))
+        print('observations, ' + str(len(a)) + ', ' + str(len(b)))
+        print('df, ' + str(df_a) + ', ' + str(df_b))
+        print('F, ' + str(F))
+        print('F critical, ' + str(F_crit))
+
+    # Determine the assumption
+    if mean_a > mean_b and F < F_crit:
+        return Assumptions.ASSUME_EQUAL_VARIANCES
+
+    if mean_a > mean_b and F > F_crit:
+        return Assumptions.ASSUME_UNEQUAL_VARIANCES
+
+    if mean_a < mean_b and F > F_crit:
+        return Assumptions.ASSUME_EQUAL_VARIANCES
+
+    if mean_a < mean_b and F < F_crit:
+        return Assumptions.ASSUME_UNEQUAL_VARIANCES
+    
+    return None # Error
+
+
+def t_test(a, b, assumption, t_table=None, print_info=True):
+    """Performs the t-test two-sample with assumption provided by the
+    assumption parameter.
+
+    The t critical value is looked up in t_table (a list indexed by df) if given,
+    and computed exactly otherwise.
+
+    Returns the list representing the 'better' algorithm.
+    Returns None if neither algorithm can be deemed 'better'.
+    """
+    # Calculate the t statistic and p two-tail value
+    if assumption == Assumptions.ASSUME_EQUAL_VARIANCES:
+        t_stat, p = stats.ttest_ind(a, b, equal_var=True)
+        df = len(a) + len(b) - 2
+
+    else: # Assume unequal variances
+        t_stat, p = stats.ttest_ind(a, b, equal_var=False)
+        df = len(a) + 1
+
+    # Calculate the t critical two-tail value
+    # Note: an alpha value of 0.05 is assumed
+    if t_table:
+        t_crit = t_table[df]
+    else:
+        t_crit = stats.t.ppf(1 - 0.05 / 2, df)
+
+    # Print information
+    if print_info:
+        print('observations, ' + str(len(a)))
+        print('df, ' + str(df))
+        print('t Stat, ' + str(t_stat))
+        print('P two-tail, ' + str(p))
+        print('t Critical two-tail, ' + str(t_crit))
+
+    if abs(t_stat) > abs(t_crit):
+        # Reject the null hypothesis that the mean difference is zero
+        # Conclude that the variable w/ the better mean represents a better algorithm for this problem
+        if mean(a) > mean(b):
+            return a
+        if mean(a) < mean(b):
+            return b
+        else:
+            # Undefined behavior
+            return -1
+    
+    else:
+        # Accept the null hypothesis
+        # The algorithms are too similar to call a clear winner
+        return None
+
+
+def print_comparison(a_data, b_data, a_name, b_name, t_table=None):
+    """Prints the f-test and t-test comparison of the final fitnesses a_data and b_data
+    of the algorithms named a_name and b_name.
+    """
+    print(' ,' + a_name + ', ' + b_name)
+
+    assumption = f_test(a_data, b_data)
+
+    if assumption == Assumptions.ASSUME_EQUAL_VARIANCES:
+        print('Equal variances assumed')
+    else:
+        print('Unequal variances assumed')
+
+    print()
+
+    result = t_test(a_data, b_data, assumption, t_table)
+
+    if result is a_data:
+        print(a_name + ' is statistically better than ' + b_name)
+    elif result is b_data:
+        print(b_name + ' is statistically better than ' + a_name)
+    else:
+        print('Nether ' + b_name + ' nor ' + a_name + ' is statistically better')
+
+    print('\n\n')
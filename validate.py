@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+import puzzle.solution_validator as solution_validator_class
+import sys
+import util.args as args_class
+import util.config as config_class
+
+
+if __name__ == '__main__':
+
+    # Process command line arguments
+    args = args_class.Arguments(1, ['output'])
+    directory_path = args.get_args()[0]
+
+    # The default config provides the black square value without an adjacency constraint
+    config = config_class.Config('config/default.cfg')
+
+
+    # Validate every solution file under the directory in parallel
+    validator = solution_validator_class.SolutionValidator(directory_path, int(config.settings['adj_value_dont_care']))
+    status_counts = {}
+
+    print('file\tstatus\trecorded lit cells\tlit cells\tbulb on bulb shine\tunsatisfied black squares')
+
+    for soln_file_path, status, recorded_num_lit_cells, num_lit_cells, num_shine_pairs, num_unsatisfied_black_squares, error in validator.run():
+        status_counts[status] = status_counts.get(status, 0) + 1
+
+        if status == 'error':
+            print(soln_file_path + '\terror\t' + error)
+        else:
+            print('\t'.join([soln_file_path, status, str(recorded_num_lit_cells), str(num_lit_cells), str(num_shine_pairs), str(num_unsatisfied_black_squares)]))
+
+
+    # Print the number of files of each status
+    print()
+    print(', '.join([status + ': ' + str(count) for status, count in sorted(status_counts.items())]))
+
+    # Fail if any recorded lit count is wrong or any file could not be read
+    if status_counts.get('mismatch') or status_counts.get('error'):
+        sys.exit(1)